@@ -1,12 +1,28 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from matplotlib.colors import LinearSegmentedColormap
+import json
+import sys
+import threading
+from pathlib import Path
 import warnings
 warnings.filterwarnings('ignore')
 
+# Modul bersama di direktori utama proyek (olist/). matplotlib/seaborn (olist.charts)
+# tidak di-import di sini: chart dirender di worker `olist.render_pool` (atau di proses ini jika pool nonaktif)
+DASHBOARD_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(DASHBOARD_DIR.parent))
+from olist import chart_store, export, geo, instrument
+from olist.live_data import LiveData, StaleVersion
+from olist.paths import DATA_DIR
+from olist.query import Filters, table_group
+from olist.render_cache import RenderCache
+from olist.render_pool import RenderBatch, RenderPool
+from olist.sellers import MIN_SELLER_ITEMS
+from olist.stats import GroupStats
+
+LOGO = DASHBOARD_DIR / 'assets' / 'logo.svg'
+PAGES = ["Delivery & Rating Analysis", "Repurchase Analysis", "Geographic Analysis"]
+
 # Set page config
 st.set_page_config(
     page_title="E-Commerce Analytics Dashboard",
@@ -14,264 +30,269 @@ st.set_page_config(
     layout="wide"
 )
 
-# Load data
-@st.cache_data
-def load_data():
-    return pd.read_csv('main_data.csv')
+# Span instrumentasi (olist.instrument) hanya tercatat jika OLIST_INSTRUMENT aktif saat streamlit dijalankan
+rerun_mark = instrument.recorder().mark() if instrument.enabled() else None
+
+# Data read-only disimpan sekali per proses dengan st.cache_resource dan dipakai bersama semua
+# sesi tanpa salinan per rerun (st.cache_data mem-pickle dan menyalin hasilnya di setiap pemanggilan).
+# Frame ini tidak boleh diubah di tempat: turunkan dengan assign/copy. Copy-on-write pandas menjaga
+# frame turunan tidak menulis balik ke frame bersama.
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+# Data chart per kunci dari versi data aktif: setiap halaman hanya membaca tabel yang ditampilkannya.
+# Thread watcher memuat versi baru (pipeline menulis ulang charts/) di latar belakang lalu menukarnya;
+# satu rerun memakai satu versi dari awal sampai akhir.
+@st.cache_resource
+def get_live_data():
+    return LiveData('.').start()
+live_data = get_live_data()
+data_version = live_data.current
 
-main_data = load_data()
+def get_chart_data(chart_key):
+    with instrument.span('get_chart_data', key=chart_key, category='data'):
+        try:
+            return data_version.table(chart_key)
+        except StaleVersion:
+            # File versi ini sudah diganti sebelum sempat dibaca: pakai versi baru untuk seluruh halaman
+            if live_data.refresh():
+                st.rerun()
+            st.info("Data dashboard sedang diperbarui oleh pipeline. Muat ulang halaman sebentar lagi.")
+            st.stop()
 
-# Load delivery_review_df.csv untuk visualisasi 1-4
-@st.cache_data
+# delivery_review_df hanya dibutuhkan chart korelasi untuk main_data.csv lama (hanya kolom yang dipakai)
+DELIVERY_REVIEW_COLUMNS = list(export.DELIVERY_RATING_PAIR)
+
+@st.cache_resource
 def load_delivery_review():
-    return pd.read_csv('delivery_review_df.csv', parse_dates=[
-        'order_purchase_timestamp', 'order_delivered_customer_date', 'order_estimated_delivery_date'
-    ])
-delivery_review_df = load_delivery_review()
+    with instrument.span('load_delivery_review', category='data'):
+        # Frame ringkas (int8/float32) yang sudah divalidasi terhadap skemanya
+        if Path(chart_store.DELIVERY_FRAME_FILE).exists():
+            return chart_store.load_delivery_frame(chart_store.DELIVERY_FRAME_FILE, DELIVERY_REVIEW_COLUMNS)
+        df = pd.read_csv('delivery_review_df.csv', usecols=DELIVERY_REVIEW_COLUMNS)
+        return chart_store.validate_delivery_frame(df.dropna().astype(
+            {col: chart_store.DELIVERY_FRAME_SCHEMA[col] for col in DELIVERY_REVIEW_COLUMNS}))
+
+# Bin dan regresi untuk chart korelasi; main_data.csv lama tidak punya, jadi dihitung sekali dari data mentah.
+# Hasil turunan di-cache per versi data (versi aktif dan sebelumnya)
+@st.cache_resource(max_entries=2)
+def delivery_density(version):
+    bins, regression = get_chart_data('delivery_rating_bins'), get_chart_data('delivery_regression')
+    if regression.empty:
+        df = load_delivery_review()
+        bins = export.delivery_rating_bins(df)
+        regression = GroupStats.from_frame(df, pairs=[export.DELIVERY_RATING_PAIR]).regression(
+            *export.DELIVERY_RATING_PAIR).reset_index(drop=True)
+    return bins, regression
+
+# Filter interaktif: tabel dihitung ulang oleh DuckDB di atas store Parquet (data/parquet).
+# Tanpa duckdb atau store Parquet, filter disembunyikan dan dashboard memakai tabel hasil build.
+@st.cache_resource
+def get_query_engine():
+    try:
+        from olist.query import QueryEngine
+        return QueryEngine(DATA_DIR)
+    except (ImportError, FileNotFoundError):
+        return None
+
+@st.cache_resource
+def filter_options():
+    engine = get_query_engine()
+    return engine.options(), engine.default_filters()
+
+# Hasil query di-cache per kombinasi filter (dipakai bersama semua sesi)
+@st.cache_resource(max_entries=256)
+def filtered_tables(group, filter_key):
+    with instrument.span('query', group=group, category='data'):
+        return get_query_engine().tables(group, Filters(*filter_key))
+
+def page_data(chart_key):
+    """Tabel chart halaman: hasil query jika filter aktif dan kuncinya bisa difilter, selain itu tabel build"""
+    group = table_group(chart_key)
+    if active_filters is None or group is None:
+        return get_chart_data(chart_key)
+    with instrument.span('filtered_tables', key=chart_key, category='data'):
+        return filtered_tables(group, active_filters.key())[chart_key]
+
+def describe_filters(filters):
+    parts = [f"{filters.start:%Y-%m-%d} s.d. {filters.end:%Y-%m-%d}"]
+    for label, values in (("state", filters.states), ("kategori", filters.categories),
+                          ("pembayaran", filters.payment_types)):
+        if values:
+            parts.append(f"{label}: {', '.join(values)}")
+    return "Filter aktif: " + "; ".join(parts)
+
+def sidebar_filters(page):
+    """Widget filter sidebar; None jika semua filter masih default halaman ini"""
+    options, default = filter_options()
+    first, last = options['first_date'], options['last_date']
+    # Default sama dengan tabel build: 6 bulan terakhir untuk Delivery, seluruh histori untuk Repurchase
+    default_start = default.start if page == "Delivery & Rating Analysis" else first
+    st.sidebar.subheader("Filter")
+    dates = st.sidebar.date_input("Rentang tanggal order:", (default_start.date(), last.date()),
+                                  min_value=first.date(), max_value=last.date(), key=f'dates_{page}')
+    states = st.sidebar.multiselect("State pelanggan:", options['states'])
+    categories = st.sidebar.multiselect("Kategori produk:", options['categories'])
+    payment_types = []
+    if options['payment_types']:
+        payment_types = st.sidebar.multiselect("Metode pembayaran:", options['payment_types'])
+
+    start, end = (dates + (last.date(),))[:2] if len(dates) == 1 else dates
+    # Tanggal awal default dipakai persis (timestamp), agar hasilnya sama dengan tabel build
+    start = default_start if start == default_start.date() else pd.Timestamp(start)
+    if start == default_start and end == last.date() and not (states or categories or payment_types):
+        return None
+    return Filters(start, end, states, categories, payment_types)
+
+# Cache render dipakai bersama semua sesi: chart yang datanya sama tidak dirasterisasi ulang
+@st.cache_resource
+def get_render_cache():
+    return RenderCache()
+render_cache = get_render_cache()
+
+# Pool proses untuk render paralel (matplotlib tidak thread-safe); worker mulai di latar belakang
+@st.cache_resource
+def get_render_pool():
+    return RenderPool(render_cache)
+
+# Geometri state hasil `python -m olist geometries` (GeoJSON ringkas, tanpa geopandas)
+STATE_GEOJSON = 'brazil_states.geojson'
+
+@st.cache_resource
+def load_state_geometries():
+    if not Path(STATE_GEOJSON).exists():
+        return None
+    return geo.load_state_geometries(STATE_GEOJSON)
+
+# Metrik peta: label -> (kunci chart, kolom, colormap, (vmin, vmax), format nilai)
+STATE_METRICS = {
+    "Korelasi Waktu Pengiriman vs Rating": ('state_corr', 'corr_delivery_rating', 'coolwarm', (-1, 1), '{:.3f}'),
+    "Rata-rata Waktu Pengiriman (hari)": ('state_delivery', 'delivery_time_mean', 'OrRd', (None, None), '{:.1f} hari'),
+    "Tingkat Repurchase Setelah Review Negatif (%)": ('repurchase_state', 'repurchase_rate', 'Blues', (None, None), '{:.2f}%'),
+    "Jumlah Kategori Bermasalah": ('problematic_categories', None, 'Reds', (0, None), '{:.0f} kategori'),
+}
+
+def get_state_values(metric):
+    """Series nilai metrik per state (index kode state)"""
+    chart_key, column, *_ = STATE_METRICS[metric]
+    data = get_chart_data(chart_key)
+    if column is None:
+        return data.groupby('customer_state').size().astype('float64')
+    return data.set_index('customer_state')[column]
+
+# Warna choropleth dihitung sekali per metrik dan versi data; geometri dipakai bersama
+@st.cache_resource(max_entries=2 * len(STATE_METRICS))
+def state_choropleth(metric, version):
+    _, _, cmap, (vmin, vmax), value_format = STATE_METRICS[metric]
+    return geo.state_choropleth(load_state_geometries(), get_state_values(metric), cmap, vmin, vmax, value_format)
 
 # Helper functions
-def get_chart_data(chart_name, subchart=""):
-    if subchart:
-        return main_data[(main_data['chart'] == chart_name) & (main_data['subchart'] == subchart)]
-    return main_data[main_data['chart'] == chart_name]
-
-def add_value_labels(ax, spacing=5):
-    """Tambahkan label nilai di atas bar chart"""
-    for rect in ax.patches:
-        y_value = rect.get_height()
-        x_value = rect.get_x() + rect.get_width() / 2
-        space = spacing
-        va = 'bottom'
-        if y_value < 0:
-            space = -spacing
-            va = 'top'
-        label = "{:.2f}".format(y_value)
-        ax.annotate(
-            label,
-            (x_value, y_value),
-            xytext=(0, space),
-            textcoords="offset points",
-            ha='center',
-            va=va,
-            fontsize=10,
-            fontweight='bold')
+def show_image(placeholder, image):
+    with instrument.span('st.image', category='streamlit'):
+        placeholder.image(image, width='stretch')
+
+# Chart halaman ini dirender paralel; placeholder menjaga urutan chart di halaman
+page_charts = RenderBatch(get_render_pool(), show_image)
+
+def show_chart(chart_id, draw, *data, data_fingerprint=None):
+    """Sisipkan placeholder chart dan kirim render-nya ke pool; `draw` (nama fungsi di olist.charts)
+    hanya dipanggil jika datanya belum ada di cache render. Gambar muncul saat `page_charts.wait()`."""
+    with instrument.span('render', chart=chart_id, category='chart'):
+        page_charts.add(st.empty(), chart_id, draw, *data, data_fingerprint=data_fingerprint)
+
+def show_instrumentation(mark):
+    """Panel debug di sidebar: rincian span rerun ini beserta ekspor trace dan metriknya"""
+    recorder = instrument.recorder()
+    spans = recorder.since(mark, threading.get_ident())
+    with st.sidebar.expander("Instrumentasi rerun"):
+        st.dataframe(pd.DataFrame({
+            'span': ['· ' * s.depth + s.label for s in spans],
+            'wall (ms)': [s.wall * 1000 for s in spans],
+            'CPU (ms)': [s.cpu * 1000 for s in spans],
+            'puncak (KB)': [s.peak_bytes / 1024 if s.peak_bytes is not None else None for s in spans],
+        }), hide_index=True, width='stretch')
+        st.download_button("Chrome trace (JSON)", json.dumps(recorder.chrome_trace(spans)),
+                           file_name='dashboard_trace.json', mime='application/json')
+        st.download_button("Metrik Prometheus", recorder.prometheus(), file_name='olist_spans.prom',
+                           mime='text/plain')
 
 # Sidebar
 st.sidebar.title("E-Commerce Analytics Dashboard")
-st.sidebar.image("https://img.icons8.com/color/96/000000/online-store.png", width=100)
+# Logo dibundel lokal: tidak ada request jaringan saat sesi dimulai
+st.sidebar.image(str(LOGO), width=100)
 
+# Halaman awal bisa dipilih lewat URL (?page=...), jadi sesi baru tidak memuat halaman default lebih dulu
+requested_page = st.query_params.get('page')
 page = st.sidebar.radio(
     "Pilih Analisis:",
-    ["Delivery & Rating Analysis", "Repurchase Analysis"]
+    PAGES,
+    index=PAGES.index(requested_page) if requested_page in PAGES else 0
 )
+st.query_params['page'] = page
+
+active_filters = None
+if page != "Geographic Analysis" and get_query_engine() is not None:
+    active_filters = sidebar_filters(page)
 
 st.sidebar.markdown("---")
 st.sidebar.markdown("Dashboard ini menampilkan analisis data e-commerce untuk membantu meningkatkan rating dan tingkat pembelian ulang pelanggan.")
 st.sidebar.markdown("Data source: E-Commerce Public Dataset")
 st.sidebar.markdown("Created by: Hammam Alfarisy")
+# Versi data yang dipakai halaman ini (hash isi charts/), diperbarui otomatis saat pipeline menulis data baru
+st.sidebar.caption(f"Versi data: {data_version.version} (dimuat {data_version.loaded_at:%Y-%m-%d %H:%M:%S})")
+if live_data.last_error:
+    st.sidebar.caption(f"Versi baru gagal dimuat, data lama tetap dipakai: {live_data.last_error}")
 
 # Main content
 if page == "Delivery & Rating Analysis":
     st.title("Analisis Waktu Pengiriman & Rating")
     st.markdown("Analisis korelasi antara waktu pengiriman dengan rating review dalam 6 bulan terakhir dan strategi untuk meningkatkan rating.")
+    if active_filters is not None:
+        st.caption(describe_filters(active_filters))
+        if page_data('delivery_per_rating').empty:
+            st.warning("Tidak ada order dengan review yang cocok dengan filter ini.")
+            st.stop()
 
     # 1. Korelasi Waktu Pengiriman dan Rating Review (scatter + regresi)
     st.header("1. Korelasi Waktu Pengiriman dan Rating Review")
     # Hitung korelasi pada SELURUH DATA, bukan sample
-    correlation = delivery_review_df['delivery_time_days'].corr(delivery_review_df['review_score'])
-
-    plt.figure(figsize=(10, 6))
-    sample_size = min(5000, len(delivery_review_df))
-    sample_df = delivery_review_df.sample(sample_size, random_state=42)
-    ax = sns.regplot(x='delivery_time_days', y='review_score', 
-                    data=sample_df, scatter_kws={'alpha':0.3, 's':20}, 
-                    line_kws={'color':'red', 'linewidth':2})
-    plt.text(0.05, 0.95, f'Korelasi: {correlation:.3f}', 
-            transform=ax.transAxes, fontsize=12, 
-            bbox=dict(facecolor='white', alpha=0.8, boxstyle='round,pad=0.5'))
-    x_limit = np.percentile(delivery_review_df['delivery_time_days'], 95)
-    plt.xlim(0, x_limit)
-    plt.title('Korelasi antara Waktu Pengiriman dan Rating Review', fontsize=14)
-    plt.xlabel('Waktu Pengiriman (hari)', fontsize=12)
-    plt.ylabel('Rating Review (1-5)', fontsize=12)
-    plt.tight_layout()
-    st.pyplot(plt.gcf())
+    delivery_summary = page_data('delivery_summary')
+    correlation = delivery_summary['correlation'].iloc[0]
+    delivery_p95 = delivery_summary['delivery_time_p95'].iloc[0]
+    # Density seluruh order + garis OLS dengan pita analitik, dari tabel yang sudah diagregasi
+    density = delivery_density(data_version.version) if active_filters is None else (page_data('delivery_rating_bins'),
+                                                                   page_data('delivery_regression'))
+    show_chart('delivery_correlation', 'draw_delivery_correlation', *density, correlation)
     st.info(f"Korelasi antara waktu pengiriman dan rating review: *{correlation:.3f}*")
     st.markdown("_Interpretasi: Korelasi negatif menunjukkan semakin lama pengiriman, semakin rendah rating._")
 
     # 2. Boxplot waktu pengiriman per rating
     st.header("2. Distribusi Waktu Pengiriman per Rating")
-    plt.figure(figsize=(10, 6))
-    ax = sns.boxplot(x='review_score', y='delivery_time_days', data=delivery_review_df, 
-                     order=[1, 2, 3, 4, 5], showfliers=False)
-    sns.pointplot(x='review_score', y='delivery_time_days', data=delivery_review_df,
-                  order=[1, 2, 3, 4, 5], color='red', markers='D', scale=0.7, ax=ax)
-    y_limit = np.percentile(delivery_review_df['delivery_time_days'], 95)
-    plt.ylim(0, y_limit)
-    for i, score in enumerate([1, 2, 3, 4, 5]):
-        mean_val = delivery_review_df[delivery_review_df['review_score']==score]['delivery_time_days'].mean()
-        plt.text(i, mean_val + 0.5, f'{mean_val:.1f}', ha='center', fontsize=10, 
-                 bbox=dict(facecolor='white', alpha=0.7, boxstyle='round,pad=0.2'))
-    plt.title('Distribusi Waktu Pengiriman per Rating Review (6 Bulan Terakhir)', fontsize=14)
-    plt.xlabel('Rating Review', fontsize=12)
-    plt.ylabel('Waktu Pengiriman (hari)', fontsize=12)
-    plt.tight_layout()
-    st.pyplot(plt.gcf())
+    # Digambar dari statistik per rating yang sudah dihitung (tanpa memindai baris mentah)
+    show_chart('delivery_boxplot', 'draw_delivery_boxplot', page_data('delivery_per_rating'),
+               delivery_p95)
 
     # 3. Barplot rata-rata waktu pengiriman per rating
     st.header("3. Rata-rata Waktu Pengiriman per Rating")
-    plt.figure(figsize=(10, 6))
-    mean_delivery = delivery_review_df.groupby('review_score')['delivery_time_days'].mean().reset_index()
-    ax = sns.barplot(x='review_score', y='delivery_time_days', data=mean_delivery)
-    add_value_labels(ax)
-    overall_mean = delivery_review_df['delivery_time_days'].mean()
-    plt.axhline(y=overall_mean, color='red', linestyle='--', alpha=0.7)
-    plt.text(4.5, overall_mean + 0.2, f'Rata-rata: {overall_mean:.2f}', color='red')
-    plt.title('Rata-rata Waktu Pengiriman per Rating', fontsize=14)
-    plt.xlabel('Rating Review', fontsize=12)
-    plt.ylabel('Rata-rata Waktu Pengiriman (hari)', fontsize=12)
-    plt.tight_layout()
-    st.pyplot(plt.gcf())
+    show_chart('mean_delivery_per_rating', 'draw_mean_delivery_per_rating', page_data('delivery_per_rating'),
+               delivery_summary)
 
     # 4. Rating berdasarkan status ketepatan pengiriman
     st.header("4. Rating Berdasarkan Status Ketepatan Pengiriman")
-    # Buat kolom status ketepatan pengiriman jika belum ada
-    if 'delivery_status' not in delivery_review_df.columns:
-        def status(row):
-            diff = (row['order_delivered_customer_date'] - row['order_estimated_delivery_date']).days
-            if diff < -3:
-                return 'Very Early (>3 days)'
-            elif diff < -1:
-                return 'Early (1-3 days)'
-            elif diff <= 1:
-                return 'On Time (±1 day)'
-            elif diff <= 3:
-                return 'Late (1-3 days)'
-            else:
-                return 'Very Late (>3 days)'
-        delivery_review_df['delivery_status'] = delivery_review_df.apply(status, axis=1)
-    delivery_status_order = ['Very Early (>3 days)', 'Early (1-3 days)', 'On Time (±1 day)', 
-                             'Late (1-3 days)', 'Very Late (>3 days)']
-    delivery_status_rating = delivery_review_df.groupby('delivery_status')['review_score'].mean().reindex(delivery_status_order).reset_index()
-    delivery_status_rating.columns = ['delivery_status', 'mean']
-    plt.figure(figsize=(12, 6))
-    ax = sns.barplot(x='delivery_status', y='mean', data=delivery_status_rating, order=delivery_status_order)
-    add_value_labels(ax)
-    overall_rating_mean = delivery_review_df['review_score'].mean()
-    plt.axhline(y=overall_rating_mean, color='red', linestyle='--', alpha=0.7)
-    plt.text(4.5, overall_rating_mean + 0.05, f'Rata-rata: {overall_rating_mean:.2f}', color='red')
-    plt.title('Rata-rata Rating Berdasarkan Status Ketepatan Pengiriman', fontsize=14)
-    plt.xlabel('Status Ketepatan Pengiriman', fontsize=12)
-    plt.ylabel('Rata-rata Rating', fontsize=12)
-    plt.xticks(rotation=20)
-    plt.tight_layout()
-    st.pyplot(plt.gcf())
-
-   # 5. Distribusi status ketepatan pengiriman
-    st.header("5. Distribusi Status Ketepatan Pengiriman")
-    status_dist_data = get_chart_data('barplot_status_distribution')
+    show_chart('rating_per_delivery_status', 'draw_rating_per_delivery_status', page_data('delivery_status'),
+               delivery_summary)
 
+    # 5. Distribusi status ketepatan pengiriman
+    st.header("5. Distribusi Status Ketepatan Pengiriman")
+    status_dist_data = page_data('delivery_status')
     if not status_dist_data.empty:
-        # Tingkatkan ukuran figure untuk memberikan ruang lebih
-        fig, ax = plt.subplots(figsize=(10, 7))  # Tinggi ditambah dari 6 ke 7
-        
-        # Urutkan status pengiriman secara logis
-        delivery_status_order = ['Very Early (>3 days)', 'Early (1-3 days)', 'On Time (±1 day)', 
-                                'Late (1-3 days)', 'Very Late (>3 days)']
-        
-        # Buat categorical type dengan urutan yang benar
-        status_dist_data['x'] = pd.Categorical(
-            status_dist_data['x'], 
-            categories=delivery_status_order,
-            ordered=True
-        )
-        
-        # Urutkan data
-        status_dist_data = status_dist_data.sort_values('x')
-        
-        # Plot bar chart
-        bars = sns.barplot(x='x', y='value', data=status_dist_data, ax=ax)
-        
-        # Dapatkan nilai maksimum untuk mengatur batas y
-        max_value = status_dist_data['value'].max()
-        
-        # Tambahkan label persentase dan jumlah di atas bar
-        for i, p in enumerate(ax.patches):
-            note = status_dist_data.iloc[i]['note']
-            count = note.split('=')[1] if '=' in note else ''
-            percentage = status_dist_data.iloc[i]['value']
-            
-            # Sesuaikan posisi vertikal anotasi
-            ax.annotate(f'{percentage:.1f}%\n({count})', 
-                        (p.get_x() + p.get_width() / 2., p.get_height()), 
-                        ha='center', va='bottom', fontsize=10,
-                        xytext=(0, 3),  # Kurangi jarak vertikal
-                        textcoords='offset points')
-        
-        # Atur batas sumbu y dengan ruang tambahan di atas
-        plt.ylim(0, max_value * 1.25)  # Tambahkan 25% ruang di atas nilai maksimum
-        
-        plt.title('Distribusi Status Ketepatan Pengiriman', fontsize=14, pad=15)  # Tambahkan padding pada judul
-        plt.xlabel('Status Pengiriman', fontsize=12)
-        plt.ylabel('Persentase (%)', fontsize=12)
-        plt.xticks(rotation=20)
-        plt.grid(axis='y', linestyle='--', alpha=0.3)
-        
-        # Tambahkan padding di sekitar plot
-        plt.tight_layout(pad=2.0)
-        
-        st.pyplot(fig)
+        show_chart('status_distribution', 'draw_status_distribution', status_dist_data)
 
-        
     # 6. Kategori produk dengan rating terendah dan waktu pengiriman terlama
     st.header("6. Kategori Produk dengan Rating Terendah dan Waktu Pengiriman Terlama")
-    rating_data = get_chart_data('worst_categories', 'rating')
-    delivery_data = get_chart_data('worst_categories', 'delivery_time')
-    
-    if not rating_data.empty and not delivery_data.empty:
-        # Gabungkan data
-        worst_categories = pd.merge(
-            rating_data, 
-            delivery_data, 
-            on='x', 
-            suffixes=('_rating', '_delivery')
-        )
-        
-        fig, ax1 = plt.subplots(figsize=(14, 8))
-        
-        # Plot rating pada sumbu y kiri
-        color = 'tab:blue'
-        ax1.set_xlabel('Kategori Produk', fontsize=12)
-        ax1.set_ylabel('Rating Rata-rata', fontsize=12, color=color)
-        bars = ax1.barh(worst_categories['x'], 
-                       worst_categories['value_rating'], color=color, alpha=0.7)
-        ax1.tick_params(axis='y', labelsize=10)
-        ax1.set_xlim(3.5, 5.0)  # Sesuaikan untuk menunjukkan perbedaan dengan jelas
-        
-        # Tambahkan nilai rating pada bar
-        for i, bar in enumerate(bars):
-            ax1.text(bar.get_width() + 0.05, bar.get_y() + bar.get_height()/2, 
-                     f"{worst_categories['value_rating'].iloc[i]:.2f}", 
-                     va='center', fontsize=9)
-        
-        # Plot waktu pengiriman pada sumbu y kanan
-        ax2 = ax1.twiny()
-        color = 'tab:red'
-        ax2.set_xlabel('Waktu Pengiriman (hari)', fontsize=12, color=color)
-        ax2.tick_params(axis='x', labelcolor=color)
-        ax2.set_xlim(0, 20)  # Sesuaikan berdasarkan data
-        
-        # Plot waktu pengiriman sebagai titik
-        for i, (_, row) in enumerate(worst_categories.iterrows()):
-            ax2.scatter(row['value_delivery'], i, color=color, s=100, zorder=3)
-            ax2.text(row['value_delivery'] + 0.5, i, 
-                     f"{row['value_delivery']:.1f} hari", 
-                     va='center', color=color, fontsize=9)
-        
-        plt.title('10 Kategori Produk dengan Rating Terendah', fontsize=14)
-        plt.tight_layout()
-        
-        st.pyplot(fig)
+    worst_categories = page_data('worst_categories')
+    if not worst_categories.empty:
+        show_chart('worst_categories', 'draw_worst_categories', worst_categories)
         
         st.markdown("""
         **Insight:**
@@ -282,60 +303,10 @@ if page == "Delivery & Rating Analysis":
     
     # 7. Tren rating bulanan dan proyeksi target
     st.header("7. Tren Rating Bulanan dan Proyeksi Target")
-    trend_data = get_chart_data('monthly_ratings')
-    proj_data = get_chart_data('monthly_ratings_projection')
-    
+    trend_data = page_data('monthly_ratings')
     if not trend_data.empty:
-        fig, ax = plt.subplots(figsize=(14, 6))
-        
-        # Pastikan bulan diurutkan secara kronologis
-        trend_data['order_month_dt'] = pd.to_datetime(trend_data['x'], format='%Y-%m')
-        trend_data = trend_data.sort_values('order_month_dt')
-        
-        # Plot tren rating bulanan
-        ax = sns.lineplot(x='x', y='value', data=trend_data, 
-                         marker='o', markersize=10, linewidth=2)
-        
-        # Tambahkan nilai di atas titik
-        for i, row in enumerate(trend_data.itertuples()):
-            ax.text(i, row.value + 0.02, f'{row.value:.3f}', ha='center', fontsize=10)
-        
-        # Tambahkan proyeksi untuk 3 bulan ke depan (90 hari)
-        if not proj_data.empty:
-            current_data = proj_data[proj_data['subchart'] == 'current']
-            target_data = proj_data[proj_data['subchart'] == 'target']
-            
-            if not current_data.empty and not target_data.empty:
-                last_rating = current_data['value'].values[0]
-                target_rating = target_data['value'].values[0]
-                
-                # Tambahkan bulan proyeksi ke sumbu x
-                all_months = list(trend_data['x']) + [target_data['x'].values[0]]
-                plt.xticks(range(len(all_months)), all_months, rotation=45)
-                
-                # Gambar garis proyeksi
-                x_current = len(trend_data) - 1
-                x_target = len(trend_data)  # 90 hari ≈ 3 bulan
-                plt.plot([x_current, x_target], [last_rating, target_rating], 'r--', linewidth=2)
-                
-                # Tambahkan anotasi target
-                plt.scatter(x_target, target_rating, color='red', s=100, zorder=5)
-                plt.text(x_target, target_rating + 0.05, f'Target: {target_rating:.2f}', 
-                         color='red', ha='center', fontsize=12, fontweight='bold')
-                
-                # Tambahkan area yang menunjukkan peningkatan 0.5 poin
-                plt.fill_between([x_current, x_target], [last_rating, last_rating], 
-                                [last_rating, target_rating], color='red', alpha=0.1)
-                plt.text((x_current + x_target)/2, (last_rating + target_rating)/2 - 0.05, 
-                         '+0.5 poin', color='red', ha='center', fontsize=10)
-        
-        plt.title('Tren Rata-rata Rating Review per Bulan dan Target 90 Hari', fontsize=14)
-        plt.xlabel('Bulan', fontsize=12)
-        plt.ylabel('Rata-rata Rating', fontsize=12)
-        plt.ylim(4.0, 5.0)  # Sesuaikan untuk melihat perbedaan dengan jelas
-        plt.grid(True, linestyle='--', alpha=0.3)
-        
-        st.pyplot(fig)
+        show_chart('monthly_ratings', 'draw_monthly_ratings', trend_data,
+                   page_data('delivery_summary'))
         
         st.markdown("""
         **Strategi untuk Meningkatkan Rating 0.5 Poin dalam 90 Hari:**
@@ -349,369 +320,146 @@ if page == "Delivery & Rating Analysis":
 elif page == "Repurchase Analysis":
     st.title("Analisis Pembelian Ulang Setelah Review Negatif")
     st.markdown("Analisis persentase pelanggan yang memberikan review negatif (1-2 bintang) namun melakukan pembelian kembali dalam 30 hari, dan strategi untuk meningkatkan tingkat pembelian ulang.")
+    if active_filters is not None:
+        st.caption(describe_filters(active_filters))
+    repurchase_summary = page_data('repurchase_summary')
+    if active_filters is not None and repurchase_summary['total_negative_reviews'].iloc[0] == 0:
+        st.warning("Tidak ada review negatif yang cocok dengan filter ini.")
+        st.stop()
     
     # 8. Persentase pembelian ulang setelah review negatif (pie chart)
     st.header("1. Persentase Pembelian Ulang Setelah Review Negatif")
-    pie_data = get_chart_data('repurchase_pie')
-    
-    if not pie_data.empty:
-        repurchase_rate = pie_data[pie_data['x'] == 'repurchase_rate']['value'].values[0]
-        total_negative_reviews = pie_data[pie_data['x'] == 'total_negative_reviews']['value'].values[0]
-        total_repurchase = pie_data[pie_data['x'] == 'total_repurchase']['value'].values[0]
-        
-        fig, ax = plt.subplots(figsize=(10, 6))
-        
-        labels = ['Tidak Repurchase', 'Repurchase ≤30 hari']
-        sizes = [100-repurchase_rate, repurchase_rate]
-        colors = ['#ff9999','#66b3ff']
-        
-        # Buat pie chart dengan proporsi yang akurat
-        ax.pie(sizes, labels=labels, autopct='%1.2f%%', startangle=90, colors=colors,
-               textprops={'fontsize': 12}, wedgeprops={'linewidth': 1, 'edgecolor': 'white'})
-        
-        # Tambahkan jumlah absolut
-        plt.annotate(f'Total review negatif: {int(total_negative_reviews):,}', 
-                     xy=(0.5, 0.05), xycoords='figure fraction', 
-                     ha='center', fontsize=12)
-        plt.annotate(f'Repurchase dalam 30 hari: {int(total_repurchase):,}', 
-                     xy=(0.5, 0.01), xycoords='figure fraction', 
-                     ha='center', fontsize=10)
-        
-        plt.axis('equal') 
-        plt.title('Persentase Pembelian Ulang ≤30 Hari Setelah Review Negatif', 
-                  fontsize=13, 
-                  pad=20) 
-        
-        st.pyplot(fig)
+    if not repurchase_summary.empty:
+        repurchase_rate = repurchase_summary['repurchase_rate'].iloc[0]
+        rate_low = repurchase_summary['repurchase_rate_boot_low'].iloc[0]
+        rate_high = repurchase_summary['repurchase_rate_boot_high'].iloc[0]
+        total_negative_reviews = repurchase_summary['total_negative_reviews'].iloc[0]
+        total_repurchase = repurchase_summary['total_repurchase'].iloc[0]
+        show_chart('repurchase_pie', 'draw_repurchase_pie', repurchase_summary)
         
         st.markdown(f"""
         **Insight:**
-        - Hanya **{repurchase_rate:.2f}%** pelanggan yang memberikan review negatif melakukan pembelian ulang dalam 30 hari.
+        - Hanya **{repurchase_rate:.2f}%** pelanggan yang memberikan review negatif melakukan pembelian ulang dalam 30 hari (interval kepercayaan 95%: {rate_low:.2f}%-{rate_high:.2f}%).
         - Dari total {int(total_negative_reviews):,} review negatif, hanya {int(total_repurchase):,} yang melakukan pembelian ulang.
         - Ini menunjukkan bahwa sebagian besar pelanggan yang kecewa cenderung tidak kembali dalam jangka pendek.
         """)
     
-   # 9. Pembelian ulang berdasarkan rating negatif
+    # 9. Pembelian ulang berdasarkan rating negatif
     st.header("2. Pembelian Ulang Berdasarkan Rating Negatif")
-    rating_data = get_chart_data('repurchase_by_rating')
-
+    rating_data = page_data('repurchase_by_rating')
     if not rating_data.empty:
-        # Tingkatkan ukuran figure untuk memberikan ruang lebih
-        fig, ax = plt.subplots(figsize=(10, 7))
-        
-        # Plot bar chart
-        bars = sns.barplot(x='x', y='value', data=rating_data, ax=ax)
-        
-        # Dapatkan nilai maksimum untuk mengatur batas y
-        max_value = rating_data['value'].max()
-        
-        # Tambahkan nilai persentase dan jumlah di atas bar
-        for i, p in enumerate(ax.patches):
-            note = rating_data.iloc[i]['note']
-            percentage = rating_data.iloc[i]['value']
-            
-            # Sesuaikan posisi vertikal anotasi (kurangi jarak dari bar)
-            ax.annotate(f'{percentage:.2f}%\n({note})', 
-                        (p.get_x() + p.get_width() / 2., p.get_height()), 
-                        ha='center', va='bottom', fontsize=11,
-                        xytext=(0, 5),  # Kurangi jarak vertikal
-                        textcoords='offset points')
-        
-        # Atur batas sumbu y dengan ruang tambahan di atas
-        plt.ylim(0, max_value * 1.25)  # Tambahkan 25% ruang di atas nilai maksimum
-        
-        plt.title('Persentase Repurchase ≤30 Hari per Rating Negatif', fontsize=14, pad=20)  # Tambahkan padding pada judul
-        plt.xlabel('Rating Review', fontsize=12)
-        plt.ylabel('Persentase Repurchase (%)', fontsize=12)
-        plt.grid(axis='y', linestyle='--', alpha=0.3)
-        
-        # Tambahkan padding di bagian atas
-        plt.tight_layout(pad=3.0)
-        
-        st.pyplot(fig)
+        show_chart('repurchase_by_rating', 'draw_repurchase_by_rating', rating_data)
 
-    
     # 10. Distribusi waktu hingga pembelian ulang
     st.header("3. Distribusi Waktu Hingga Pembelian Ulang")
-    dist_data = get_chart_data('repurchase_time_distribution', '')
-    median_data = get_chart_data('repurchase_time_distribution', 'median')
+    show_chart('repurchase_time_distribution', 'draw_repurchase_time_distribution',
+               page_data('repurchase_time_distribution'), repurchase_summary['median_days_to_repurchase'].iloc[0])
 
-    if not dist_data.empty:
-        # Tingkatkan ukuran figure untuk memberikan ruang lebih
-        fig, ax = plt.subplots(figsize=(12, 7))  # Tinggi ditambah dari 6 ke 7
-        
-        # Plot histogram dengan persentase
-        bars = sns.barplot(x='x', y='value', data=dist_data, ax=ax)
-        
-        # Dapatkan nilai maksimum untuk mengatur batas y
-        max_value = dist_data['value'].max()
-        
-        # Tambahkan label persentase dan jumlah di atas bar
-        for i, p in enumerate(ax.patches):
-            note = dist_data.iloc[i]['note']
-            count = note.split('=')[1] if '=' in note else ''
-            percentage = dist_data.iloc[i]['value']
-            
-            # Sesuaikan posisi vertikal anotasi
-            ax.annotate(f'{percentage:.1f}%\n({count})', 
-                        (p.get_x() + p.get_width() / 2., p.get_height()), 
-                        ha='center', va='bottom', fontsize=10,
-                        xytext=(0, 3),  # Kurangi jarak vertikal
-                        textcoords='offset points')
-        
-        # Atur batas sumbu y dengan ruang tambahan di atas
-        plt.ylim(0, max_value * 1.3)  # Tambahkan 30% ruang di atas nilai maksimum
-        
-        # Tambahkan garis median jika tersedia
-        if not median_data.empty:
-            median_val = median_data['value'].values[0]
-            
-            # Cari bin yang berisi median
-            bin_edges = [0, 5, 10, 15, 20, 25, 30]
-            for i, (bin_start, bin_end) in enumerate(zip(bin_edges[:-1], bin_edges[1:])):
-                if bin_start <= median_val < bin_end:
-                    median_bin_index = i
-                    break
-            
-            plt.axvline(x=median_bin_index, color='red', linestyle='--', linewidth=2)
-            # Sesuaikan posisi teks median
-            plt.text(median_bin_index-0.2, plt.ylim()[1]*0.85, f'Median: {median_val:.1f} hari', 
-                    color='red', fontsize=12, ha='right')
-    
-    # Tambahkan padding pada judul
-    plt.title('Distribusi Waktu Selama 30 Hari Hingga Pembelian Ulang Setelah Review Negatif', 
-              fontsize=14, pad=20)
-    plt.xlabel('Hari Hingga Pembelian Ulang', fontsize=12)
-    plt.ylabel('Persentase (%)', fontsize=12)
-    plt.grid(axis='y', linestyle='--', alpha=0.3)
-    
-    # Tambahkan padding di sekitar plot
-    plt.tight_layout(pad=3.0)
-    
-    st.pyplot(fig)
-
-    
     # 11. Kategori produk dengan repurchase tertinggi setelah review negatif selama 30 hari
     st.header("4. Kategori Produk dengan Repurchase Tertinggi Setelah Review Negatif")
-    top_data = get_chart_data('top_repurchase_categories')
-    
+    top_data = page_data('top_repurchase_categories')
     if not top_data.empty:
-        fig, ax = plt.subplots(figsize=(14, 8))
-        
-        # Plot bar chart
-        bars = sns.barplot(x='value', y='x', data=top_data, ax=ax)
-        
-        # Tambahkan nilai persentase dan jumlah di samping bar
-        for i, p in enumerate(ax.patches):
-            note = top_data.iloc[i]['note']
-            percentage = top_data.iloc[i]['value']
-            
-            ax.annotate(f'{percentage:.1f}% ({note})', 
-                        (p.get_width() + 1, p.get_y() + p.get_height()/2), 
-                        va = 'center', fontsize=10)
-        
-        plt.title('10 Kategori Produk dengan Repurchase Tertinggi Setelah Review Negatif Selama 30 Hari', fontsize=14)
-        plt.xlabel('Persentase Repurchase (%)', fontsize=12)
-        plt.ylabel('Kategori Produk', fontsize=12)
-        plt.xlim(0, top_data['value'].max() * 1.3)  # Berikan ruang untuk anotasi
-        plt.grid(axis='x', linestyle='--', alpha=0.3)
-        
-        st.pyplot(fig)
+        show_chart('top_repurchase_categories', 'draw_top_repurchase_categories', top_data)
     
     # 12. Perbandingan persentase review negatif vs tingkat repurchase per kategori
     st.header("5. Perbandingan Review Negatif vs Repurchase per Kategori")
-    rep_data = get_chart_data('category_comparison', 'repurchase_percentage')
-    neg_data = get_chart_data('category_comparison', 'negative_review_pct')
+    comparison = page_data('category_comparison')
+    if not comparison.empty:
+        show_chart('category_comparison', 'draw_category_comparison', comparison)
     
-    if not rep_data.empty and not neg_data.empty:
-        # Gabungkan data
-        comparison = pd.merge(
-            rep_data,
-            neg_data,
-            on='x',
-            suffixes=('_rep', '_neg')
-        )
-        
-        fig, ax = plt.subplots(figsize=(14, 9))
-        
-        # Gunakan warna yang jelas dan mudah dibedakan
-        repurchase_color = '#4285F4'  # Biru Google
-        negative_color = '#EA4335'    # Merah Google
-        
-        # Buat plot batang horizontal untuk repurchase percentage
-        bars = ax.barh(
-            y=comparison['x'],
-            width=comparison['value_rep'],
-            height=0.6,  # Bar lebih tebal
-            color=repurchase_color,
-            alpha=0.8,
-            label='Pembelian Ulang'
-        )
-        
-        # Tambahkan nilai pada setiap bar
-        for i, bar in enumerate(bars):
-            width = bar.get_width()
-            ax.text(
-                width + 0.5,
-                bar.get_y() + bar.get_height()/2,
-                f'{width:.1f}%',
-                va='center',
-                fontsize=11,
-                color='black',
-                fontweight='bold'
-            )
-        
-        # Tambahkan grid horizontal untuk memudahkan pembacaan
-        ax.grid(axis='x', linestyle='--', alpha=0.3)
-        
-        # Buat sumbu kedua untuk persentase review negatif
-        ax2 = ax.twiny()
-        
-        # Plot persentase review negatif sebagai titik merah dengan ukuran lebih besar
-        for i, (_, row) in enumerate(comparison.iterrows()):
-            # Khusus untuk watches_gift, sesuaikan posisi y agar tidak tumpang tindih
-            y_offset = 0
-            if row['x'] == 'watches_gifts':
-                y_offset = 0.25  # Geser ke atas
-            
-            ax2.scatter(
-                row['value_neg'], 
-                i + y_offset,  # Tambahkan offset untuk watches_gift
-                color=negative_color,
-                s=150,  # Ukuran titik lebih besar
-                marker='o',
-                edgecolor='white',
-                linewidth=1.5,
-                alpha=0.9,
-                label='Review Negatif' if i == 0 else ""
-            )
-            
-            # Tambahkan label nilai di dekat titik
-            ax2.text(
-                row['value_neg'] + 2,
-                i + y_offset,
-                f'{row["value_neg"]:.1f}%',
-                va='center',
-                fontsize=11,
-                color='black',
-                fontweight='bold'
-            )
-        
-        # Atur batas sumbu x untuk kedua sumbu
-        max_repurchase = comparison['value_rep'].max()
-        ax.set_xlim(0, max_repurchase * 1.2)
-        
-        max_negative = comparison['value_neg'].max()
-        ax2.set_xlim(0, max(50, max_negative * 1.2))  # Batasi maksimum 50% untuk fokus pada data
+    # 13. Proyeksi peningkatan repurchase sebesar 25%
+    st.header("6. Proyeksi Peningkatan Repurchase 25% (Next Quarter)")
+    if not repurchase_summary.empty:
+        show_chart('repurchase_projection', 'draw_repurchase_projection', repurchase_summary)
         
-        # Tambahkan label sumbu yang jelas dengan font lebih besar
-        ax.set_xlabel('Persentase Pelanggan yang Kembali Berbelanja (%)', fontsize=14, fontweight='bold')
-        ax.set_ylabel('Kategori Produk', fontsize=14, fontweight='bold')
-        ax2.set_xlabel('Persentase Review Negatif (%)', fontsize=14, fontweight='bold', color=negative_color)
+        st.markdown("""
+        **Strategi untuk Meningkatkan Tingkat Pembelian Ulang 25% dalam Kuartal Berikutnya:**
         
-        # Perbesar ukuran font pada sumbu y
-        ax.tick_params(axis='y', labelsize=12)
-        ax.tick_params(axis='x', labelsize=12)
-        ax2.tick_params(axis='x', labelsize=12, colors=negative_color)
+        1. **Follow-up Personal**: Hubungi pelanggan yang memberikan review negatif untuk menyelesaikan masalah mereka.
         
-        # Tambahkan judul yang informatif dan sederhana
-        plt.suptitle('Pelanggan yang Kembali Berbelanja vs Review Negatif', fontsize=18, y=0.98, fontweight='bold')
-        plt.title('Berdasarkan Kategori Produk (30 Hari Terakhir)', fontsize=14)
+        2. **Program Insentif**: Tawarkan voucher atau diskon khusus kepada pelanggan yang memberikan review negatif.
         
-        # Tambahkan legenda
-        handles = [
-            plt.Rectangle((0,0), 1, 1, color=repurchase_color, alpha=0.8),
-            plt.Line2D([0], [0], marker='o', color='w', markerfacecolor=negative_color, markersize=12)
-        ]
-        labels = ['Persentase Pelanggan yang Kembali Berbelanja', 'Persentase Review Negatif']
+        3. **Perbaikan Kategori Bermasalah**: Fokus pada kategori produk dengan tingkat review negatif tinggi dan repurchase rendah.
         
-        # Posisikan legenda di bawah grafik
-        legend = ax.legend(handles, labels, 
-                          loc='upper center', 
-                          bbox_to_anchor=(0.5, -0.15),  # Posisi di bawah grafik
-                          frameon=True, 
-                          framealpha=0.9, 
-                          fontsize=12,
-                          ncol=2)  # Tampilkan dalam 2 kolom
-        legend.get_frame().set_edgecolor('lightgray')
+        4. **Pelatihan Seller**: Edukasi seller tentang pentingnya layanan pelanggan dan penanganan keluhan.
         
-        plt.tight_layout(rect=[0, 0.05, 1, 0.95])
+        5. **Sistem Penanganan Keluhan**: Tingkatkan kecepatan dan kualitas respons terhadap keluhan pelanggan.
         
-        st.pyplot(fig)
-    
-    # 13. Proyeksi peningkatan repurchase sebesar 25%
-    st.header("6. Proyeksi Peningkatan Repurchase 25% (Next Quarter)")
-    proj_data = get_chart_data('repurchase_projection')
-    
-    if not proj_data.empty:
-        current_data = proj_data[proj_data['x'] == 'current']
-        target_data = proj_data[proj_data['x'] == 'target']
+        6. **Program Loyalitas**: Implementasikan program loyalitas khusus untuk pelanggan yang pernah kecewa.
         
-        if not current_data.empty and not target_data.empty:
-            current_repurchase_rate = current_data['value'].values[0]
-            target_repurchase_rate = target_data['value'].values[0]
-            
-            fig, ax = plt.subplots(figsize=(10, 6))
-            
-            # Data untuk visualisasi
-            quarters = ['Current', 'Target (Next Quarter)']
-            rates = [current_repurchase_rate, target_repurchase_rate]
-            
-            # Plot bar chart
-            bars = ax.bar(quarters, rates)
-            
-            # Tambahkan nilai di atas bar dengan offset ke atas
-            for i, p in enumerate(bars):
-                height = p.get_height()
-                note = proj_data.iloc[i]['note']
-                
-                # Tambahkan offset ke atas
-                y_offset = target_repurchase_rate * 0.05
-                
-                ax.annotate(f'{height:.2f}%\n{note}', 
-                            (p.get_x() + p.get_width() / 2., height + y_offset),
-                            ha='center', va='bottom', fontsize=11)
-            
-            # Tambahkan panah dan teks untuk menunjukkan peningkatan
-            plt.annotate('', xy=(1, target_repurchase_rate), xytext=(0, current_repurchase_rate),
-                         arrowprops=dict(arrowstyle='->', color='red', lw=2))
-            
-            # Posisikan teks peningkatan
-            mid_y = (current_repurchase_rate + target_repurchase_rate)/2
-            y_offset_original = (target_repurchase_rate - current_repurchase_rate) * 0.05
-            additional_y_offset = (target_repurchase_rate - current_repurchase_rate) * 0.05
-            x_adjustment = 0.07
-            
-            plt.text(0.5 - 0.2 + x_adjustment, mid_y + y_offset_original + additional_y_offset, 
-                     f'+25%\n(+{int(total_negative_reviews * current_repurchase_rate * 0.25 / 100):,} pelanggan)', 
-                     color='green', ha='center', fontsize=12, fontweight='bold')
-            
-            plt.title('Target Peningkatan Tingkat Pembelian Ulang Sebesar 25% dalam Kuartal Berikutnya', fontsize=14)
-            plt.xlabel('Periode', fontsize=12)
-            plt.ylabel('Persentase Pembelian Ulang (%)', fontsize=12)
-            plt.ylim(0, target_repurchase_rate * 1.3)  # Berikan ruang untuk anotasi
-            plt.grid(axis='y', linestyle='--', alpha=0.3)
-            
-            st.pyplot(fig)
-            
-            st.markdown("""
-            **Strategi untuk Meningkatkan Tingkat Pembelian Ulang 25% dalam Kuartal Berikutnya:**
-            
-            1. **Follow-up Personal**: Hubungi pelanggan yang memberikan review negatif untuk menyelesaikan masalah mereka.
-            
-            2. **Program Insentif**: Tawarkan voucher atau diskon khusus kepada pelanggan yang memberikan review negatif.
-            
-            3. **Perbaikan Kategori Bermasalah**: Fokus pada kategori produk dengan tingkat review negatif tinggi dan repurchase rendah.
-            
-            4. **Pelatihan Seller**: Edukasi seller tentang pentingnya layanan pelanggan dan penanganan keluhan.
-            
-            5. **Sistem Penanganan Keluhan**: Tingkatkan kecepatan dan kualitas respons terhadap keluhan pelanggan.
-            
-            6. **Program Loyalitas**: Implementasikan program loyalitas khusus untuk pelanggan yang pernah kecewa.
-            
-            7. **Monitoring Berkala**: Pantau dan evaluasi hasil secara bulanan untuk memastikan target peningkatan tercapai.
-            """)
+        7. **Monitoring Berkala**: Pantau dan evaluasi hasil secara bulanan untuk memastikan target peningkatan tercapai.
+        """)
+
+elif page == "Geographic Analysis":
+    st.title("Analisis Geografis per State")
+    st.markdown("Perbandingan waktu pengiriman, rating, dan pembelian ulang antar state pelanggan di Brazil.")
+
+    # 1. Peta choropleth metrik per state
+    st.header("1. Peta Metrik per State")
+    metric = st.selectbox("Pilih metrik:", list(STATE_METRICS))
+    state_values = get_state_values(metric)
+    if load_state_geometries() is None:
+        st.info("Geometri state belum dibuat; jalankan `python -m olist geometries` untuk menampilkan peta.")
+        if not state_values.dropna().empty:
+            cmap = STATE_METRICS[metric][2]
+            show_chart(f'state_metric_{metric}', 'draw_state_metric', state_values, metric, cmap)
+    else:
+        import pydeck as pdk
+
+        layer = pdk.Layer(
+            'GeoJsonLayer',
+            state_choropleth(metric, data_version.version),
+            get_fill_color='properties.fill_color',
+            get_line_color=[255, 255, 255],
+            line_width_min_pixels=1,
+            pickable=True,
+            auto_highlight=True
+        )
+        with instrument.span('st.pydeck_chart', chart='state_map', category='streamlit'):
+            st.pydeck_chart(pdk.Deck(
+                layers=[layer],
+                initial_view_state=pdk.ViewState(latitude=-14.2, longitude=-51.9, zoom=3.2),
+                tooltip={'text': '{name} ({state}): {value_label}'},
+                map_style=None
+            ))
+
+    # 2. Kategori bermasalah per state
+    st.header("2. Kategori Bermasalah per State")
+    problematic = get_chart_data('problematic_categories')
+    if not problematic.empty:
+        states = sorted(problematic['customer_state'].unique())
+        selected = st.multiselect("Filter state:", states)
+        if selected:
+            problematic = problematic[problematic['customer_state'].isin(selected)]
+        st.dataframe(problematic.sort_values(['customer_state', 'avg_rating']), hide_index=True, width='stretch')
+        st.markdown("_Kategori bermasalah: rating rata-rata < 3.5 dan tingkat repurchase 30 hari < 10% (minimal 10 review) di state tersebut._")
+
+    # 3. Performa seller: jarak seller -> pelanggan dan leaderboard ketepatan waktu
+    st.header("3. Performa Seller")
+    seller_distance = get_chart_data('seller_distance')
+    leaderboard = get_chart_data('seller_leaderboard')
+    # Chart seller (matplotlib) hanya dirender jika dibuka, jadi cold start halaman ini tidak meng-import matplotlib
+    if (not seller_distance.empty or not leaderboard.empty) and st.toggle("Tampilkan chart performa seller"):
+        if not seller_distance.empty:
+            show_chart('seller_distance', 'draw_seller_distance', seller_distance)
+        if not leaderboard.empty:
+            show_chart('seller_leaderboard', 'draw_seller_leaderboard', leaderboard)
+    if not leaderboard.empty:
+        with st.expander("Detail leaderboard"):
+            st.dataframe(leaderboard, hide_index=True, width='stretch')
+        st.markdown(f"_Tepat waktu: diterima paling lambat 1 hari setelah estimasi. Keterlambatan rata-rata "
+                    f"menghitung 0 hari untuk item yang tepat waktu. Hanya seller dengan minimal "
+                    f"{MIN_SELLER_ITEMS} item terkirim._")
+    elif seller_distance.empty:
+        st.info("Data performa seller belum ada; jalankan ulang `python -m olist build`.")
+
+# Isi placeholder chart sesuai urutan selesainya render
+with instrument.span('render_wait', category='chart'):
+    page_charts.wait()
 
 # Footer
 st.markdown("---")
-st.markdown("Dashboard created by Hammam Alfarisy | E-Commerce Public Dataset Analysis")
\ No newline at end of file
+st.markdown("Dashboard created by Hammam Alfarisy | E-Commerce Public Dataset Analysis")
+
+if rerun_mark is not None:
+    show_instrumentation(rerun_mark)
@@ -0,0 +1,5 @@
+"""Pipeline analisis E-Commerce Public Dataset (Olist) yang dapat diimpor.
+
+Menggantikan eksekusi notebook.ipynb dari atas ke bawah untuk menghasilkan
+data dashboard (main_data.csv dan delivery_review_df.csv).
+"""
@@ -0,0 +1,189 @@
+"""CLI pipeline: `python -m olist build` dari direktori utama proyek."""
+import argparse
+import sys
+from pathlib import Path
+
+from . import stages  # noqa: F401  (mendaftarkan semua tahapan)
+from . import bench, export, geo, incremental, instrument, query, startup, static_export, store, synth
+from .graph import STAGES, Pipeline
+from .paths import BUILD_DIR, DASHBOARD_DIR, DATA_DIR, SHAPEFILE, STATE_GEOJSON
+
+
+def make_pipeline(args):
+    return Pipeline(args.data_dir, args.out_dir, args.cache_dir)
+
+
+def cmd_build(args):
+    rebuilt = make_pipeline(args).run(targets=args.stage or None, force=args.force)
+    print(f"{len(rebuilt)} tahapan dihitung ulang")
+    # Filter dashboard (olist/query.py) juga membaca tabel yang tidak dipakai tahapan mana pun (order_payments)
+    converted = store.convert_all(args.data_dir, names=query.QUERY_TABLES + query.OPTIONAL_QUERY_TABLES,
+                                  log=lambda line: None)
+    if converted:
+        print(f"{len(converted)} tabel dikonversi untuk filter dashboard")
+
+
+def cmd_status(args):
+    for name, fresh in make_pipeline(args).status(targets=args.stage or None):
+        print(f"{'fresh' if fresh else 'stale':6} {name}")
+
+
+def cmd_convert(args):
+    converted = store.convert_all(args.data_dir, force=args.force)
+    print(f"{len(converted)} tabel dikonversi ke {store.parquet_path('orders', args.data_dir).parent}")
+
+
+def cmd_geometries(args):
+    path = geo.write_state_geometries(args.output, args.shapefile, args.tolerance)
+    print(f"Geometri state ditulis ke {path} ({path.stat().st_size / 1024:.0f} KB)")
+
+
+def cmd_ingest(args):
+    if args.init:
+        result = incremental.init_state(args.data_dir, args.state_dir)
+        print(f"State inkremental dibangun di {args.state_dir}: {result}")
+    for batch_dir in args.batch:
+        result = incremental.ingest_batch(batch_dir, args.out_dir, args.state_dir)
+        print(f"{batch_dir}: {result}")
+
+
+def cmd_startup(args):
+    report = startup.measure_startup(args.page or None, args.out_dir, args.runs)
+    for row in report:
+        budget = f"{row['budget']:.1f}s" if row['budget'] is not None else '-'
+        modules = ', '.join(row['modules']) or '-'
+        print(f"{'ok' if row['ok'] else 'LEWAT':6} {row['page']:28} {row['seconds']:6.2f}s  budget {budget:6} modul: {modules}")
+    return 0 if all(row['ok'] for row in report) else 1
+
+
+def cmd_check_filters(args):
+    engine = query.QueryEngine(args.data_dir)
+    report = query.check_build(engine, Path(args.out_dir) / export.CHART_DIR_NAME)
+    for row in report:
+        print(f"{'ok' if row['ok'] else 'BEDA':6} {row['filters']:16} {row['key']:28} {row['detail']}")
+    return 0 if all(row['ok'] for row in report) else 1
+
+
+def cmd_export_static(args):
+    manifest = static_export.export_site(args.out_dir, args.site_dir, args.page or None, force=args.force)
+    print(f"Ekspor statis di {args.site_dir}: {len(manifest['pages'])} halaman, {len(manifest['files'])} file")
+
+
+def cmd_synth(args):
+    manifest = synth.generate(args.output, args.scale, args.seed)
+    rows = ', '.join(f"{name} {count:,}" for name, count in sorted(manifest['rows'].items()))
+    print(f"Data sintetis {args.scale:g}x ditulis ke {args.output}: {rows}")
+
+
+def _format_metric(field, value):
+    return f"{value:,.3f}" if field == 'seconds' else f"{value:,.0f}"
+
+
+def cmd_bench(args):
+    regressed = False
+    for scale in args.scale or [1.0]:
+        result = bench.run_benchmark(scale, args.seed, args.runs, pages=() if args.no_pages else None,
+                                     bench_dir=args.output)
+        print(f"Hasil skala {scale:g}x ditulis ke {bench.write_result(result, args.output)}")
+        for metric, values in result['metrics'].items():
+            fields = '  '.join(f"{field} {_format_metric(field, values[field])}"
+                               for field in bench.METRIC_FIELDS if values.get(field) is not None)
+            print(f"  {metric:36} {fields}")
+        if args.compare:
+            for row in bench.compare(bench.load_result(args.compare), result, args.threshold):
+                flag = 'REGRESI' if row['regressed'] else ''
+                before, after = (_format_metric(row['field'], row[key]) for key in ('before', 'after'))
+                print(f"  {row['metric']:36} {row['field']:10} {before:>14} -> {after:>14}  x{row['ratio']:.2f} {flag}")
+                regressed |= row['regressed']
+    return 1 if regressed else 0
+
+
+def cmd_stages(args):
+    for name, st in STAGES.items():
+        deps = ', '.join(st.deps + st.files) or '-'
+        print(f"{name:22} <- {deps}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m olist', description=__doc__)
+    parser.add_argument('--data-dir', default=DATA_DIR, help='direktori CSV mentah (default: data/)')
+    parser.add_argument('--out-dir', default=DASHBOARD_DIR, help='direktori output dashboard (default: dashboard/)')
+    parser.add_argument('--cache-dir', default=BUILD_DIR / 'cache', help='direktori cache tahapan (default: build/cache)')
+    parser.add_argument('--trace', help='tulis span waktu/memori setiap tahapan sebagai JSON Chrome trace ke file ini')
+    parser.add_argument('--metrics', help='tulis counter span dalam format teks Prometheus ke file ini')
+    parser.add_argument('--no-memory', action='store_true', help='jangan lacak puncak alokasi (tanpa overhead tracemalloc)')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    build = sub.add_parser('build', help='bangun ulang tahapan yang basi')
+    build.add_argument('stage', nargs='*', help='tahapan target (default: semua)')
+    build.add_argument('--force', action='store_true', help='abaikan cache dan hitung ulang semua')
+    build.set_defaults(func=cmd_build)
+
+    status = sub.add_parser('status', help='tampilkan tahapan yang perlu dihitung ulang')
+    status.add_argument('stage', nargs='*', help='tahapan target (default: semua)')
+    status.set_defaults(func=cmd_status)
+
+    convert = sub.add_parser('convert', help='konversi CSV mentah ke store Parquet bertipe')
+    convert.add_argument('--force', action='store_true', help='konversi ulang walaupun Parquet masih segar')
+    convert.set_defaults(func=cmd_convert)
+
+    geometries = sub.add_parser('geometries', help='sederhanakan shapefile state menjadi GeoJSON untuk peta dashboard')
+    geometries.add_argument('--shapefile', default=SHAPEFILE, help='shapefile sumber (default: dashboard/brazil_states_shapefile)')
+    geometries.add_argument('--output', default=STATE_GEOJSON, help='file GeoJSON output (default: dashboard/brazil_states.geojson)')
+    geometries.add_argument('--tolerance', type=float, default=geo.SIMPLIFY_TOLERANCE, help='toleransi penyederhanaan dalam derajat')
+    geometries.set_defaults(func=cmd_geometries)
+
+    ingest = sub.add_parser('ingest', help='proses batch order/review baru secara inkremental')
+    ingest.add_argument('batch', nargs='*', help='direktori batch berisi orders/customers/order_reviews CSV')
+    ingest.add_argument('--init', action='store_true', help='bangun state dari seluruh data di --data-dir lebih dulu')
+    ingest.add_argument('--state-dir', default=incremental.STATE_DIR, help='direktori state inkremental (default: build/incremental)')
+    ingest.set_defaults(func=cmd_ingest)
+
+    startup_cmd = sub.add_parser('startup', help='ukur waktu cold start dashboard per halaman terhadap budget')
+    startup_cmd.add_argument('--page', action='append', choices=list(startup.PAGE_BUDGETS), help='halaman yang diukur (default: semua)')
+    startup_cmd.add_argument('--runs', type=int, default=3, help='jumlah proses baru per halaman (diambil median)')
+    startup_cmd.set_defaults(func=cmd_startup)
+
+    check_cmd = sub.add_parser('check-filters',
+                               help='pastikan query filter dashboard tanpa efek sama dengan tabel kategori hasil build')
+    check_cmd.set_defaults(func=cmd_check_filters)
+
+    export_cmd = sub.add_parser('export-static', help='render semua halaman dashboard menjadi bundle HTML + gambar statis')
+    export_cmd.add_argument('--site-dir', default=static_export.SITE_DIR, help='direktori bundle (default: build/site)')
+    export_cmd.add_argument('--page', action='append', choices=list(static_export.PAGE_FILES), help='halaman yang diekspor (default: semua)')
+    export_cmd.add_argument('--force', action='store_true', help='render ulang walaupun data chart tidak berubah')
+    export_cmd.set_defaults(func=cmd_export_static)
+
+    synth_cmd = sub.add_parser('synth', help='bangkitkan kesembilan CSV Olist sintetis')
+    synth_cmd.add_argument('output', help='direktori output CSV')
+    synth_cmd.add_argument('--scale', type=float, default=1.0, help='faktor skala terhadap ukuran dataset asli (default: 1)')
+    synth_cmd.add_argument('--seed', type=int, default=0, help='seed generator')
+    synth_cmd.set_defaults(func=cmd_synth)
+
+    bench_cmd = sub.add_parser('bench', help='ukur waktu dan memori tahapan pipeline dan halaman dashboard di data sintetis')
+    bench_cmd.add_argument('--scale', type=float, action='append', help='faktor skala data sintetis (bisa diulang, default: 1)')
+    bench_cmd.add_argument('--seed', type=int, default=0, help='seed data sintetis')
+    bench_cmd.add_argument('--runs', type=int, default=3, help='jumlah putaran per pengukuran waktu (diambil median)')
+    bench_cmd.add_argument('--no-pages', action='store_true', help='lewati pengukuran halaman dashboard')
+    bench_cmd.add_argument('--output', default=bench.BENCH_DIR, help='direktori hasil (default: build/bench)')
+    bench_cmd.add_argument('--compare', help='file hasil benchmark sebelumnya sebagai pembanding')
+    bench_cmd.add_argument('--threshold', type=float, default=bench.REGRESSION_THRESHOLD,
+                           help='kenaikan relatif yang dianggap regresi (default: 0.10)')
+    bench_cmd.set_defaults(func=cmd_bench)
+
+    sub.add_parser('stages', help='daftar tahapan dan dependensinya').set_defaults(func=cmd_stages)
+
+    args = parser.parse_args(argv)
+    if args.trace or args.metrics:
+        instrument.enable(memory=not args.no_memory)
+    try:
+        return args.func(args) or 0
+    finally:
+        if args.trace:
+            instrument.write_chrome_trace(args.trace)
+        if args.metrics:
+            instrument.write_prometheus(args.metrics)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""Benchmark pipeline dan dashboard di atas data sintetis berskala.
+
+`run_benchmark` membangkitkan (atau memakai ulang) data `olist.synth` untuk
+sebuah skala, lalu mengukur:
+- konversi CSV -> Parquet (`store.convert_all`)
+- setiap tahapan pipeline, dijalankan berurutan di memori tanpa cache tahapan:
+  median waktu dari beberapa putaran, dan puncak alokasi (tracemalloc) dari
+  satu putaran terpisah agar overhead tracemalloc tidak ikut terukur di waktu
+- cold start setiap halaman dashboard (`olist.startup`) beserta RSS puncaknya
+
+Hasil disimpan sebagai JSON bersama commit git, versi library, dan info mesin,
+sehingga hasil dari dua commit bisa dibandingkan dengan `compare`.
+"""
+import datetime
+import functools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from pathlib import Path
+
+from . import startup, store, synth
+from .graph import STAGES, execution_order
+from .paths import BUILD_DIR, ROOT_DIR
+
+BENCH_DIR = BUILD_DIR / 'bench'
+SYNTH_DIR = BUILD_DIR / 'synth'
+# Kenaikan relatif di atas ambang ini dianggap regresi oleh `compare`
+REGRESSION_THRESHOLD = 0.10
+METRIC_FIELDS = ('seconds', 'peak_bytes', 'max_rss_kb')
+
+
+def git_revision():
+    """Commit HEAD dan apakah working tree berubah; None jika bukan repo git"""
+    def git(*args):
+        return subprocess.run(['git', *args], cwd=ROOT_DIR, capture_output=True, text=True, check=True).stdout.strip()
+
+    try:
+        return {'commit': git('rev-parse', '--short', 'HEAD'),
+                'dirty': bool(git('status', '--porcelain', '--untracked-files=no'))}
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    import numpy
+    import pandas
+    import pyarrow
+
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'numpy': numpy.__version__,
+        'pandas': pandas.__version__,
+        'pyarrow': pyarrow.__version__,
+    }
+
+
+def prepare_data(scale, seed=0, synth_dir=SYNTH_DIR, log=print):
+    """Direktori data sintetis untuk `scale`; dibangkitkan ulang hanya jika belum ada
+    atau dibuat dengan versi generator/seed lain"""
+    data_dir = Path(synth_dir) / f'scale-{scale:g}'
+    manifest = synth.read_manifest(data_dir)
+    if manifest and (manifest['version'], manifest['scale'], manifest['seed']) == (synth.SYNTH_VERSION, scale, seed):
+        log(f"[fresh]   data sintetis {data_dir}")
+        return data_dir, manifest
+    return data_dir, synth.generate(data_dir, scale, seed, log=log)
+
+
+def _timed(thunk):
+    start = time.perf_counter()
+    result = thunk()
+    return result, time.perf_counter() - start
+
+
+def _traced(thunk):
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    result = thunk()
+    return result, tracemalloc.get_traced_memory()[1] - baseline
+
+
+def run_stages(data_dir, out_dir, measure=_timed):
+    """Jalankan semua tahapan berurutan di memori; `measure(thunk)` mengembalikan
+    (hasil, angka) dan angkanya dikumpulkan per tahapan"""
+    values, numbers = {}, {}
+    for name in execution_order():
+        st = STAGES[name]
+        args = [Path(data_dir) / filename for filename in st.files]
+        if st.sink:
+            args.insert(0, Path(out_dir))
+        thunk = functools.partial(st.func, *args, **{dep: values[dep] for dep in st.deps})
+        values[name], numbers[name] = measure(thunk)
+    return numbers
+
+
+def stage_memory(data_dir, out_dir):
+    """Puncak alokasi Python/numpy (byte) per tahapan di atas alokasi sebelum tahapan itu"""
+    tracemalloc.start()
+    try:
+        return run_stages(data_dir, out_dir, _traced)
+    finally:
+        tracemalloc.stop()
+
+
+def run_benchmark(scale=1.0, seed=0, runs=3, pages=None, synth_dir=SYNTH_DIR, bench_dir=BENCH_DIR, log=print):
+    """Ukur konversi, setiap tahapan, dan setiap halaman dashboard (`pages=()` untuk melewati
+    halaman); kembalikan dict hasil yang bisa ditulis dengan `write_result`"""
+    data_dir, manifest = prepare_data(scale, seed, synth_dir, log)
+    out_dir = Path(bench_dir) / f'out-scale-{scale:g}'
+    metrics = {}
+
+    log('[bench]   convert')
+    _, seconds = _timed(lambda: store.convert_all(data_dir, force=True, log=lambda message: None))
+    metrics['convert'] = {'seconds': seconds}
+
+    timings = []
+    for run in range(runs):
+        log(f'[bench]   tahapan pipeline (putaran {run + 1}/{runs})')
+        timings.append(run_stages(data_dir, out_dir))
+    log('[bench]   tahapan pipeline (memori)')
+    memory = stage_memory(data_dir, out_dir)
+    for name in timings[0]:
+        metrics[f'stage/{name}'] = {'seconds': statistics.median(t[name] for t in timings),
+                                    'peak_bytes': memory[name]}
+
+    # Dashboard membaca store Parquet data sintetis, bukan data/ milik repo
+    env = dict(os.environ, OLIST_DATA_DIR=str(Path(data_dir).resolve()))
+    for page in startup.PAGE_BUDGETS if pages is None else pages:
+        log(f'[bench]   halaman {page}')
+        results = [startup.measure_page(page, out_dir, env=env) for _ in range(runs)]
+        metrics[f'page/{page}'] = {'seconds': statistics.median(r['seconds'] for r in results),
+                                   'max_rss_kb': max(r['max_rss_kb'] or 0 for r in results)}
+
+    return {
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'environment': environment(),
+        'synth': manifest,
+        'runs': runs,
+        'metrics': metrics,
+    }
+
+
+def write_result(result, bench_dir=BENCH_DIR):
+    """Simpan hasil sebagai `<commit>-scale-<skala>.json` di `bench_dir`"""
+    revision = result['revision']
+    name = revision['commit'] + ('-dirty' if revision['dirty'] else '') if revision else 'worktree'
+    path = Path(bench_dir) / f"{name}-scale-{result['synth']['scale']:g}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(result, f, indent=1, sort_keys=True)
+    return path
+
+
+def load_result(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(baseline, current, threshold=REGRESSION_THRESHOLD):
+    """Bandingkan dua hasil benchmark: list dict (metric, field, before, after, ratio, regressed)"""
+    keys = ('version', 'scale', 'seed')
+    if [baseline['synth'][k] for k in keys] != [current['synth'][k] for k in keys]:
+        raise ValueError("Hasil benchmark tidak sebanding: data sintetis berbeda "
+                         f"({[baseline['synth'][k] for k in keys]} vs {[current['synth'][k] for k in keys]})")
+    rows = []
+    for metric, values in current['metrics'].items():
+        before = baseline['metrics'].get(metric, {})
+        for field in METRIC_FIELDS:
+            if not before.get(field) or values.get(field) is None:
+                continue
+            ratio = values[field] / before[field]
+            rows.append({'metric': metric, 'field': field, 'before': before[field], 'after': values[field],
+                         'ratio': ratio, 'regressed': ratio > 1 + threshold})
+    return rows
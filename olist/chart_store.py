@@ -0,0 +1,347 @@
+"""Store data chart bertipe untuk dashboard: satu tabel Parquet per kunci chart.
+
+Menggantikan main_data.csv (format panjang chart,subchart,x,y,value,note) sebagai
+sumber dashboard. Setiap kunci punya skema kolom tetap (jumlah sebagai int64,
+bulan sebagai datetime, status pengiriman sebagai categorical berurutan), dan
+`index.json` mencatat versi skema beserta file tiap tabel. `load_charts`
+membaca semuanya sekali menjadi dict {kunci: DataFrame} dan `load_chart` hanya
+satu tabel, sehingga dashboard mengambil data chart tanpa memindai atau
+mem-parsing string.
+
+`delivery_review_df.parquet` ditulis sebagai frame ringkas dengan skema
+`DELIVERY_FRAME_SCHEMA` (hanya kolom yang dipakai dashboard, tipe sekecil
+mungkin), bukan seluruh kolom hasil merge order dan review.
+"""
+import json
+from pathlib import Path
+
+import pandas as pd
+
+from .features import DELIVERY_STATUS_DTYPE
+
+SCHEMA_VERSION = 4
+INDEX_FILE = 'index.json'
+DELIVERY_FRAME_FILE = 'delivery_review_df.parquet'
+
+# Frame per order untuk dashboard; bulan sebagai kode yyyymm (mis. 201808)
+DELIVERY_FRAME_SCHEMA = {
+    'order_month': 'int32',
+    'review_score': 'int8',
+    'delivery_time_days': 'float32',
+    'delivery_accuracy_days': 'float32',
+    'delivery_status': DELIVERY_STATUS_DTYPE,
+}
+REVIEW_SCORES = range(1, 6)
+# Jumlah review per skor (monthly_ratings), cukup untuk bootstrap rata-rata rating
+SCORE_COUNT_COLUMNS = [f'count_{score}' for score in REVIEW_SCORES]
+
+
+def interval_columns(column, method='boot'):
+    """(bawah, atas) kolom interval 95% `column` dengan metode `method`: `boot` (bootstrap
+    persentil), `wilson` (rasio), atau `normal` (rata-rata); lihat olist/uncertainty.py"""
+    return f'{column}_{method}_low', f'{column}_{method}_high'
+
+
+def _intervals(column, analytic):
+    """Kolom interval bootstrap dan analitik `column` untuk CHART_SCHEMAS"""
+    return dict.fromkeys(interval_columns(column) + interval_columns(column, analytic), 'float64')
+
+
+CHART_SCHEMAS = {
+    # Satu baris: ringkasan halaman Delivery & Rating
+    'delivery_summary': {
+        'correlation': 'float64',
+        'delivery_time_mean': 'float64',
+        'review_score_mean': 'float64',
+        'delivery_time_p95': 'float64',
+        'last_month': 'datetime64[ns]',
+        'last_rating': 'float64',
+        'target_rating': 'float64',
+        **_intervals('last_rating', 'normal'),
+        **_intervals('target_rating', 'normal'),
+    },
+    # Jumlah order per (bin waktu pengiriman, rating) untuk density plot korelasi
+    'delivery_rating_bins': {
+        'delivery_day': 'float64',
+        'review_score': 'int8',
+        'count': 'int64',
+    },
+    # Satu baris: regresi OLS rating ~ waktu pengiriman (lihat GroupStats.regression)
+    'delivery_regression': {
+        'n': 'int64',
+        'x_mean': 'float64',
+        'sxx': 'float64',
+        'slope': 'float64',
+        'intercept': 'float64',
+        'residual_std': 'float64',
+    },
+    'delivery_per_rating': {
+        'review_score': 'int8',
+        'count': 'int64',
+        'mean': 'float64',
+        'std': 'float64',
+        'min': 'float64',
+        'q25': 'float64',
+        'q50': 'float64',
+        'q75': 'float64',
+        'max': 'float64',
+        'whislo': 'float64',
+        'whishi': 'float64',
+    },
+    'delivery_status': {
+        'delivery_status': DELIVERY_STATUS_DTYPE,
+        'review_score_mean': 'float64',
+        'count': 'int64',
+        'pct': 'float64',
+    },
+    'monthly_ratings': {
+        'month': 'datetime64[ns]',
+        'review_score_mean': 'float64',
+        'count': 'int64',
+        **dict.fromkeys(SCORE_COUNT_COLUMNS, 'int64'),
+        **_intervals('review_score_mean', 'normal'),
+    },
+    'worst_categories': {
+        'category': 'str',
+        'review_score_mean': 'float64',
+        'delivery_time_mean': 'float64',
+    },
+    'top_repurchase_categories': {
+        'category': 'str',
+        'repurchase_pct': 'float64',
+        'repurchase_count': 'int64',
+        'count': 'int64',
+        **_intervals('repurchase_pct', 'wilson'),
+    },
+    'category_comparison': {
+        'category': 'str',
+        'repurchase_pct': 'float64',
+        'negative_review_pct': 'float64',
+        'repurchase_count': 'int64',
+        'count': 'int64',
+        'negative_review_count': 'int64',
+        'total_review_count': 'int64',
+        **_intervals('repurchase_pct', 'wilson'),
+        **_intervals('negative_review_pct', 'wilson'),
+    },
+    # Satu baris: ringkasan halaman Repurchase
+    'repurchase_summary': {
+        'total_negative_reviews': 'int64',
+        'total_repurchase': 'int64',
+        'repurchase_rate': 'float64',
+        'median_days_to_repurchase': 'float64',
+        'target_rate': 'float64',
+        'target_repurchase': 'int64',
+        **_intervals('repurchase_rate', 'wilson'),
+        **_intervals('target_rate', 'wilson'),
+    },
+    'repurchase_by_rating': {
+        'review_score': 'int8',
+        'repurchase_pct': 'float64',
+        'repurchase_count': 'int64',
+        'count': 'int64',
+        **_intervals('repurchase_pct', 'wilson'),
+    },
+    'repurchase_time_distribution': {
+        'days_bin': 'str',
+        'pct': 'float64',
+        'count': 'int64',
+    },
+    'state_corr': {
+        'customer_state': 'str',
+        'corr_delivery_rating': 'float64',
+    },
+    'state_delivery': {
+        'customer_state': 'str',
+        'delivery_time_mean': 'float64',
+    },
+    'repurchase_state': {
+        'customer_state': 'str',
+        'total_neg': 'int64',
+        'repurchase_30d': 'int64',
+        'repurchase_rate': 'float64',
+    },
+    'problematic_categories': {
+        'customer_state': 'str',
+        'product_category_name': 'str',
+        'avg_rating': 'float64',
+        'repurchase_rate': 'float64',
+        'count': 'int64',
+    },
+    # k seller terbaik ('top') dan terburuk ('bottom') menurut tingkat tepat waktu
+    'seller_leaderboard': {
+        'rank_group': 'str',
+        'rank': 'int64',
+        'seller_id': 'str',
+        'seller_state': 'str',
+        'items': 'int64',
+        'on_time_rate': 'float64',
+        'mean_delay_days': 'float64',
+        'rating_mean': 'float64',
+        'distance_km_mean': 'float64',
+    },
+    # Item order per rentang jarak seller -> pelanggan
+    'seller_distance': {
+        'distance_bin': 'str',
+        'items': 'int64',
+        'delivery_time_mean': 'float64',
+        'on_time_rate': 'float64',
+        'rating_mean': 'float64',
+    },
+}
+
+
+def conform(key, df):
+    """Pilih dan urutkan kolom `df` sesuai skema `key`, lalu ubah tipenya"""
+    schema = CHART_SCHEMAS[key]
+    missing = [col for col in schema if col not in df.columns]
+    if missing:
+        raise ValueError(f"Tabel chart '{key}' tidak punya kolom: {', '.join(missing)}")
+    return df[list(schema)].astype(schema).reset_index(drop=True).rename_axis(columns=None)
+
+
+def empty_chart(key):
+    return conform(key, pd.DataFrame(columns=list(CHART_SCHEMAS[key])))
+
+
+def chart_path(chart_dir, key):
+    return Path(chart_dir) / f'{key}.parquet'
+
+
+def _write_table(chart_dir, key, df):
+    path = chart_path(chart_dir, key)
+    tmp_path = path.with_suffix('.tmp')
+    df.to_parquet(tmp_path, index=False)
+    tmp_path.replace(path)
+    return path
+
+
+def _write_index(chart_dir, index):
+    index_path = Path(chart_dir) / INDEX_FILE
+    tmp_path = index_path.with_suffix('.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump({'schema_version': SCHEMA_VERSION, 'charts': index}, f, indent=1)
+    tmp_path.replace(index_path)
+    return index_path
+
+
+def _check_keys(tables):
+    unknown = set(tables) - set(CHART_SCHEMAS)
+    if unknown:
+        raise KeyError(f"Kunci chart tidak dikenal: {', '.join(sorted(unknown))}")
+
+
+def write_charts(chart_dir, tables):
+    """Tulis semua tabel chart dan index.json, kembalikan path yang ditulis"""
+    _check_keys(tables)
+    chart_dir = Path(chart_dir)
+    chart_dir.mkdir(parents=True, exist_ok=True)
+
+    paths, index = [], {}
+    for key in CHART_SCHEMAS:
+        df = conform(key, tables[key]) if key in tables else empty_chart(key)
+        paths.append(_write_table(chart_dir, key, df))
+        index[key] = {'file': paths[-1].name, 'rows': len(df)}
+    return paths + [_write_index(chart_dir, index)]
+
+
+def update_charts(chart_dir, tables):
+    """Tulis ulang hanya tabel `tables` di store yang sudah ada; tabel lain tidak disentuh"""
+    _check_keys(tables)
+    chart_dir = Path(chart_dir)
+    index = load_index(chart_dir)
+
+    paths = []
+    for key, df in tables.items():
+        df = conform(key, df)
+        paths.append(_write_table(chart_dir, key, df))
+        index['charts'][key] = {'file': paths[-1].name, 'rows': len(df)}
+    return paths + [_write_index(chart_dir, index['charts'])]
+
+
+def has_charts(chart_dir):
+    return (Path(chart_dir) / INDEX_FILE).exists()
+
+
+def load_index(chart_dir):
+    """Isi index.json; ValueError jika versi skema store berbeda dari versi kode,
+    agar dashboard tidak diam-diam menggambar data berformat lama"""
+    with open(Path(chart_dir) / INDEX_FILE) as f:
+        index = json.load(f)
+    if index.get('schema_version') != SCHEMA_VERSION:
+        raise ValueError(f"Versi skema chart store {index.get('schema_version')} tidak cocok dengan "
+                         f"{SCHEMA_VERSION}; jalankan ulang `python -m olist build`")
+    return index
+
+
+def load_chart(chart_dir, key, index=None):
+    """Baca satu tabel chart (kosong jika tidak ada di store)"""
+    index = load_index(chart_dir) if index is None else index
+    entry = index['charts'].get(key)
+    if entry is None:
+        return empty_chart(key)
+    return conform(key, pd.read_parquet(Path(chart_dir) / entry['file']))
+
+
+def load_charts(chart_dir):
+    """Baca semua tabel chart menjadi dict {kunci: DataFrame}"""
+    index = load_index(chart_dir)
+    return {key: load_chart(chart_dir, key, index) for key in CHART_SCHEMAS}
+
+
+def month_code(values):
+    """Kode bulan yyyymm (int32) dari kolom period, datetime, atau string 'YYYY-MM'"""
+    if pd.api.types.is_integer_dtype(values):
+        return values.astype('int32')
+    if not isinstance(values.dtype, pd.PeriodDtype):
+        values = pd.to_datetime(values)
+    return (values.dt.year * 100 + values.dt.month).astype('int32')
+
+
+def compact_delivery_frame(df):
+    """Frame ringkas dari delivery_review_df lengkap: kolom DELIVERY_FRAME_SCHEMA saja"""
+    missing = [col for col in DELIVERY_FRAME_SCHEMA if col not in df.columns]
+    if missing:
+        raise ValueError(f"delivery_review_df tidak punya kolom: {', '.join(missing)}")
+    compact = df[list(DELIVERY_FRAME_SCHEMA)].assign(
+        order_month=month_code(df['order_month']),
+        delivery_status=df['delivery_status'].astype(str).where(df['delivery_status'].notna())
+    )
+    return validate_delivery_frame(compact.astype(DELIVERY_FRAME_SCHEMA).reset_index(drop=True))
+
+
+def validate_delivery_frame(df):
+    """Pastikan kolom dan tipe `df` (boleh subset kolom) sesuai DELIVERY_FRAME_SCHEMA
+    dan nilainya masuk akal; ValueError jika tidak, selain itu kembalikan `df`"""
+    unknown = [col for col in df.columns if col not in DELIVERY_FRAME_SCHEMA]
+    if unknown:
+        raise ValueError(f"Kolom di luar skema frame pengiriman: {', '.join(unknown)}")
+    for col in df.columns:
+        expected = DELIVERY_FRAME_SCHEMA[col]
+        if df[col].dtype != expected:
+            raise ValueError(f"Kolom '{col}' bertipe {df[col].dtype}, seharusnya {expected}")
+    if 'review_score' in df and not df['review_score'].isin(REVIEW_SCORES).all():
+        raise ValueError("review_score di luar rentang 1-5")
+    if 'order_month' in df and not df['order_month'].between(190001, 299912).all():
+        raise ValueError("order_month bukan kode yyyymm")
+    return df
+
+
+def write_delivery_frame(out_dir, delivery_review_df):
+    """Tulis frame ringkas delivery_review_df ke `out_dir`, kembalikan path-nya"""
+    path = Path(out_dir) / DELIVERY_FRAME_FILE
+    tmp_path = path.with_suffix('.tmp')
+    compact_delivery_frame(delivery_review_df).to_parquet(tmp_path, index=False)
+    tmp_path.replace(path)
+    return path
+
+
+def load_delivery_frame(path, columns=None):
+    """Baca frame ringkas (hanya `columns` jika diberikan) dan validasi skemanya.
+    File lama berisi kolom lengkap diringkas lebih dulu."""
+    columns = list(columns or DELIVERY_FRAME_SCHEMA)
+    df = pd.read_parquet(path, columns=columns)
+    try:
+        return validate_delivery_frame(df)
+    except ValueError:
+        return compact_delivery_frame(pd.read_parquet(path, columns=list(DELIVERY_FRAME_SCHEMA)))[columns]
@@ -0,0 +1,644 @@
+"""Pembuat figure matplotlib untuk setiap chart dashboard.
+
+Setiap fungsi `draw_*` hanya bergantung pada data yang diberikan dan
+mengembalikan `Figure` tanpa menampilkannya, sehingga hasilnya bisa di-encode
+sekali dan disimpan di cache (lihat render_cache.py).
+"""
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import seaborn as sns
+from matplotlib.colors import LogNorm
+
+from .chart_store import interval_columns
+from .export import RATING_TARGET_LABEL, REPURCHASE_BINS
+from .features import DELIVERY_STATUS_ORDER
+from .stats import confidence_band
+
+RATING_ORDER = [1, 2, 3, 4, 5]
+# Error bar interval kepercayaan 95% (bootstrap, lihat uncertainty.py)
+INTERVAL_STYLE = {'fmt': 'none', 'ecolor': '#333333', 'elinewidth': 1.2, 'capsize': 4, 'zorder': 4}
+# Latar label yang bisa tertimpa error bar
+LABEL_BOX = {'boxstyle': 'round,pad=0.15', 'facecolor': 'white', 'edgecolor': 'none', 'alpha': 0.8}
+# Sumbu x density plot mencakup 99% order, bukan hanya persentil 95 seperti sample scatter
+DENSITY_TAIL_QUANTILE = 0.99
+
+
+def add_value_labels(ax, spacing=5):
+    """Tambahkan label nilai di atas bar chart"""
+    for rect in ax.patches:
+        y_value = rect.get_height()
+        x_value = rect.get_x() + rect.get_width() / 2
+        space = spacing
+        va = 'bottom'
+        if y_value < 0:
+            space = -spacing
+            va = 'top'
+        label = "{:.2f}".format(y_value)
+        ax.annotate(
+            label,
+            (x_value, y_value),
+            xytext=(0, space),
+            textcoords="offset points",
+            ha='center',
+            va=va,
+            fontsize=10,
+            fontweight='bold')
+
+
+def interval_errors(data, column):
+    """Panjang error bar (2, n) dari nilai `column` ke batas interval bootstrap-nya;
+    None jika tabel belum punya kolom interval. Grup tanpa interval diberi panjang 0."""
+    low, high = interval_columns(column)
+    if low not in data or high not in data:
+        return None
+    value = np.asarray(data[column], dtype='float64')
+    errors = np.vstack([value - np.asarray(data[low], dtype='float64'),
+                        np.asarray(data[high], dtype='float64') - value])
+    return np.clip(np.nan_to_num(errors), 0, None)
+
+
+def interval_upper(data, column):
+    """Batas atas interval `column` per baris (nilainya sendiri jika interval tidak ada)"""
+    _, high = interval_columns(column)
+    value = pd.Series(data[column], dtype='float64').reset_index(drop=True)
+    if high not in data:
+        return value
+    return pd.Series(data[high], dtype='float64').reset_index(drop=True).fillna(value).clip(lower=value)
+
+
+# Halaman Delivery & Rating Analysis
+
+def draw_delivery_correlation(bins, regression, correlation, tail_quantile=DENSITY_TAIL_QUANTILE):
+    """Density seluruh order per (bin waktu pengiriman, rating) plus garis OLS dan pita 95%.
+
+    Semua input sudah diagregasi (lihat export.delivery_rating_bins dan
+    GroupStats.regression), jadi biaya render tidak bergantung jumlah order.
+    """
+    fig, ax = plt.subplots(figsize=(10, 6))
+    counts = bins.pivot_table(index='review_score', columns='delivery_day', values='count',
+                              aggfunc='sum', fill_value=0).reindex(RATING_ORDER, fill_value=0)
+    if not counts.empty:
+        days = counts.columns.to_numpy(dtype='float64')
+        width = np.diff(days).min() if len(days) > 1 else 1.0
+        # Kolom bin yang kosong diisi agar sumbu x tetap berskala waktu
+        days = np.arange(days[0], days[-1] + width / 2, width)
+        counts = counts.reindex(columns=days, fill_value=0)
+        x_edges = np.append(days, days[-1] + width)
+        y_edges = np.arange(len(RATING_ORDER) + 1) + RATING_ORDER[0] - 0.5
+        mesh = ax.pcolormesh(x_edges, y_edges, np.ma.masked_equal(counts.to_numpy(), 0),
+                             norm=LogNorm(), cmap='Blues')
+        fig.colorbar(mesh, ax=ax, label='Jumlah order')
+
+        # Batas sumbu dari distribusi bin: ekor sampai persentil `tail_quantile` tetap terlihat
+        cumulative = np.cumsum(counts.sum(axis=0).to_numpy())
+        x_limit = x_edges[np.searchsorted(cumulative, tail_quantile * cumulative[-1]) + 1]
+    else:
+        x_limit = 1.0
+
+    if not regression.empty:
+        fit = regression.iloc[0]
+        x = np.linspace(0, x_limit, 200)
+        predicted, lower, upper = confidence_band(fit, x)
+        ax.fill_between(x, lower, upper, color='red', alpha=0.2, linewidth=0)
+        ax.plot(x, predicted, color='red', linewidth=2)
+
+    ax.text(0.05, 0.95, f'Korelasi: {correlation:.3f}',
+            transform=ax.transAxes, fontsize=12,
+            bbox=dict(facecolor='white', alpha=0.8, boxstyle='round,pad=0.5'))
+    ax.set_xlim(0, x_limit)
+    ax.set_ylim(RATING_ORDER[0] - 0.5, RATING_ORDER[-1] + 0.5)
+    ax.set_yticks(RATING_ORDER)
+    ax.set_title('Korelasi antara Waktu Pengiriman dan Rating Review', fontsize=14)
+    ax.set_xlabel('Waktu Pengiriman (hari)', fontsize=12)
+    ax.set_ylabel('Rating Review (1-5)', fontsize=12)
+    fig.tight_layout()
+    return fig
+
+
+def box_plot_stats(per_rating):
+    """Daftar dict statistik untuk `Axes.bxp` dari tabel delivery_per_rating.
+
+    main_data.csv lama tidak punya whisker; di situ whisker didekati dengan
+    batas 1.5 x IQR yang dipotong ke min/max.
+    """
+    per_rating = per_rating.set_index('review_score').reindex(RATING_ORDER)
+    iqr = per_rating['q75'] - per_rating['q25']
+    whislo = per_rating['whislo'].fillna(np.maximum(per_rating['min'], per_rating['q25'] - 1.5 * iqr))
+    whishi = per_rating['whishi'].fillna(np.minimum(per_rating['max'], per_rating['q75'] + 1.5 * iqr))
+    return [
+        {'label': str(score), 'med': row.q50, 'q1': row.q25, 'q3': row.q75,
+         'whislo': whislo[score], 'whishi': whishi[score], 'mean': row.mean, 'fliers': []}
+        for score, row in zip(RATING_ORDER, per_rating.itertuples())
+    ]
+
+
+def draw_delivery_boxplot(per_rating, y_limit=np.nan):
+    """Boxplot dari statistik yang sudah dihitung (O(jumlah rating), bukan O(jumlah order))"""
+    fig, ax = plt.subplots(figsize=(10, 6))
+    stats = box_plot_stats(per_rating)
+    positions = np.arange(len(stats))
+    ax.bxp(stats, positions=positions, showfliers=False, patch_artist=True, widths=0.8,
+           boxprops={'facecolor': sns.color_palette()[0], 'edgecolor': '0.25'},
+           medianprops={'color': '0.25'}, whiskerprops={'color': '0.25'}, capprops={'color': '0.25'})
+
+    # Rata-rata dengan interval kepercayaan 95% (pengganti sns.pointplot)
+    per_rating = per_rating.set_index('review_score').reindex(RATING_ORDER)
+    ci = 1.96 * per_rating['std'] / np.sqrt(per_rating['count'])
+    ax.errorbar(positions, per_rating['mean'], yerr=ci, color='red', marker='D', markersize=5)
+    if pd.isna(y_limit):
+        y_limit = max(stat['whishi'] for stat in stats)
+    plt.ylim(0, y_limit)
+    for i, mean_val in enumerate(per_rating['mean']):
+        plt.text(i, mean_val + 0.5, f'{mean_val:.1f}', ha='center', fontsize=10,
+                 bbox=dict(facecolor='white', alpha=0.7, boxstyle='round,pad=0.2'))
+    plt.title('Distribusi Waktu Pengiriman per Rating Review (6 Bulan Terakhir)', fontsize=14)
+    plt.xlabel('Rating Review', fontsize=12)
+    plt.ylabel('Waktu Pengiriman (hari)', fontsize=12)
+    plt.tight_layout()
+    return fig
+
+
+def draw_mean_delivery_per_rating(per_rating, summary):
+    fig = plt.figure(figsize=(10, 6))
+    mean_delivery = per_rating[['review_score', 'mean']].rename(columns={'mean': 'delivery_time_days'})
+    ax = sns.barplot(x='review_score', y='delivery_time_days', data=mean_delivery)
+    add_value_labels(ax)
+    overall_mean = summary['delivery_time_mean'].iloc[0]
+    plt.axhline(y=overall_mean, color='red', linestyle='--', alpha=0.7)
+    plt.text(4.5, overall_mean + 0.2, f'Rata-rata: {overall_mean:.2f}', color='red')
+    plt.title('Rata-rata Waktu Pengiriman per Rating', fontsize=14)
+    plt.xlabel('Rating Review', fontsize=12)
+    plt.ylabel('Rata-rata Waktu Pengiriman (hari)', fontsize=12)
+    plt.tight_layout()
+    return fig
+
+
+def draw_rating_per_delivery_status(status, summary):
+    delivery_status_rating = status[['delivery_status', 'review_score_mean']].rename(
+        columns={'review_score_mean': 'mean'})
+    fig = plt.figure(figsize=(12, 6))
+    ax = sns.barplot(x='delivery_status', y='mean', data=delivery_status_rating, order=DELIVERY_STATUS_ORDER)
+    add_value_labels(ax)
+    overall_rating_mean = summary['review_score_mean'].iloc[0]
+    plt.axhline(y=overall_rating_mean, color='red', linestyle='--', alpha=0.7)
+    plt.text(4.5, overall_rating_mean + 0.05, f'Rata-rata: {overall_rating_mean:.2f}', color='red')
+    plt.title('Rata-rata Rating Berdasarkan Status Ketepatan Pengiriman', fontsize=14)
+    plt.xlabel('Status Ketepatan Pengiriman', fontsize=12)
+    plt.ylabel('Rata-rata Rating', fontsize=12)
+    plt.xticks(rotation=20)
+    plt.tight_layout()
+    return fig
+
+
+def draw_status_distribution(status_dist_data):
+    # Tingkatkan ukuran figure untuk memberikan ruang lebih
+    fig, ax = plt.subplots(figsize=(10, 7))
+    sns.barplot(x='delivery_status', y='pct', data=status_dist_data, ax=ax)
+    max_value = status_dist_data['pct'].max()
+
+    # Tambahkan label persentase dan jumlah di atas bar
+    for i, p in enumerate(ax.patches):
+        count = status_dist_data['count'].iloc[i]
+        percentage = status_dist_data['pct'].iloc[i]
+        ax.annotate(f'{percentage:.1f}%\n({count})',
+                    (p.get_x() + p.get_width() / 2., p.get_height()),
+                    ha='center', va='bottom', fontsize=10,
+                    xytext=(0, 3),
+                    textcoords='offset points')
+
+    # Atur batas sumbu y dengan ruang tambahan 25% di atas nilai maksimum
+    plt.ylim(0, max_value * 1.25)
+    plt.title('Distribusi Status Ketepatan Pengiriman', fontsize=14, pad=15)
+    plt.xlabel('Status Pengiriman', fontsize=12)
+    plt.ylabel('Persentase (%)', fontsize=12)
+    plt.xticks(rotation=20)
+    plt.grid(axis='y', linestyle='--', alpha=0.3)
+    plt.tight_layout(pad=2.0)
+    return fig
+
+
+def draw_worst_categories(worst_categories):
+    fig, ax1 = plt.subplots(figsize=(14, 8))
+
+    # Plot rating pada sumbu y kiri
+    color = 'tab:blue'
+    ax1.set_xlabel('Kategori Produk', fontsize=12)
+    ax1.set_ylabel('Rating Rata-rata', fontsize=12, color=color)
+    bars = ax1.barh(worst_categories['category'],
+                    worst_categories['review_score_mean'], color=color, alpha=0.7)
+    ax1.tick_params(axis='y', labelsize=10)
+    ax1.set_xlim(3.5, 5.0)  # Sesuaikan untuk menunjukkan perbedaan dengan jelas
+
+    # Tambahkan nilai rating pada bar
+    for i, bar in enumerate(bars):
+        ax1.text(bar.get_width() + 0.05, bar.get_y() + bar.get_height()/2,
+                 f"{worst_categories['review_score_mean'].iloc[i]:.2f}",
+                 va='center', fontsize=9)
+
+    # Plot waktu pengiriman pada sumbu y kanan
+    ax2 = ax1.twiny()
+    color = 'tab:red'
+    ax2.set_xlabel('Waktu Pengiriman (hari)', fontsize=12, color=color)
+    ax2.tick_params(axis='x', labelcolor=color)
+    ax2.set_xlim(0, 20)  # Sesuaikan berdasarkan data
+
+    # Plot waktu pengiriman sebagai titik
+    for i, delivery_time in enumerate(worst_categories['delivery_time_mean']):
+        ax2.scatter(delivery_time, i, color=color, s=100, zorder=3)
+        ax2.text(delivery_time + 0.5, i,
+                 f"{delivery_time:.1f} hari",
+                 va='center', color=color, fontsize=9)
+
+    plt.title('10 Kategori Produk dengan Rating Terendah', fontsize=14)
+    plt.tight_layout()
+    return fig
+
+
+def draw_monthly_ratings(trend_data, delivery_summary):
+    fig, ax = plt.subplots(figsize=(14, 6))
+
+    # Bulan tersimpan sebagai datetime dan sudah berurutan kronologis
+    month_labels = trend_data['month'].dt.strftime('%Y-%m')
+    ax = sns.lineplot(x=month_labels, y=trend_data['review_score_mean'],
+                      marker='o', markersize=10, linewidth=2)
+    errors = interval_errors(trend_data, 'review_score_mean')
+    if errors is not None:
+        ax.errorbar(range(len(trend_data)), trend_data['review_score_mean'], yerr=errors, **INTERVAL_STYLE)
+
+    # Tambahkan nilai di atas titik
+    for i, value in enumerate(trend_data['review_score_mean']):
+        ax.text(i, value + 0.02, f'{value:.3f}', ha='center', fontsize=10)
+
+    # Tambahkan proyeksi untuk 3 bulan ke depan (90 hari)
+    summary = next(delivery_summary.itertuples(index=False))
+    if pd.notna(summary.last_month):
+        last_rating = summary.last_rating
+        target_rating = summary.target_rating
+
+        # Tambahkan bulan proyeksi ke sumbu x
+        all_months = list(month_labels) + [RATING_TARGET_LABEL]
+        plt.xticks(range(len(all_months)), all_months, rotation=45)
+
+        # Gambar garis proyeksi
+        x_current = len(trend_data) - 1
+        x_target = len(trend_data)  # 90 hari ≈ 3 bulan
+        plt.plot([x_current, x_target], [last_rating, target_rating], 'r--', linewidth=2)
+
+        # Tambahkan anotasi target
+        plt.scatter(x_target, target_rating, color='red', s=100, zorder=5)
+        errors = interval_errors(delivery_summary, 'target_rating')
+        if errors is not None:
+            plt.errorbar([x_target], [target_rating], yerr=errors, **dict(INTERVAL_STYLE, ecolor='red'))
+        plt.text(x_target, target_rating + 0.05, f'Target: {target_rating:.2f}',
+                 color='red', ha='center', fontsize=12, fontweight='bold')
+
+        # Tambahkan area yang menunjukkan peningkatan 0.5 poin
+        plt.fill_between([x_current, x_target], [last_rating, last_rating],
+                         [last_rating, target_rating], color='red', alpha=0.1)
+        plt.text((x_current + x_target)/2, (last_rating + target_rating)/2 - 0.05,
+                 '+0.5 poin', color='red', ha='center', fontsize=10)
+
+    plt.title('Tren Rata-rata Rating Review per Bulan dan Target 90 Hari', fontsize=14)
+    plt.xlabel('Bulan', fontsize=12)
+    plt.ylabel('Rata-rata Rating', fontsize=12)
+    plt.ylim(4.0, 5.0)  # Sesuaikan untuk melihat perbedaan dengan jelas
+    plt.grid(True, linestyle='--', alpha=0.3)
+    return fig
+
+
+# Halaman Repurchase Analysis
+
+def draw_repurchase_pie(repurchase_summary):
+    summary = next(repurchase_summary.itertuples(index=False))
+    fig, ax = plt.subplots(figsize=(10, 6))
+
+    labels = ['Tidak Repurchase', 'Repurchase ≤30 hari']
+    sizes = [100 - summary.repurchase_rate, summary.repurchase_rate]
+    colors = ['#ff9999', '#66b3ff']
+
+    # Buat pie chart dengan proporsi yang akurat
+    ax.pie(sizes, labels=labels, autopct='%1.2f%%', startangle=90, colors=colors,
+           textprops={'fontsize': 12}, wedgeprops={'linewidth': 1, 'edgecolor': 'white'})
+
+    # Tambahkan jumlah absolut
+    plt.annotate(f'Total review negatif: {summary.total_negative_reviews:,}',
+                 xy=(0.5, 0.05), xycoords='figure fraction',
+                 ha='center', fontsize=12)
+    low, high = interval_columns('repurchase_rate')
+    interval = ''
+    if pd.notna(getattr(summary, low, np.nan)):
+        interval = f' (IK 95%: {getattr(summary, low):.2f}-{getattr(summary, high):.2f}%)'
+    plt.annotate(f'Repurchase dalam 30 hari: {summary.total_repurchase:,}{interval}',
+                 xy=(0.5, 0.01), xycoords='figure fraction',
+                 ha='center', fontsize=10)
+
+    plt.axis('equal')
+    plt.title('Persentase Pembelian Ulang ≤30 Hari Setelah Review Negatif',
+              fontsize=13,
+              pad=20)
+    return fig
+
+
+def draw_repurchase_by_rating(rating_data):
+    fig, ax = plt.subplots(figsize=(10, 7))
+    sns.barplot(x='review_score', y='repurchase_pct', data=rating_data, ax=ax)
+    errors = interval_errors(rating_data, 'repurchase_pct')
+    if errors is not None:
+        ax.errorbar(range(len(rating_data)), rating_data['repurchase_pct'], yerr=errors, **INTERVAL_STYLE)
+    upper = interval_upper(rating_data, 'repurchase_pct')
+    max_value = upper.max()
+
+    # Tambahkan nilai persentase dan jumlah di atas bar (dan di atas error bar)
+    for i, p in enumerate(ax.patches):
+        note = f"{rating_data['repurchase_count'].iloc[i]}/{rating_data['count'].iloc[i]}"
+        percentage = rating_data['repurchase_pct'].iloc[i]
+        ax.annotate(f'{percentage:.2f}%\n({note})',
+                    (p.get_x() + p.get_width() / 2., upper.iloc[i]),
+                    ha='center', va='bottom', fontsize=11,
+                    xytext=(0, 5),
+                    textcoords='offset points')
+
+    # Atur batas sumbu y dengan ruang tambahan 25% di atas nilai maksimum
+    plt.ylim(0, max_value * 1.25)
+    plt.title('Persentase Repurchase ≤30 Hari per Rating Negatif', fontsize=14, pad=20)
+    plt.xlabel('Rating Review', fontsize=12)
+    plt.ylabel('Persentase Repurchase (%)', fontsize=12)
+    plt.grid(axis='y', linestyle='--', alpha=0.3)
+    plt.tight_layout(pad=3.0)
+    return fig
+
+
+def draw_repurchase_time_distribution(dist_data, median_val):
+    fig, ax = plt.subplots(figsize=(12, 7))
+    if not dist_data.empty:
+        sns.barplot(x='days_bin', y='pct', data=dist_data, ax=ax)
+        max_value = dist_data['pct'].max()
+
+        # Tambahkan label persentase dan jumlah di atas bar
+        for i, p in enumerate(ax.patches):
+            count = dist_data['count'].iloc[i]
+            percentage = dist_data['pct'].iloc[i]
+            ax.annotate(f'{percentage:.1f}%\n({count})',
+                        (p.get_x() + p.get_width() / 2., p.get_height()),
+                        ha='center', va='bottom', fontsize=10,
+                        xytext=(0, 3),
+                        textcoords='offset points')
+
+        # Atur batas sumbu y dengan ruang tambahan 30% di atas nilai maksimum
+        plt.ylim(0, max_value * 1.3)
+
+        # Tambahkan garis median jika tersedia
+        if pd.notna(median_val):
+            # Cari bin yang berisi median; median tepat di batas akhir (30 hari) masuk bin terakhir
+            median_bin_index = min(np.searchsorted(REPURCHASE_BINS, median_val, side='right') - 1,
+                                   len(REPURCHASE_BINS) - 2)
+
+            plt.axvline(x=median_bin_index, color='red', linestyle='--', linewidth=2)
+            plt.text(median_bin_index-0.2, plt.ylim()[1]*0.85, f'Median: {median_val:.1f} hari',
+                     color='red', fontsize=12, ha='right')
+
+    plt.title('Distribusi Waktu Selama 30 Hari Hingga Pembelian Ulang Setelah Review Negatif',
+              fontsize=14, pad=20)
+    plt.xlabel('Hari Hingga Pembelian Ulang', fontsize=12)
+    plt.ylabel('Persentase (%)', fontsize=12)
+    plt.grid(axis='y', linestyle='--', alpha=0.3)
+    plt.tight_layout(pad=3.0)
+    return fig
+
+
+def draw_top_repurchase_categories(top_data):
+    fig, ax = plt.subplots(figsize=(14, 8))
+    sns.barplot(x='repurchase_pct', y='category', data=top_data, ax=ax)
+    errors = interval_errors(top_data, 'repurchase_pct')
+    if errors is not None:
+        ax.errorbar(top_data['repurchase_pct'], range(len(top_data)), xerr=errors, **INTERVAL_STYLE)
+    upper = interval_upper(top_data, 'repurchase_pct')
+
+    # Tambahkan nilai persentase dan jumlah di samping bar (di luar error bar)
+    for i, p in enumerate(ax.patches):
+        note = f"{top_data['repurchase_count'].iloc[i]}/{top_data['count'].iloc[i]}"
+        percentage = top_data['repurchase_pct'].iloc[i]
+        ax.annotate(f'{percentage:.1f}% ({note})',
+                    (upper.iloc[i] + 1, p.get_y() + p.get_height()/2),
+                    va='center', fontsize=10)
+
+    plt.title('10 Kategori Produk dengan Repurchase Tertinggi Setelah Review Negatif Selama 30 Hari', fontsize=14)
+    plt.xlabel('Persentase Repurchase (%)', fontsize=12)
+    plt.ylabel('Kategori Produk', fontsize=12)
+    plt.xlim(0, upper.max() * 1.3)  # Berikan ruang untuk anotasi
+    plt.grid(axis='x', linestyle='--', alpha=0.3)
+    return fig
+
+
+def draw_category_comparison(comparison):
+    fig, ax = plt.subplots(figsize=(14, 9))
+
+    # Gunakan warna yang jelas dan mudah dibedakan
+    repurchase_color = '#4285F4'  # Biru Google
+    negative_color = '#EA4335'    # Merah Google
+
+    # Buat plot batang horizontal untuk repurchase percentage
+    bars = ax.barh(
+        y=comparison['category'],
+        width=comparison['repurchase_pct'],
+        height=0.6,
+        color=repurchase_color,
+        alpha=0.8,
+        label='Pembelian Ulang'
+    )
+
+    errors = interval_errors(comparison, 'repurchase_pct')
+    if errors is not None:
+        ax.errorbar(comparison['repurchase_pct'], range(len(comparison)), xerr=errors, **INTERVAL_STYLE)
+    repurchase_upper = interval_upper(comparison, 'repurchase_pct')
+    negative_upper = interval_upper(comparison, 'negative_review_pct')
+    negative_errors = interval_errors(comparison, 'negative_review_pct')
+
+    # Tambahkan nilai pada setiap bar
+    for bar in bars:
+        width = bar.get_width()
+        ax.text(
+            width + 0.5,
+            bar.get_y() + bar.get_height()/2,
+            f'{width:.1f}%',
+            va='center',
+            fontsize=11,
+            color='black',
+            fontweight='bold',
+            bbox=LABEL_BOX,
+            zorder=5
+        )
+
+    ax.grid(axis='x', linestyle='--', alpha=0.3)
+
+    # Sumbu kedua untuk persentase review negatif
+    ax2 = ax.twiny()
+    for i, row in enumerate(comparison.itertuples(index=False)):
+        # Khusus untuk watches_gift, sesuaikan posisi y agar tidak tumpang tindih
+        y_offset = 0
+        if row.category == 'watches_gifts':
+            y_offset = 0.25
+
+        if negative_errors is not None:
+            ax2.errorbar([row.negative_review_pct], [i + y_offset], xerr=negative_errors[:, i:i + 1],
+                         **dict(INTERVAL_STYLE, ecolor=negative_color, zorder=2))
+        ax2.scatter(
+            row.negative_review_pct,
+            i + y_offset,
+            color=negative_color,
+            s=150,
+            marker='o',
+            edgecolor='white',
+            linewidth=1.5,
+            alpha=0.9,
+            label='Review Negatif' if i == 0 else ""
+        )
+        ax2.text(
+            row.negative_review_pct + 2,
+            i + y_offset,
+            f'{row.negative_review_pct:.1f}%',
+            va='center',
+            fontsize=11,
+            color='black',
+            fontweight='bold',
+            bbox=LABEL_BOX
+        )
+
+    # Atur batas sumbu x untuk kedua sumbu
+    ax.set_xlim(0, max(comparison['repurchase_pct'].max() * 1.2, repurchase_upper.max() * 1.05))
+    ax2.set_xlim(0, max(50, comparison['negative_review_pct'].max() * 1.2, negative_upper.max() * 1.05))  # Fokus pada rentang 0-50%
+
+    ax.set_xlabel('Persentase Pelanggan yang Kembali Berbelanja (%)', fontsize=14, fontweight='bold')
+    ax.set_ylabel('Kategori Produk', fontsize=14, fontweight='bold')
+    ax2.set_xlabel('Persentase Review Negatif (%)', fontsize=14, fontweight='bold', color=negative_color)
+    ax.tick_params(axis='y', labelsize=12)
+    ax.tick_params(axis='x', labelsize=12)
+    ax2.tick_params(axis='x', labelsize=12, colors=negative_color)
+
+    plt.suptitle('Pelanggan yang Kembali Berbelanja vs Review Negatif', fontsize=18, y=0.98, fontweight='bold')
+    plt.title('Berdasarkan Kategori Produk (30 Hari Terakhir)', fontsize=14)
+
+    # Legenda di bawah grafik, dua kolom
+    handles = [
+        plt.Rectangle((0, 0), 1, 1, color=repurchase_color, alpha=0.8),
+        plt.Line2D([0], [0], marker='o', color='w', markerfacecolor=negative_color, markersize=12)
+    ]
+    labels = ['Persentase Pelanggan yang Kembali Berbelanja', 'Persentase Review Negatif']
+    legend = ax.legend(handles, labels,
+                       loc='upper center',
+                       bbox_to_anchor=(0.5, -0.15),
+                       frameon=True,
+                       framealpha=0.9,
+                       fontsize=12,
+                       ncol=2)
+    legend.get_frame().set_edgecolor('lightgray')
+
+    plt.tight_layout(rect=[0, 0.05, 1, 0.95])
+    return fig
+
+
+def draw_repurchase_projection(repurchase_summary):
+    summary = next(repurchase_summary.itertuples(index=False))
+    current_repurchase_rate = summary.repurchase_rate
+    target_repurchase_rate = summary.target_rate
+    total_negative_reviews = summary.total_negative_reviews
+    notes = [f'({summary.total_repurchase} dari {total_negative_reviews})',
+             f'({summary.target_repurchase} dari {total_negative_reviews})']
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    quarters = ['Current', 'Target (Next Quarter)']
+    rates = [current_repurchase_rate, target_repurchase_rate]
+    bars = ax.bar(quarters, rates)
+    tops = rates
+    errors = [interval_errors(repurchase_summary, column) for column in ('repurchase_rate', 'target_rate')]
+    if all(error is not None for error in errors):
+        ax.errorbar(range(len(rates)), rates, yerr=np.hstack(errors), **INTERVAL_STYLE)
+        tops = [rate + error[1, 0] for rate, error in zip(rates, errors)]
+
+    # Tambahkan nilai di atas bar (dan error bar) dengan offset ke atas
+    for i, p in enumerate(bars):
+        height = p.get_height()
+        y_offset = target_repurchase_rate * 0.05
+        ax.annotate(f'{height:.2f}%\n{notes[i]}',
+                    (p.get_x() + p.get_width() / 2., tops[i] + y_offset),
+                    ha='center', va='bottom', fontsize=11)
+
+    # Tambahkan panah dan teks untuk menunjukkan peningkatan
+    plt.annotate('', xy=(1, target_repurchase_rate), xytext=(0, current_repurchase_rate),
+                 arrowprops=dict(arrowstyle='->', color='red', lw=2))
+
+    mid_y = (current_repurchase_rate + target_repurchase_rate)/2
+    y_offset_original = (target_repurchase_rate - current_repurchase_rate) * 0.05
+    additional_y_offset = (target_repurchase_rate - current_repurchase_rate) * 0.05
+    x_adjustment = 0.07
+    plt.text(0.5 - 0.2 + x_adjustment, mid_y + y_offset_original + additional_y_offset,
+             f'+25%\n(+{int(total_negative_reviews * current_repurchase_rate * 0.25 / 100):,} pelanggan)',
+             color='green', ha='center', fontsize=12, fontweight='bold')
+
+    plt.title('Target Peningkatan Tingkat Pembelian Ulang Sebesar 25% dalam Kuartal Berikutnya', fontsize=14)
+    plt.xlabel('Periode', fontsize=12)
+    plt.ylabel('Persentase Pembelian Ulang (%)', fontsize=12)
+    plt.ylim(0, max(tops) * 1.3)  # Berikan ruang untuk anotasi
+    plt.grid(axis='y', linestyle='--', alpha=0.3)
+    return fig
+
+
+# Halaman Geographic Analysis
+
+def draw_state_metric(values, label, cmap):
+    """Bar chart horizontal per state, pengganti peta jika geometri belum dibuat"""
+    values = values.dropna().sort_values()
+    fig, ax = plt.subplots(figsize=(10, max(4, len(values) * 0.3)))
+    colors = plt.get_cmap(cmap)(plt.Normalize(values.min(), values.max())(values.to_numpy()))
+    ax.barh(values.index, values.to_numpy(), color=colors)
+    ax.set_title(f'{label} per State', fontsize=14)
+    ax.set_xlabel(label, fontsize=12)
+    ax.set_ylabel('State', fontsize=12)
+    ax.grid(axis='x', linestyle='--', alpha=0.3)
+    return fig
+
+
+def draw_seller_distance(distance):
+    """Waktu pengiriman (bar) dan tingkat tepat waktu (garis) per rentang jarak seller -> pelanggan"""
+    fig, ax = plt.subplots(figsize=(12, 6))
+    bars = ax.bar(distance['distance_bin'], distance['delivery_time_mean'], color='tab:blue', alpha=0.7)
+    for bar, items in zip(bars, distance['items']):
+        ax.annotate(f'{bar.get_height():.1f} hari\n({items:,} item)',
+                    (bar.get_x() + bar.get_width() / 2, bar.get_height()),
+                    xytext=(0, 5), textcoords='offset points', ha='center', va='bottom', fontsize=10)
+    ax.set_xlabel('Jarak Seller ke Pelanggan', fontsize=12)
+    ax.set_ylabel('Rata-rata Waktu Pengiriman (hari)', fontsize=12, color='tab:blue')
+    ax.set_ylim(0, distance['delivery_time_mean'].max() * 1.3)
+
+    ax2 = ax.twinx()
+    ax2.plot(distance['distance_bin'], distance['on_time_rate'], color='tab:red', marker='o', linewidth=2)
+    ax2.set_ylabel('Tepat Waktu (%)', fontsize=12, color='tab:red')
+    ax2.tick_params(axis='y', labelcolor='tab:red')
+    ax2.set_ylim(min(distance['on_time_rate'].min() - 5, 80), 100)
+
+    ax.set_title('Waktu Pengiriman dan Ketepatan Waktu berdasarkan Jarak Seller ke Pelanggan', fontsize=14)
+    ax.grid(axis='y', linestyle='--', alpha=0.3)
+    fig.tight_layout()
+    return fig
+
+
+def draw_seller_leaderboard(leaderboard):
+    """Tingkat tepat waktu seller terbaik dan terburuk, dengan rating dan keterlambatan rata-ratanya"""
+    groups = [('top', 'Seller Terbaik', 'tab:green'), ('bottom', 'Seller Terburuk', 'tab:red')]
+    fig, axes = plt.subplots(1, 2, figsize=(16, max(5, leaderboard['rank'].max() * 0.6)), sharex=True)
+    for ax, (group, title, color) in zip(axes, groups):
+        ranked = leaderboard[leaderboard['rank_group'] == group].sort_values('rank', ascending=False)
+        labels = [f'{row.seller_id[:8]}… ({row.seller_state})' for row in ranked.itertuples(index=False)]
+        bars = ax.barh(labels, ranked['on_time_rate'], color=color, alpha=0.7)
+        for bar, row in zip(bars, ranked.itertuples(index=False)):
+            ax.text(bar.get_width() + 1, bar.get_y() + bar.get_height() / 2,
+                    f'{row.on_time_rate:.1f}% | ★{row.rating_mean:.2f} | +{row.mean_delay_days:.1f} hari',
+                    va='center', fontsize=9)
+        ax.set_title(title, fontsize=13)
+        ax.set_xlabel('Tepat Waktu (%)', fontsize=11)
+        ax.grid(axis='x', linestyle='--', alpha=0.3)
+    axes[0].set_xlim(0, 140)  # Ruang untuk anotasi
+    fig.suptitle('Leaderboard Seller berdasarkan Ketepatan Waktu Pengiriman', fontsize=15)
+    fig.tight_layout()
+    return fig
@@ -0,0 +1,195 @@
+"""Cube OLAP jarang berisi measure aditif per kombinasi dimensi.
+
+Hampir semua chart adalah jumlah/rata-rata atas sebagian dimensi bulan, state,
+kategori, rating, dan status pengiriman. Cube menyimpan satu baris per
+kombinasi dimensi yang benar-benar muncul (sel) dengan measure yang bisa
+dijumlahkan: jumlah review, jumlah dan kuadrat rating, jumlah dan kuadrat waktu
+pengiriman, serta jumlah order yang dibeli ulang dalam 30 hari. Roll-up ke
+subset dimensi mana pun cukup menjumlahkan sel, jadi biayanya O(sel), bukan
+O(baris), dan dua cube (misalnya dari dua potongan data) bisa digabung.
+
+Ada dua grain karena satu order bisa berisi beberapa produk:
+- `order`: satu fakta per review, tanpa dimensi kategori
+- `item`: satu fakta per (review, item order) seperti `review_geo` di cell 277,
+  dengan dimensi kategori; sel tanpa item/kategori memakai kategori NaN
+
+Metode pembayaran bukan dimensi karena satu order bisa punya beberapa
+pembayaran, sehingga measure per metode tidak lagi aditif.
+"""
+import numpy as np
+import pandas as pd
+
+DIMENSIONS = ('month', 'customer_state', 'product_category_name', 'review_score', 'delivery_status')
+MEASURES = ('n', 'rating_sum', 'rating_sq', 'delivery_n', 'delivery_sum', 'delivery_sq', 'repurchased')
+GRAINS = {
+    'order': tuple(d for d in DIMENSIONS if d != 'product_category_name'),
+    'item': DIMENSIONS,
+}
+# Ambang jumlah minimum yang dipakai notebook
+MIN_COUNT_CATEGORY = 30
+MIN_COUNT_NEGATIVE = 20
+MIN_COUNT_STATE_CATEGORY = 10
+
+
+def fact_table(delivery_review, repurchase, customers, items=None):
+    """Satu baris fakta per review (atau per item jika `items`, sebuah `lookup.OrderItems`,
+    diberikan) dengan kolom dimensi, review_score, delivery_time_days, dan flag repurchase"""
+    # Satu flag per order: order dengan beberapa review negatif tidak boleh menggandakan baris
+    flags = (repurchase[['order_id', 'repurchased_30days']]
+             .groupby('order_id', sort=False)['repurchased_30days'].max()
+             .rename('repurchased'))
+    facts = delivery_review[['order_id', 'customer_id', 'order_month', 'review_score',
+                             'delivery_status', 'delivery_time_days']]
+    if items is not None:
+        # Seperti left merge ke order_items lalu products: order tanpa item tetap satu baris
+        rows, codes = items.fan_out(facts['order_id'], keep_unmatched=True)
+        facts = facts.take(rows).assign(product_category_name=items.categories.category(codes))
+    facts = (facts
+             .merge(flags, left_on='order_id', right_index=True, how='left')
+             .merge(customers[['customer_id', 'customer_state']], on='customer_id', how='left'))
+    facts['repurchased'] = facts['repurchased'].fillna(False).astype(bool)
+    return facts.rename(columns={'order_month': 'month'})
+
+
+class Cube:
+    """Sel cube: kolom dimensi `dims` ditambah kolom MEASURES"""
+
+    def __init__(self, cells, dims):
+        self.cells = cells
+        self.dims = tuple(dims)
+
+    def __len__(self):
+        return len(self.cells)
+
+    @classmethod
+    def from_facts(cls, facts, dims):
+        """Agregasi baris fakta menjadi sel; satu groupby untuk semua measure.
+
+        Setiap fakta punya review_score karena berasal dari inner join ke tabel review,
+        jadi `n` adalah jumlah fakta; rating NaN akan gagal di cast ke int64.
+        """
+        rating = facts['review_score'].astype('int64')
+        delivery = facts['delivery_time_days'].astype('float64')
+        measures = pd.DataFrame({
+            'n': np.ones(len(facts), dtype='int64'),
+            'rating_sum': rating,
+            'rating_sq': rating * rating,
+            'delivery_n': delivery.notna().astype('int64'),
+            'delivery_sum': delivery.fillna(0.0),
+            'delivery_sq': (delivery * delivery).fillna(0.0),
+            'repurchased': facts['repurchased'].astype('int64'),
+        })
+        keys = [facts[d] for d in dims]
+        cells = measures.groupby(keys, observed=True, dropna=False, sort=True).sum().reset_index()
+        return cls(cells, dims)
+
+    def merge(self, other):
+        """Cube baru berisi gabungan sel kedua cube (dimensi harus sama)"""
+        if self.dims != other.dims:
+            raise ValueError(f"Cube dengan dimensi berbeda tidak bisa digabung ({self.dims} vs {other.dims})")
+        cells = pd.concat([self.cells, other.cells], ignore_index=True)
+        return Cube(cells.groupby(list(self.dims), observed=True, dropna=False, sort=True)[list(MEASURES)]
+                    .sum().reset_index(), self.dims)
+
+    def relabel(self, dim, mapping, name=None):
+        """Cube dengan nilai dimensi `dim` dipetakan lewat `mapping` (Series/dict),
+        misalnya nama kategori Portugis -> Inggris; sel dengan label sama digabung"""
+        name = name or dim
+        cells = self.cells.assign(**{dim: self.cells[dim].map(mapping)}).rename(columns={dim: name})
+        dims = tuple(name if d == dim else d for d in self.dims)
+        return Cube(cells.groupby(list(dims), observed=True, dropna=False, sort=True)[list(MEASURES)]
+                    .sum().reset_index(), dims)
+
+    def rollup(self, by=(), min_count=0, where=None, dropna=True):
+        """Measure per kombinasi dimensi `by` beserta rating_mean, rating_std,
+        delivery_mean, delivery_std, dan repurchase_rate.
+
+        `where` berisi {dimensi: nilai yang dipertahankan} sebelum roll-up,
+        `min_count` membuang grup dengan jumlah review di bawahnya, dan
+        `dropna` membuang grup dengan dimensi NaN (seperti groupby pandas).
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        unknown = [d for d in by + list(where or {}) if d not in self.dims]
+        if unknown:
+            raise KeyError(f"Dimensi tidak ada di cube: {unknown}")
+        cells = self.cells
+        for dim, values in (where or {}).items():
+            cells = cells[cells[dim].isin(values)]
+        if by:
+            result = cells.groupby(by, observed=True, dropna=dropna, sort=True)[list(MEASURES)].sum().reset_index()
+        else:
+            result = cells[list(MEASURES)].sum().to_frame().T.astype(cells[list(MEASURES)].dtypes)
+        result = result[result['n'] >= max(min_count, 1)].reset_index(drop=True)
+        return add_derived(result)
+
+    def to_parquet(self, path):
+        self.cells.to_parquet(path, index=False)
+
+    @classmethod
+    def read_parquet(cls, path):
+        cells = pd.read_parquet(path)
+        return cls(cells, [c for c in cells.columns if c not in MEASURES])
+
+
+def _std(count, total, squares):
+    # Variansi sampel dari jumlah dan jumlah kuadrat; dipotong di nol untuk galat pembulatan
+    variance = (squares - total * total / count) / (count - 1)
+    return np.sqrt(variance.clip(lower=0).where(count > 1))
+
+
+def add_derived(result):
+    """Tambahkan kolom rata-rata, simpangan baku, dan rasio dari measure aditif"""
+    n = result['n'].astype('float64')
+    delivery_n = result['delivery_n'].astype('float64')
+    return result.assign(
+        rating_mean=result['rating_sum'] / n,
+        rating_std=_std(n, result['rating_sum'].astype('float64'), result['rating_sq'].astype('float64')),
+        delivery_mean=(result['delivery_sum'] / delivery_n).where(delivery_n > 0),
+        delivery_std=_std(delivery_n, result['delivery_sum'], result['delivery_sq']),
+        repurchase_rate=result['repurchased'] / n,
+    )
+
+
+def rating_cube(delivery_review):
+    """Cube grain order dengan dimensi bulan, rating, dan status pengiriman langsung dari
+    delivery_review, tanpa state dan repurchase (untuk ingest inkremental)"""
+    facts = delivery_review.rename(columns={'order_month': 'month'}).assign(repurchased=False)
+    return Cube.from_facts(facts, ('month', 'review_score', 'delivery_status'))
+
+
+def rating_delivery_corr(cube, by):
+    """Korelasi Pearson waktu pengiriman vs rating per grup `by`, dihitung dari jumlah
+    per sel karena review_score adalah dimensi cube (sum x*y = sum rating * delivery_sum)"""
+    by = [by] if isinstance(by, str) else list(by)
+    cells = cube.cells[cube.cells['delivery_n'] > 0]
+    cells = cells.assign(cross=cells['review_score'].astype('float64') * cells['delivery_sum'],
+                         pair_rating=cells['review_score'].astype('float64') * cells['delivery_n'],
+                         pair_rating_sq=cells['review_score'].astype('float64') ** 2 * cells['delivery_n'])
+    sums = cells.groupby(by, observed=True, sort=True)[
+        ['delivery_n', 'delivery_sum', 'delivery_sq', 'pair_rating', 'pair_rating_sq', 'cross']].sum()
+    n = sums['delivery_n'].astype('float64')
+    cov = sums['cross'] - sums['delivery_sum'] * sums['pair_rating'] / n
+    var_x = sums['delivery_sq'] - sums['delivery_sum'] ** 2 / n
+    var_y = sums['pair_rating_sq'] - sums['pair_rating'] ** 2 / n
+    denominator = np.sqrt(var_x * var_y)
+    return (cov / denominator).where((n > 1) & (denominator > 0))
+
+
+def build_cubes(delivery_review, repurchase, customers, items):
+    """Cube grain `order` dan `item` dari pesanan dengan review dan waktu pengiriman"""
+    return {
+        'order': Cube.from_facts(fact_table(delivery_review, repurchase, customers), GRAINS['order']),
+        'item': Cube.from_facts(fact_table(delivery_review, repurchase, customers, items), GRAINS['item']),
+    }
+
+
+def write_cubes(cubes, cube_dir):
+    """Simpan setiap cube sebagai `<grain>.parquet` di `cube_dir`"""
+    cube_dir.mkdir(parents=True, exist_ok=True)
+    for grain, cube in cubes.items():
+        cube.to_parquet(cube_dir / f'{grain}.parquet')
+
+
+def load_cubes(cube_dir):
+    """Baca cube yang ditulis `write_cubes`: dict grain -> Cube"""
+    return {path.stem: Cube.read_parquet(path) for path in sorted(cube_dir.glob('*.parquet'))}
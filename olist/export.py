@@ -0,0 +1,620 @@
+"""Konversi hasil analisis ke tabel chart bertipe (chart_store) dan ke format
+panjang main_data.csv (chart,subchart,x,y,value,note)."""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from . import chart_store, uncertainty
+from .cube import rating_cube, write_cubes
+from .features import DELIVERY_STATUS_ORDER
+from .sketch import GroupSketches
+from .stats import GroupStats
+
+MAIN_DATA_COLUMNS = ['chart', 'subchart', 'x', 'y', 'value', 'note']
+BOXPLOT_STATS = {'mean': 'mean', 'std': 'std', 'min': 'min', '25%': 'q25', '50%': 'q50',
+                 '75%': 'q75', 'max': 'max', 'count': 'count', 'whislo': 'whislo', 'whishi': 'whishi'}
+REPURCHASE_BINS = [0, 5, 10, 15, 20, 25, 30]
+RATING_TARGET_LABEL = 'Target (90 hari)'
+CHART_DIR_NAME = 'charts'
+CUBE_DIR_NAME = 'cube'
+DELIVERY_RATING_PAIR = ('delivery_time_days', 'review_score')
+DELIVERY_BIN_DAYS = 1.0
+# Target 90 hari: rating bulan terakhir + 0.5 poin, tingkat repurchase naik 25%
+RATING_TARGET_DELTA = 0.5
+REPURCHASE_TARGET_FACTOR = 1.25
+# Rasio yang diberi interval kepercayaan: tabel -> [(kolom persen, kolom pembilang, kolom penyebut)]
+PROPORTION_INTERVALS = {
+    'repurchase_summary': [('repurchase_rate', 'total_repurchase', 'total_negative_reviews')],
+    'repurchase_by_rating': [('repurchase_pct', 'repurchase_count', 'count')],
+    'top_repurchase_categories': [('repurchase_pct', 'repurchase_count', 'count')],
+    'category_comparison': [('repurchase_pct', 'repurchase_count', 'count'),
+                            ('negative_review_pct', 'negative_review_count', 'total_review_count')],
+}
+# Rata-rata rating yang diberi interval: tabel -> [(kolom, kolom jumlah review per skor)]
+MEAN_INTERVALS = {
+    'monthly_ratings': [('review_score_mean', chart_store.SCORE_COUNT_COLUMNS)],
+}
+
+
+def delivery_rating_bins(delivery_review_df, width=DELIVERY_BIN_DAYS):
+    """Jumlah order per (bin waktu pengiriman, rating) dari seluruh data, pengganti sample scatter"""
+    data = delivery_review_df[list(DELIVERY_RATING_PAIR)].dropna()
+    days = np.floor(data['delivery_time_days'].to_numpy(dtype='float64') / width) * width
+    counts = data.groupby([days, data['review_score']], observed=True, sort=True).size()
+    return counts.rename_axis(['delivery_day', 'review_score']).reset_index(name='count')
+
+
+def delivery_tables(delivery_review_df, order_cube=None):
+    """Tabel untuk halaman Delivery & Rating Analysis; `order_cube` adalah cube grain order
+    dari pipeline, atau dibangun dari `delivery_review_df` jika tidak diberikan"""
+    # Momen dari GroupStats, kuartil/whisker dari sketch kuantil per rating: dashboard
+    # menggambar boxplot dari tabel ini (Axes.bxp) tanpa membaca baris mentah
+    rating_stats = GroupStats.from_frame(delivery_review_df, 'review_score', columns=DELIVERY_RATING_PAIR,
+                                         pairs=[DELIVERY_RATING_PAIR])
+    rating_sketches = GroupSketches.from_frame(delivery_review_df, 'review_score', 'delivery_time_days')
+    per_rating = rating_sketches.box_stats().assign(
+        count=rating_stats.count('delivery_time_days'),
+        mean=rating_stats.mean('delivery_time_days'),
+        std=rating_stats.std('delivery_time_days'),
+    ).rename_axis('review_score').reset_index()
+
+    # Rating per status dan per bulan di-roll-up dari cube grain order
+    if order_cube is None:
+        order_cube = rating_cube(delivery_review_df)
+    status = (order_cube.rollup('delivery_status')
+              .set_index('delivery_status')
+              .reindex(DELIVERY_STATUS_ORDER)
+              [['rating_mean', 'n']]
+              .fillna({'n': 0})
+              .astype({'n': 'int64'})
+              .rename(columns={'rating_mean': 'review_score_mean', 'n': 'count'}))
+    status['pct'] = status['count'] / status['count'].sum() * 100
+    status = status.rename_axis('delivery_status').reset_index()
+
+    monthly = order_cube.rollup('month')
+    scores = (order_cube.rollup(['month', 'review_score'])
+              .pivot(index='month', columns='review_score', values='n')
+              .reindex(index=monthly['month'], columns=chart_store.REVIEW_SCORES)
+              .fillna(0)
+              .astype('int64'))
+    monthly = pd.DataFrame({
+        'month': monthly['month'].dt.to_timestamp(),
+        'review_score_mean': monthly['rating_mean'].to_numpy(),
+        'count': monthly['n'].to_numpy(),
+        **{col: scores[score].to_numpy() for col, score in zip(chart_store.SCORE_COUNT_COLUMNS,
+                                                                chart_store.REVIEW_SCORES)},
+    })
+
+    last_rating = monthly['review_score_mean'].iloc[-1] if not monthly.empty else np.nan
+    # Statistik keseluruhan digabung dari momen per rating, tanpa lintasan kedua atas baris order
+    overall = rating_stats.total()
+    summary = pd.DataFrame([{
+        'correlation': overall.corr(*DELIVERY_RATING_PAIR).iloc[0],
+        'delivery_time_mean': overall.mean('delivery_time_days').iloc[0],
+        'review_score_mean': overall.mean('review_score').iloc[0],
+        'delivery_time_p95': rating_sketches.total().quantile(0.95),
+        'last_month': monthly['month'].iloc[-1] if not monthly.empty else pd.NaT,
+        'last_rating': last_rating,
+        'target_rating': last_rating + RATING_TARGET_DELTA,
+    }])
+    return {
+        'delivery_summary': summary,
+        'delivery_rating_bins': delivery_rating_bins(delivery_review_df),
+        'delivery_regression': overall.regression(*DELIVERY_RATING_PAIR).reset_index(drop=True),
+        'delivery_per_rating': per_rating,
+        'delivery_status': status,
+        'monthly_ratings': monthly,
+    }
+
+
+def repurchase_counters(repurchase_df):
+    """Counter yang cukup untuk semua tabel halaman Repurchase.
+
+    Mengembalikan (per skor: count, decided, repurchased) dan histogram
+    days_to_repurchase pembeli ulang <= 30 hari. `decided` adalah review yang
+    sudah punya order berikutnya (flag tidak <NA>). Keduanya bisa ditambah
+    per batch (lihat incremental.py).
+    """
+    flags = repurchase_df['repurchased_30days']
+    by_score = pd.DataFrame({
+        'review_score': repurchase_df['review_score'],
+        'decided': flags.notna(),
+        'repurchased': flags.fillna(False).astype(bool),
+    }).groupby('review_score', observed=True).agg(
+        count=('decided', 'size'), decided=('decided', 'sum'), repurchased=('repurchased', 'sum')
+    ).astype('int64').reset_index()
+
+    days = repurchase_df.loc[flags.fillna(False).astype(bool), 'days_to_repurchase'].astype('int64')
+    histogram = days.value_counts().sort_index().rename_axis('days').rename('count').astype('int64')
+    return by_score, histogram
+
+
+def repurchase_tables(repurchase_df):
+    """Tabel untuk halaman Repurchase Analysis"""
+    return repurchase_tables_from_counters(*repurchase_counters(repurchase_df))
+
+
+def repurchase_tables_from_counters(by_score, histogram):
+    """Tabel halaman Repurchase dari counter `repurchase_counters`"""
+    total_negative_reviews = int(by_score['count'].sum())
+    total_repurchase = int(by_score['repurchased'].sum())
+    repurchase_rate = total_repurchase / total_negative_reviews * 100 if total_negative_reviews else 0.0
+
+    decided = by_score[by_score['decided'] > 0]
+    by_rating = pd.DataFrame({
+        'review_score': decided['review_score'].to_numpy(),
+        'repurchase_pct': decided['repurchased'].to_numpy(dtype='float64') / decided['decided'].to_numpy() * 100,
+        'repurchase_count': decided['repurchased'].to_numpy(dtype='int64'),
+        'count': decided['decided'].to_numpy(dtype='int64'),
+    })
+
+    histogram = histogram[histogram > 0]
+    days = histogram.index.to_numpy(dtype='float64')
+    bin_counts = (histogram.groupby(pd.cut(days, bins=REPURCHASE_BINS), observed=False).sum()
+                  .astype('int64').sort_index())
+    distribution = pd.DataFrame({
+        'days_bin': [str(interval) for interval in bin_counts.index],
+        'pct': bin_counts.to_numpy() / max(bin_counts.sum(), 1) * 100,
+        'count': bin_counts.to_numpy(),
+    })
+    if histogram.empty:
+        distribution = distribution.iloc[:0]
+
+    target_rate = repurchase_rate * REPURCHASE_TARGET_FACTOR
+    summary = pd.DataFrame([{
+        'total_negative_reviews': total_negative_reviews,
+        'total_repurchase': total_repurchase,
+        'repurchase_rate': repurchase_rate,
+        'median_days_to_repurchase': np.median(np.repeat(days, histogram.to_numpy())) if not histogram.empty else np.nan,
+        'target_rate': target_rate,
+        'target_repurchase': int(total_negative_reviews * target_rate / 100),
+    }])
+    return {
+        'repurchase_summary': summary,
+        'repurchase_by_rating': by_rating,
+        'repurchase_time_distribution': distribution,
+    }
+
+
+def category_tables(category):
+    """Tabel kategori produk: rating terendah, repurchase tertinggi, dan perbandingan"""
+    worst = category['worst'].head(10)
+    top = category['repurchase_by_category'].head(10)
+    comparison = category['comparison']
+    return {
+        'worst_categories': pd.DataFrame({
+            'category': worst['product_category_name_english'],
+            'review_score_mean': worst['review_score_mean'],
+            'delivery_time_mean': worst['delivery_time_days_mean'],
+        }),
+        'top_repurchase_categories': pd.DataFrame({
+            'category': top['product_category_name_english'],
+            'repurchase_pct': top['repurchase_pct'],
+            'repurchase_count': (top['mean'].astype(float) * top['count']).round(),
+            'count': top['count'],
+        }),
+        'category_comparison': pd.DataFrame({
+            'category': comparison['product_category_name_english'],
+            'repurchase_pct': comparison['repurchase_pct'],
+            'negative_review_pct': comparison['negative_review_pct'],
+            'repurchase_count': (comparison['mean'].astype(float) * comparison['count']).round(),
+            'count': comparison['count'],
+            'negative_review_count': comparison['negative_review_count'],
+            'total_review_count': comparison['total_review_count'],
+        }),
+    }
+
+
+def geo_tables(geo):
+    """Tabel agregat per state"""
+    return {
+        'state_corr': geo['state_corr'],
+        'state_delivery': geo['state_delivery'].rename(columns={'delivery_time_days': 'delivery_time_mean'}),
+        'repurchase_state': geo['repurchase_state'],
+        'problematic_categories': geo['problematic'],
+    }
+
+
+def seller_chart_tables(sellers):
+    """Leaderboard seller dan ringkasan per rentang jarak"""
+    return {'seller_leaderboard': sellers['leaderboard'], 'seller_distance': sellers['distance']}
+
+
+def _assign_intervals(tables, targets, intervals, scale=1.0):
+    """Pecah interval hasil satu resampling (grup semua `targets` berurutan) ke kolom tabelnya"""
+    offset = 0
+    for key, column in targets:
+        size = len(tables[key])
+        columns = {}
+        for method, bounds in intervals.items():
+            for name, values in zip(chart_store.interval_columns(column, method), bounds):
+                columns[name] = values[offset:offset + size] * scale
+        tables[key] = tables[key].assign(**columns)
+        offset += size
+
+
+def with_intervals(tables):
+    """Salinan `tables` dengan interval 95% (bootstrap dan Wilson/normal, lihat olist/uncertainty.py)
+    untuk setiap rasio, rata-rata rating bulanan, dan targetnya. Interval setiap grup hanya
+    bergantung pada jumlah grup itu, bukan pada tabel lain yang ikut dihitung."""
+    tables = dict(tables)
+    proportions = [(key, col, num, den) for key, specs in PROPORTION_INTERVALS.items() if key in tables
+                   for col, num, den in specs]
+    if proportions:
+        successes = np.concatenate([tables[key][num].to_numpy('float64') for key, _, num, _ in proportions])
+        totals = np.concatenate([tables[key][den].to_numpy('float64') for key, _, _, den in proportions])
+        _assign_intervals(tables, [(key, col) for key, col, _, _ in proportions],
+                          uncertainty.proportion_intervals(successes, totals), scale=100)
+    means = [(key, col, counts) for key, specs in MEAN_INTERVALS.items() if key in tables for col, counts in specs]
+    if means:
+        counts = np.concatenate([tables[key][list(cols)].to_numpy('float64') for key, _, cols in means])
+        _assign_intervals(tables, [(key, col) for key, col, _ in means],
+                          uncertainty.mean_intervals(counts, chart_store.REVIEW_SCORES))
+
+    # Target adalah fungsi tetap dari estimasinya, jadi intervalnya ikut bergeser/berskala
+    if 'repurchase_summary' in tables:
+        summary = tables['repurchase_summary']
+        columns = {}
+        for method in ('boot', 'wilson'):
+            for source, target in zip(chart_store.interval_columns('repurchase_rate', method),
+                                      chart_store.interval_columns('target_rate', method)):
+                columns[target] = summary[source] * REPURCHASE_TARGET_FACTOR
+        tables['repurchase_summary'] = summary.assign(**columns)
+    if 'delivery_summary' in tables:
+        monthly = tables.get('monthly_ratings')
+        last = monthly.iloc[-1] if monthly is not None and not monthly.empty else None
+        columns = {}
+        for method in ('boot', 'normal'):
+            for source, current, target in zip(chart_store.interval_columns('review_score_mean', method),
+                                               chart_store.interval_columns('last_rating', method),
+                                               chart_store.interval_columns('target_rating', method)):
+                value = last[source] if last is not None else np.nan
+                columns[current] = value
+                columns[target] = value + RATING_TARGET_DELTA
+        tables['delivery_summary'] = tables['delivery_summary'].assign(**columns)
+    return tables
+
+
+def build_chart_tables(delivery_review_df, repurchase, category, geo, sellers=None, cubes=None):
+    tables = {}
+    tables.update(delivery_tables(delivery_review_df, cubes['order'] if cubes is not None else None))
+    tables.update(category_tables(category))
+    tables.update(repurchase_tables(repurchase['repurchase']))
+    tables.update(geo_tables(geo))
+    if sellers is not None:
+        tables.update(seller_chart_tables(sellers))
+    return {key: chart_store.conform(key, df) for key, df in with_intervals(tables).items()}
+
+
+def _row(chart, value, subchart='', x='', y='', note=''):
+    return {'chart': chart, 'subchart': subchart, 'x': x, 'y': y, 'value': value, 'note': note}
+
+
+def delivery_rows(tables):
+    """Baris main_data untuk halaman Delivery & Rating Analysis"""
+    rows = []
+    summary = next(tables['delivery_summary'].itertuples(index=False))
+    rows.append(_row('scatter_correlation', summary.correlation, note='Korelasi waktu pengiriman vs rating review'))
+    rows.append(_row('scatter_correlation', summary.delivery_time_p95, subchart='p95',
+                     note='Persentil 95 waktu pengiriman (batas sumbu)'))
+    for row in tables['delivery_rating_bins'].itertuples(index=False):
+        rows.append(_row('scatter_density', float(row.count), x=row.delivery_day, y=int(row.review_score)))
+    for row in tables['delivery_regression'].itertuples(index=False):
+        for stat in chart_store.CHART_SCHEMAS['delivery_regression']:
+            rows.append(_row('scatter_regression', float(getattr(row, stat)), subchart=stat))
+
+    per_rating = tables['delivery_per_rating']
+    for row in per_rating.itertuples(index=False):
+        for stat, col in BOXPLOT_STATS.items():
+            rows.append(_row('boxplot_delivery_per_rating', float(getattr(row, col)), subchart=stat,
+                             x=int(row.review_score)))
+    for row in per_rating.itertuples(index=False):
+        rows.append(_row('barplot_mean_delivery_per_rating', row.mean, x=float(row.review_score)))
+    rows.append(_row('barplot_mean_delivery_per_rating', summary.delivery_time_mean,
+                     subchart='overall_mean', note='Rata-rata keseluruhan'))
+
+    status = tables['delivery_status']
+    for row in status.itertuples(index=False):
+        rows.append(_row('barplot_rating_per_delivery_status', row.review_score_mean, x=row.delivery_status,
+                         note=f'count={row.count}'))
+    rows.append(_row('barplot_rating_per_delivery_status', summary.review_score_mean,
+                     subchart='overall_mean', note='Rata-rata keseluruhan'))
+    for row in status.itertuples(index=False):
+        rows.append(_row('barplot_status_distribution', row.pct, x=row.delivery_status, note=f'count={row.count}'))
+
+    monthly = tables['monthly_ratings']
+    for row, scores in zip(monthly.itertuples(index=False), monthly[chart_store.SCORE_COUNT_COLUMNS].to_numpy()):
+        rows.append(_row('monthly_ratings', row.review_score_mean, x=row.month.strftime('%Y-%m'),
+                         note=f"count={row.count}, scores={'/'.join(str(n) for n in scores)}"))
+    if pd.notna(summary.last_month):
+        rows.append(_row('monthly_ratings_projection', summary.last_rating, subchart='current',
+                         x=summary.last_month.strftime('%Y-%m'), note='Rating terakhir'))
+        rows.append(_row('monthly_ratings_projection', summary.target_rating, subchart='target',
+                         x=RATING_TARGET_LABEL, note='Target rating 90 hari'))
+    return rows
+
+
+def repurchase_rows(tables):
+    """Baris main_data untuk halaman Repurchase Analysis"""
+    rows = []
+    summary = next(tables['repurchase_summary'].itertuples(index=False))
+    rows.append(_row('repurchase_pie', summary.repurchase_rate, x='repurchase_rate'))
+    rows.append(_row('repurchase_pie', float(summary.total_negative_reviews), x='total_negative_reviews'))
+    rows.append(_row('repurchase_pie', float(summary.total_repurchase), x='total_repurchase'))
+
+    for row in tables['repurchase_by_rating'].itertuples(index=False):
+        rows.append(_row('repurchase_by_rating', row.repurchase_pct, x=int(row.review_score),
+                         note=f'{row.repurchase_count}/{row.count}'))
+
+    for row in tables['repurchase_time_distribution'].itertuples(index=False):
+        rows.append(_row('repurchase_time_distribution', row.pct, x=row.days_bin, note=f'count={row.count}'))
+    if pd.notna(summary.median_days_to_repurchase):
+        rows.append(_row('repurchase_time_distribution', summary.median_days_to_repurchase, subchart='median',
+                         note='Median hari hingga repurchase'))
+
+    total = summary.total_negative_reviews
+    rows.append(_row('repurchase_projection', summary.repurchase_rate, x='current',
+                     note=f'({summary.total_repurchase} dari {total})'))
+    rows.append(_row('repurchase_projection', summary.target_rate, x='target',
+                     note=f'({summary.target_repurchase} dari {total})'))
+    return rows
+
+
+def category_rows(tables):
+    """Baris main_data kategori produk"""
+    rows = []
+    for row in tables['worst_categories'].itertuples(index=False):
+        rows.append(_row('worst_categories', row.review_score_mean, subchart='rating', x=row.category))
+        rows.append(_row('worst_categories', row.delivery_time_mean, subchart='delivery_time', x=row.category))
+    for row in tables['top_repurchase_categories'].itertuples(index=False):
+        rows.append(_row('top_repurchase_categories', row.repurchase_pct, x=row.category,
+                         note=f'{row.repurchase_count}/{row.count}'))
+    for row in tables['category_comparison'].itertuples(index=False):
+        rows.append(_row('category_comparison', row.repurchase_pct, subchart='repurchase_percentage', x=row.category,
+                         note=f'{row.repurchase_count}/{row.count}'))
+        rows.append(_row('category_comparison', row.negative_review_pct, subchart='negative_review_pct',
+                         x=row.category, note=f'{row.negative_review_count}/{row.total_review_count}'))
+    return rows
+
+
+def geo_rows(tables):
+    """Baris main_data agregat per state"""
+    rows = []
+    for row in tables['state_corr'].itertuples(index=False):
+        rows.append(_row('state_corr', row.corr_delivery_rating, x=row.customer_state))
+    for row in tables['state_delivery'].itertuples(index=False):
+        rows.append(_row('state_delivery', row.delivery_time_mean, x=row.customer_state))
+    for row in tables['repurchase_state'].itertuples(index=False):
+        rows.append(_row('repurchase_state', row.repurchase_rate, x=row.customer_state,
+                         note=f'repurchase={row.repurchase_30d}, total={row.total_neg}'))
+
+    problematic = tables['problematic_categories']
+    for state, count in problematic.groupby('customer_state').size().items():
+        rows.append(_row('problematic_category_count', float(count), x=state))
+    for row in problematic.itertuples(index=False):
+        rows.append(_row('problematic_categories_detail', row.avg_rating, x=row.customer_state,
+                         y=row.product_category_name,
+                         note=f'repurchase_rate={row.repurchase_rate:.2f}, count={row.count}'))
+    return rows
+
+
+SELLER_LEADERBOARD_METRICS = ('on_time_rate', 'mean_delay_days', 'rating_mean', 'distance_km_mean')
+SELLER_DISTANCE_METRICS = ('delivery_time_mean', 'on_time_rate', 'rating_mean')
+
+
+def seller_rows(tables):
+    """Baris main_data performa seller"""
+    rows = []
+    for row in tables.get('seller_leaderboard', chart_store.empty_chart('seller_leaderboard')).itertuples(index=False):
+        for metric in SELLER_LEADERBOARD_METRICS:
+            rows.append(_row('seller_leaderboard', getattr(row, metric), subchart=metric, x=row.seller_id,
+                             y=row.rank_group, note=f'rank={row.rank}, items={row.items}, state={row.seller_state}'))
+    for row in tables.get('seller_distance', chart_store.empty_chart('seller_distance')).itertuples(index=False):
+        for metric in SELLER_DISTANCE_METRICS:
+            rows.append(_row('seller_distance', getattr(row, metric), subchart=metric, x=row.distance_bin,
+                             note=f'items={row.items}'))
+    return rows
+
+
+def build_main_data(tables):
+    """Format panjang main_data.csv dari tabel chart"""
+    rows = (delivery_rows(tables) + category_rows(tables) + repurchase_rows(tables) + geo_rows(tables)
+            + seller_rows(tables))
+    return pd.DataFrame(rows, columns=MAIN_DATA_COLUMNS)
+
+
+def _note_ints(notes):
+    """Semua bilangan bulat dalam kolom note, satu kolom per bilangan"""
+    return notes.fillna('').str.findall(r'\d+').apply(lambda nums: [int(n) for n in nums])
+
+
+def from_main_data(main_data):
+    """Bangun ulang tabel chart dari main_data.csv lama (untuk dashboard tanpa chart store).
+
+    Satu-satunya tempat string note di-parse; dilakukan sekali saat load.
+    """
+    main_data = main_data.fillna({'subchart': '', 'note': ''})
+    charts = {key: df for key, df in main_data.groupby('chart', sort=False)}
+    empty = pd.DataFrame(columns=MAIN_DATA_COLUMNS)
+
+    def chart(key, subchart=None):
+        df = charts.get(key, empty)
+        return df if subchart is None else df[df['subchart'] == subchart]
+
+    def scalar(key, subchart='', x=None):
+        df = chart(key, subchart)
+        if x is not None:
+            df = df[df['x'] == x]
+        return df['value'].iloc[0] if not df.empty else np.nan
+
+    tables = {}
+    density = chart('scatter_density')
+    tables['delivery_rating_bins'] = pd.DataFrame({
+        'delivery_day': density['x'].astype(float), 'review_score': density['y'].astype(float).astype(int),
+        'count': density['value'],
+    })
+    # main_data.csv lama tidak punya baris ini: tabel kosong, dashboard menghitungnya dari data mentah
+    regression = chart('scatter_regression')
+    tables['delivery_regression'] = pd.DataFrame(
+        [dict(zip(regression['subchart'], regression['value']))] if not regression.empty else [],
+        columns=list(chart_store.CHART_SCHEMAS['delivery_regression']))
+
+    box = chart('boxplot_delivery_per_rating')
+    per_rating = box.pivot_table(index='x', columns='subchart', values='value', aggfunc='first')
+    tables['delivery_per_rating'] = (per_rating.rename(columns=BOXPLOT_STATS)
+                                     .rename_axis('review_score').reset_index()
+                                     .reindex(columns=list(chart_store.CHART_SCHEMAS['delivery_per_rating'])))
+    tables['delivery_per_rating']['review_score'] = per_rating.index.astype(float).astype(int)
+
+    rating = chart('barplot_rating_per_delivery_status', '')
+    dist = chart('barplot_status_distribution')
+    status = pd.DataFrame({'delivery_status': rating['x'], 'review_score_mean': rating['value'].to_numpy(),
+                           'count': [nums[0] for nums in _note_ints(rating['note'])]})
+    tables['delivery_status'] = status.merge(dist[['x', 'value']].rename(columns={'x': 'delivery_status',
+                                                                                  'value': 'pct'}),
+                                             on='delivery_status', how='left')
+
+    monthly = chart('monthly_ratings')
+    monthly_counts = _note_ints(monthly['note'])
+    # main_data.csv lama belum mencatat jumlah per skor: 0 (interval bulanan kosong)
+    scores = [nums[1:] if len(nums) > len(chart_store.REVIEW_SCORES) else [0] * len(chart_store.REVIEW_SCORES)
+              for nums in monthly_counts]
+    tables['monthly_ratings'] = pd.DataFrame({
+        'month': pd.to_datetime(monthly['x'], format='%Y-%m'),
+        'review_score_mean': monthly['value'],
+        'count': [nums[0] for nums in monthly_counts],
+        **dict(zip(chart_store.SCORE_COUNT_COLUMNS,
+                   np.array(scores, dtype='int64').reshape(-1, len(chart_store.REVIEW_SCORES)).T)),
+    })
+    current = chart('monthly_ratings_projection', 'current')
+    tables['delivery_summary'] = pd.DataFrame([{
+        'correlation': scalar('scatter_correlation'),
+        'delivery_time_mean': scalar('barplot_mean_delivery_per_rating', 'overall_mean'),
+        'review_score_mean': scalar('barplot_rating_per_delivery_status', 'overall_mean'),
+        'delivery_time_p95': scalar('scatter_correlation', 'p95'),
+        'last_month': pd.to_datetime(current['x'].iloc[0], format='%Y-%m') if not current.empty else pd.NaT,
+        'last_rating': scalar('monthly_ratings_projection', 'current'),
+        'target_rating': scalar('monthly_ratings_projection', 'target'),
+    }])
+
+    rating, neg = chart('worst_categories', 'rating'), chart('worst_categories', 'delivery_time')
+    worst = rating[['x', 'value']].merge(neg[['x', 'value']], on='x', suffixes=('_rating', '_delivery'))
+    tables['worst_categories'] = pd.DataFrame({'category': worst['x'], 'review_score_mean': worst['value_rating'],
+                                               'delivery_time_mean': worst['value_delivery']})
+
+    top = chart('top_repurchase_categories')
+    top_counts = _note_ints(top['note'])
+    tables['top_repurchase_categories'] = pd.DataFrame({
+        'category': top['x'], 'repurchase_pct': top['value'],
+        'repurchase_count': [nums[0] for nums in top_counts], 'count': [nums[1] for nums in top_counts],
+    })
+    rep, neg = chart('category_comparison', 'repurchase_percentage'), chart('category_comparison', 'negative_review_pct')
+    comparison = rep[['x', 'value', 'note']].merge(neg[['x', 'value', 'note']], on='x', suffixes=('_rep', '_neg'))
+    # Jumlah (pembilang/penyebut) dari note; 0 untuk main_data.csv lama tanpa note
+    rep_counts = [nums if len(nums) == 2 else [0, 0] for nums in _note_ints(comparison['note_rep'])]
+    neg_counts = [nums if len(nums) == 2 else [0, 0] for nums in _note_ints(comparison['note_neg'])]
+    tables['category_comparison'] = pd.DataFrame({
+        'category': comparison['x'], 'repurchase_pct': comparison['value_rep'],
+        'negative_review_pct': comparison['value_neg'],
+        'repurchase_count': [nums[0] for nums in rep_counts], 'count': [nums[1] for nums in rep_counts],
+        'negative_review_count': [nums[0] for nums in neg_counts],
+        'total_review_count': [nums[1] for nums in neg_counts],
+    })
+
+    projection = chart('repurchase_projection')
+    target_counts = _note_ints(projection.loc[projection['x'] == 'target', 'note'])
+    tables['repurchase_summary'] = pd.DataFrame([{
+        'total_negative_reviews': scalar('repurchase_pie', x='total_negative_reviews'),
+        'total_repurchase': scalar('repurchase_pie', x='total_repurchase'),
+        'repurchase_rate': scalar('repurchase_pie', x='repurchase_rate'),
+        'median_days_to_repurchase': scalar('repurchase_time_distribution', 'median'),
+        'target_rate': scalar('repurchase_projection', x='target'),
+        'target_repurchase': target_counts.iloc[0][0] if not target_counts.empty else 0,
+    }])
+    by_rating = chart('repurchase_by_rating')
+    rating_counts = _note_ints(by_rating['note'])
+    tables['repurchase_by_rating'] = pd.DataFrame({
+        'review_score': by_rating['x'].astype(float).astype(int), 'repurchase_pct': by_rating['value'],
+        'repurchase_count': [nums[0] for nums in rating_counts], 'count': [nums[1] for nums in rating_counts],
+    })
+    time_dist = chart('repurchase_time_distribution', '')
+    tables['repurchase_time_distribution'] = pd.DataFrame({
+        'days_bin': time_dist['x'], 'pct': time_dist['value'],
+        'count': [nums[0] for nums in _note_ints(time_dist['note'])],
+    })
+
+    tables['state_corr'] = pd.DataFrame({'customer_state': chart('state_corr')['x'],
+                                         'corr_delivery_rating': chart('state_corr')['value']})
+    tables['state_delivery'] = pd.DataFrame({'customer_state': chart('state_delivery')['x'],
+                                             'delivery_time_mean': chart('state_delivery')['value']})
+    state = chart('repurchase_state')
+    state_counts = _note_ints(state['note'])
+    tables['repurchase_state'] = pd.DataFrame({
+        'customer_state': state['x'], 'total_neg': [nums[1] for nums in state_counts],
+        'repurchase_30d': [nums[0] for nums in state_counts], 'repurchase_rate': state['value'],
+    })
+    detail = chart('problematic_categories_detail')
+    tables['problematic_categories'] = pd.DataFrame({
+        'customer_state': detail['x'], 'product_category_name': detail['y'], 'avg_rating': detail['value'],
+        'repurchase_rate': detail['note'].str.extract(r'repurchase_rate=([\d.]+)', expand=False).astype(float),
+        'count': detail['note'].str.extract(r'count=(\d+)', expand=False).astype(float),
+    })
+
+    leaderboard = chart('seller_leaderboard')
+    ranked = leaderboard.pivot_table(index=['y', 'x', 'note'], columns='subchart', values='value', aggfunc='first')
+    ranked = ranked.reset_index().rename(columns={'y': 'rank_group', 'x': 'seller_id'})
+    notes = ranked['note'].str.extract(r'rank=(?P<rank>\d+), items=(?P<items>\d+), state=(?P<seller_state>.*)')
+    tables['seller_leaderboard'] = (
+        pd.concat([ranked, notes], axis=1)
+        .reindex(columns=list(chart_store.CHART_SCHEMAS['seller_leaderboard']))
+        .astype({'rank': float, 'items': float})
+        .sort_values(['rank_group', 'rank'], ascending=[False, True])
+    )
+    distance = chart('seller_distance')
+    by_bin = distance.pivot_table(index=['x', 'note'], columns='subchart', values='value', aggfunc='first',
+                                  sort=False).reset_index()
+    tables['seller_distance'] = by_bin.rename(columns={'x': 'distance_bin'}).assign(
+        items=by_bin['note'].str.extract(r'items=(\d+)', expand=False).astype(float)
+    ).reindex(columns=list(chart_store.CHART_SCHEMAS['seller_distance']))
+    return {key: chart_store.conform(key, df) for key, df in with_intervals(tables).items()}
+
+
+def write_outputs(out_dir, delivery_review_df, repurchase, category, geo, cubes=None, sellers=None):
+    """Tulis chart store, cube (jika ada), main_data.csv, dan delivery_review_df.parquet,
+    kembalikan path yang ditulis"""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    main_data_path = out_dir / 'main_data.csv'
+
+    tables = build_chart_tables(delivery_review_df, repurchase, category, geo, sellers, cubes)
+    chart_paths = chart_store.write_charts(out_dir / CHART_DIR_NAME, tables)
+    # main_data.csv tetap ditulis dari tabel yang sama sebagai ekspor yang bisa dibaca manusia
+    build_main_data(tables).to_csv(main_data_path, index=False)
+
+    # Frame ringkas bertipe: hanya kolom yang dipakai dashboard
+    delivery_path = chart_store.write_delivery_frame(out_dir, delivery_review_df)
+    paths = chart_paths + [main_data_path, delivery_path]
+    if cubes is not None:
+        cube_dir = out_dir / CUBE_DIR_NAME
+        write_cubes(cubes, cube_dir)
+        paths += [cube_dir / f'{grain}.parquet' for grain in cubes]
+    return paths
+
+
+def update_outputs(out_dir, tables, delivery_review_df=None):
+    """Tulis ulang hanya tabel chart `tables` (dan delivery_review_df jika diberikan),
+    lalu main_data.csv dari gabungan tabel baru dan tabel lama di chart store"""
+    out_dir = Path(out_dir)
+    chart_dir = out_dir / CHART_DIR_NAME
+    tables = {key: chart_store.conform(key, df) for key, df in with_intervals(tables).items()}
+    paths = chart_store.update_charts(chart_dir, tables)
+
+    main_data_path = out_dir / 'main_data.csv'
+    all_tables = chart_store.load_charts(chart_dir)
+    build_main_data(all_tables).to_csv(main_data_path, index=False)
+    paths.append(main_data_path)
+
+    if delivery_review_df is not None:
+        paths.append(chart_store.write_delivery_frame(out_dir, delivery_review_df))
+    return paths
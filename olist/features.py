@@ -0,0 +1,58 @@
+"""Turunan fitur pengiriman yang dipakai bersama oleh notebook, pipeline, dan dashboard.
+
+Semua fungsi bekerja sebagai operasi kolom (tanpa apply per baris), dan
+kategorisasi status memakai satu definisi: bin kanan-tertutup atas selisih
+hari pecahan, sama dengan `pd.cut` di notebook cell 120.
+"""
+import numpy as np
+import pandas as pd
+
+DELIVERY_STATUS_ORDER = ['Very Early (>3 days)', 'Early (1-3 days)', 'On Time (±1 day)',
+                         'Late (1-3 days)', 'Very Late (>3 days)']
+# Batas dalam antar bin (-inf, -3], (-3, -1], (-1, 1], (1, 3], (3, inf)
+DELIVERY_STATUS_EDGES = np.array([-3.0, -1.0, 1.0, 3.0])
+DELIVERY_STATUS_DTYPE = pd.CategoricalDtype(DELIVERY_STATUS_ORDER, ordered=True)
+
+ONE_DAY = pd.Timedelta(days=1)
+
+
+def days_between(end, start):
+    """Selisih dua kolom datetime dalam hari pecahan (NaN jika salah satu kosong)"""
+    return (end - start) / ONE_DAY
+
+
+def delivery_time_days(df):
+    """Waktu dari pembelian hingga diterima pelanggan, dalam hari"""
+    return days_between(df['order_delivered_customer_date'], df['order_purchase_timestamp'])
+
+
+def delivery_accuracy_days(df):
+    """Selisih tanggal diterima dengan estimasi; negatif berarti lebih cepat dari estimasi"""
+    return days_between(df['order_delivered_customer_date'], df['order_estimated_delivery_date'])
+
+
+def delivery_status(accuracy_days):
+    """Kategorikan selisih hari ke lima status ketepatan pengiriman (categorical berurutan)"""
+    values = np.asarray(accuracy_days, dtype='float64')
+    codes = np.searchsorted(DELIVERY_STATUS_EDGES, values, side='left')
+    codes[np.isnan(values)] = -1
+    index = accuracy_days.index if isinstance(accuracy_days, pd.Series) else None
+    return pd.Series(pd.Categorical.from_codes(codes, dtype=DELIVERY_STATUS_DTYPE),
+                     index=index, name='delivery_status')
+
+
+def order_month(purchase_timestamp):
+    """Periode bulanan dari waktu pembelian"""
+    return purchase_timestamp.dt.to_period('M')
+
+
+def add_delivery_features(df):
+    """Kembalikan salinan `df` dengan kolom delivery_time_days, delivery_accuracy_days,
+    delivery_status, dan order_month"""
+    accuracy = delivery_accuracy_days(df)
+    return df.assign(
+        delivery_time_days=delivery_time_days(df),
+        delivery_accuracy_days=accuracy,
+        delivery_status=delivery_status(accuracy),
+        order_month=order_month(df['order_purchase_timestamp']),
+    )
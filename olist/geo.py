@@ -0,0 +1,215 @@
+"""Indeks geolokasi per zip code prefix untuk geocoding pelanggan dan penjual.
+
+Menggantikan `geolocation_df.groupby(...).first()` dan `apply(Point)` per baris
+di notebook (cell 267/269). Tabel geolokasi (~1 juta baris) dibaca per
+potongan dengan hanya tiga kolom dan titik di luar Brazil dibuang. Titik yang
+tersisa disimpan sebagai array ringkas (int32/float32, 12 byte per titik), lalu
+setiap prefix diringkas menjadi median lat/lng (tahan terhadap titik nyasar)
+dalam satu groupby. Median eksak butuh semua titik satu prefix, jadi memori
+puncaknya tetap sebanding jumlah titik valid, bukan streaming. Hasilnya
+disimpan sebagai array terurut sehingga geocoding adalah satu `searchsorted`,
+dengan fallback ke prefix terdekat untuk prefix yang tidak ada di tabel.
+
+Geometri state untuk peta dashboard dibaca dari shapefile sekali saja, digabung
+per state, disederhanakan, lalu disimpan sebagai GeoJSON ringkas
+(`python -m olist geometries`), sehingga dashboard tidak perlu geopandas.
+"""
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from . import store
+from .paths import DATA_DIR, SHAPEFILE, STATE_GEOJSON, TABLES
+
+GEO_COLUMNS = ['geolocation_zip_code_prefix', 'geolocation_lat', 'geolocation_lng']
+DEFAULT_CHUNKSIZE = 250_000
+# Batas kasar wilayah Brazil (termasuk pulau Fernando de Noronha)
+LAT_RANGE = (-34.0, 5.5)
+LNG_RANGE = (-74.5, -28.5)
+
+MATCH_EXACT = 'exact'
+MATCH_NEAREST = 'nearest'
+MATCH_MISSING = 'missing'
+MATCH_DTYPE = pd.CategoricalDtype([MATCH_EXACT, MATCH_NEAREST, MATCH_MISSING])
+
+STATE_NAMES = {
+    'AC': 'Acre', 'AL': 'Alagoas', 'AP': 'Amapá', 'AM': 'Amazonas', 'BA': 'Bahia',
+    'CE': 'Ceará', 'DF': 'Distrito Federal', 'ES': 'Espírito Santo', 'GO': 'Goiás',
+    'MA': 'Maranhão', 'MT': 'Mato Grosso', 'MS': 'Mato Grosso do Sul', 'MG': 'Minas Gerais',
+    'PA': 'Pará', 'PB': 'Paraíba', 'PR': 'Paraná', 'PE': 'Pernambuco', 'PI': 'Piauí',
+    'RJ': 'Rio de Janeiro', 'RN': 'Rio Grande do Norte', 'RS': 'Rio Grande do Sul',
+    'RO': 'Rondônia', 'RR': 'Roraima', 'SC': 'Santa Catarina', 'SP': 'São Paulo',
+    'SE': 'Sergipe', 'TO': 'Tocantins'
+}
+# Toleransi penyederhanaan (derajat, ~2 km) dan presisi koordinat GeoJSON (~10 m)
+SIMPLIFY_TOLERANCE = 0.02
+COORDINATE_PRECISION = 4
+MISSING_COLOR = [220, 220, 220, 160]
+
+
+def iter_geolocation(data_dir=DATA_DIR, chunksize=DEFAULT_CHUNKSIZE):
+    """Hasilkan (prefix, lat, lng) sebagai array numpy per potongan tabel geolokasi"""
+    if store.is_converted('geolocation', data_dir):
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(store.parquet_path('geolocation', data_dir))
+        for batch in parquet_file.iter_batches(batch_size=chunksize, columns=GEO_COLUMNS):
+            yield tuple(batch.column(col).to_numpy(zero_copy_only=False) for col in GEO_COLUMNS)
+        return
+
+    dtypes = {col: store.SCHEMAS['geolocation'][col] for col in GEO_COLUMNS}
+    chunks = pd.read_csv(Path(data_dir) / TABLES['geolocation'], usecols=GEO_COLUMNS, dtype=dtypes,
+                         chunksize=chunksize, encoding='utf-8-sig')
+    for chunk in chunks:
+        yield tuple(chunk[col].to_numpy() for col in GEO_COLUMNS)
+
+
+class GeoIndex:
+    """Centroid (median lat/lng) per zip code prefix dalam array terurut"""
+
+    def __init__(self, prefixes, lat, lng, counts):
+        self.prefixes = np.asarray(prefixes, dtype='int32')
+        self.lat = np.asarray(lat, dtype='float32')
+        self.lng = np.asarray(lng, dtype='float32')
+        self.counts = np.asarray(counts, dtype='int32')
+
+    def __len__(self):
+        return len(self.prefixes)
+
+    @classmethod
+    def from_chunks(cls, chunks):
+        """Bangun indeks dari iterable (prefix, lat, lng). Setiap potongan hanya dipangkas ke titik
+        valid bertipe ringkas; median dihitung setelah semua potongan terkumpul (memori O(titik valid))."""
+        parts = []
+        for prefix, lat, lng in chunks:
+            valid = ((lat >= LAT_RANGE[0]) & (lat <= LAT_RANGE[1]) &
+                     (lng >= LNG_RANGE[0]) & (lng <= LNG_RANGE[1]))
+            parts.append((prefix[valid].astype('int32'), lat[valid].astype('float32'),
+                          lng[valid].astype('float32')))
+        if not parts:
+            return cls([], [], [], [])
+
+        points = pd.DataFrame({
+            'prefix': np.concatenate([p[0] for p in parts]),
+            'lat': np.concatenate([p[1] for p in parts]),
+            'lng': np.concatenate([p[2] for p in parts]),
+        })
+        centroids = points.groupby('prefix', sort=True).agg(
+            lat=('lat', 'median'), lng=('lng', 'median'), count=('lat', 'size')
+        )
+        return cls(centroids.index.to_numpy(), centroids['lat'].to_numpy(),
+                   centroids['lng'].to_numpy(), centroids['count'].to_numpy())
+
+    @classmethod
+    def from_file(cls, data_dir=DATA_DIR, chunksize=DEFAULT_CHUNKSIZE):
+        return cls.from_chunks(iter_geolocation(data_dir, chunksize))
+
+    def lookup(self, prefixes, nearest=True):
+        """Posisi baris indeks untuk setiap prefix dan jenis kecocokannya.
+
+        Mengembalikan (posisi, match) dengan posisi -1 jika tidak ditemukan.
+        Prefix yang tidak ada memakai prefix terdekat secara numerik
+        (prefix CEP yang berdekatan berada di wilayah yang sama).
+        """
+        query = np.asarray(prefixes, dtype='float64')
+        n = len(self.prefixes)
+        positions = np.full(len(query), -1, dtype='int64')
+        # Kode kategori MATCH_DTYPE: 0 exact, 1 nearest, 2 missing
+        codes = np.full(len(query), 2, dtype='int8')
+        if n:
+            known = ~np.isnan(query)
+            right = np.minimum(np.searchsorted(self.prefixes, query), n - 1)
+            exact = known & (self.prefixes[right] == query)
+            positions[exact] = right[exact]
+            codes[exact] = 0
+
+            if nearest:
+                left = np.maximum(right - 1, 0)
+                closer_left = np.abs(self.prefixes[left] - query) < np.abs(self.prefixes[right] - query)
+                fallback = known & ~exact
+                positions[fallback] = np.where(closer_left, left, right)[fallback]
+                codes[fallback] = 1
+        return positions, pd.Categorical.from_codes(codes, dtype=MATCH_DTYPE)
+
+    def geocode(self, df, prefix_col, nearest=True):
+        """Salinan `df` dengan kolom geolocation_lat, geolocation_lng, dan geo_match"""
+        positions, match = self.lookup(df[prefix_col].to_numpy(dtype='float64', na_value=np.nan), nearest=nearest)
+        found = positions >= 0
+        lat = np.full(len(df), np.nan)
+        lng = np.full(len(df), np.nan)
+        lat[found] = self.lat[positions[found]]
+        lng[found] = self.lng[positions[found]]
+        return df.assign(geolocation_lat=lat, geolocation_lng=lng, geo_match=match)
+
+    def to_geodataframe(self, df, prefix_col, nearest=True):
+        """GeoDataFrame titik (EPSG:4326) dengan geometri dibangun secara vektor;
+        baris yang sama sekali tidak bisa di-geocode dibuang"""
+        import geopandas as gpd
+
+        geo = self.geocode(df, prefix_col, nearest=nearest)
+        geo = geo[geo['geo_match'] != MATCH_MISSING]
+        geometry = gpd.points_from_xy(geo['geolocation_lng'], geo['geolocation_lat'])
+        return gpd.GeoDataFrame(geo, geometry=geometry, crs='EPSG:4326')
+
+
+def build_state_geometries(shapefile=SHAPEFILE, tolerance=SIMPLIFY_TOLERANCE, precision=COORDINATE_PRECISION):
+    """GeoDataFrame satu poligon per state (EPSG:4326) dengan kolom state dan name"""
+    import geopandas as gpd
+    import shapely
+
+    regions = gpd.read_file(shapefile, columns=['NM_UF']).to_crs('EPSG:4326')
+    states = regions.dissolve(by='NM_UF', as_index=False)
+    geometry = states.geometry.simplify(tolerance, preserve_topology=True)
+    geometry = shapely.transform(geometry.values, lambda coords: np.round(coords, precision))
+    codes = {name: code for code, name in STATE_NAMES.items()}
+    return gpd.GeoDataFrame({
+        'state': states['NM_UF'].map(codes),
+        'name': states['NM_UF'],
+    }, geometry=geometry, crs='EPSG:4326')
+
+
+def write_state_geometries(out_path=STATE_GEOJSON, shapefile=SHAPEFILE, tolerance=SIMPLIFY_TOLERANCE):
+    """Tulis geometri state yang sudah disederhanakan sebagai GeoJSON ringkas"""
+    states = build_state_geometries(shapefile, tolerance)
+    collection = json.loads(states.to_json(drop_id=True))
+    out_path = Path(out_path)
+    tmp_path = out_path.with_suffix('.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(collection, f, ensure_ascii=False, separators=(',', ':'))
+    tmp_path.replace(out_path)
+    return out_path
+
+
+def load_state_geometries(path=STATE_GEOJSON):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def state_choropleth(collection, values, cmap='viridis', vmin=None, vmax=None, value_format='{:.2f}'):
+    """Salinan FeatureCollection dengan properti value, value_label, dan fill_color.
+
+    `values` adalah Series yang di-index kode state. Geometri tidak disalin,
+    hanya properti tiap feature yang baru.
+    """
+    import matplotlib
+
+    colormap = matplotlib.colormaps[cmap]
+    finite = values.dropna()
+    vmin = finite.min() if vmin is None and not finite.empty else vmin
+    vmax = finite.max() if vmax is None and not finite.empty else vmax
+    span = (vmax - vmin) if vmin is not None and vmax is not None and vmax > vmin else 1.0
+
+    features = []
+    for feature in collection['features']:
+        properties = dict(feature['properties'])
+        value = values.get(properties['state'])
+        if value is None or pd.isna(value):
+            properties.update(value=None, value_label='tidak ada data', fill_color=MISSING_COLOR)
+        else:
+            r, g, b, _ = colormap(min(max((value - vmin) / span, 0.0), 1.0))
+            properties.update(value=float(value), value_label=value_format.format(value),
+                              fill_color=[int(r * 255), int(g * 255), int(b * 255), 200])
+        features.append({'type': 'Feature', 'geometry': feature['geometry'], 'properties': properties})
+    return {'type': 'FeatureCollection', 'features': features}
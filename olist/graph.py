@@ -0,0 +1,217 @@
+"""Graf dependensi tahapan pipeline dengan cache berbasis fingerprint.
+
+Setiap tahapan di-fingerprint dari kode fungsinya, isi file mentah yang dibaca,
+dan fingerprint tahapan sebelumnya. Tahapan hanya dihitung ulang jika
+fingerprint-nya berubah, sehingga perubahan satu file hanya memicu tahapan
+di hilirnya.
+"""
+import functools
+import hashlib
+import inspect
+import json
+import pickle
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from . import instrument
+
+STAGES = {}
+
+
+@dataclass
+class Stage:
+    name: str
+    func: object
+    deps: tuple = ()
+    files: tuple = ()
+    sink: bool = False
+    cached: bool = True
+    code_hash: str = field(init=False, default='')
+
+    def __post_init__(self):
+        h = hashlib.sha1()
+        for source in _code_sources(self.func):
+            h.update(source.encode('utf-8'))
+        self.code_hash = h.hexdigest()
+
+
+def _code_sources(func):
+    """Source fungsi tahapan beserta modul/fungsi olist yang dirujuknya,
+    agar perubahan helper (mis. features.py) ikut membatalkan cache"""
+    if isinstance(func, functools.partial):
+        return _code_sources(func.func) + [repr(func.args), repr(sorted(func.keywords.items()))]
+    sources = [inspect.getsource(func)]
+    for name in func.__code__.co_names:
+        ref = func.__globals__.get(name)
+        module = ref if inspect.ismodule(ref) else inspect.getmodule(ref)
+        if module is None or not module.__name__.startswith(__package__ + '.'):
+            continue
+        try:
+            sources.append(inspect.getsource(ref))
+        except (OSError, TypeError):
+            continue
+    return sources
+
+
+def register(stage_obj):
+    for dep in stage_obj.deps:
+        if dep not in STAGES:
+            raise ValueError(f"Tahapan '{stage_obj.name}' bergantung pada tahapan yang belum terdaftar: '{dep}'")
+    STAGES[stage_obj.name] = stage_obj
+    return stage_obj
+
+
+def stage(name, deps=(), files=(), sink=False):
+    """Decorator untuk mendaftarkan fungsi sebagai tahapan pipeline"""
+    def decorator(func):
+        register(Stage(name, func, tuple(deps), tuple(files), sink))
+        return func
+    return decorator
+
+
+def execution_order(targets=None):
+    """Urutan topologis tahapan yang dibutuhkan untuk membangun `targets`"""
+    targets = list(targets) if targets else list(STAGES)
+    order, seen = [], set()
+
+    def visit(name):
+        if name in seen:
+            return
+        if name not in STAGES:
+            raise KeyError(f"Tahapan tidak dikenal: '{name}'")
+        seen.add(name)
+        for dep in STAGES[name].deps:
+            visit(dep)
+        order.append(name)
+
+    for name in targets:
+        visit(name)
+    return order
+
+
+class Pipeline:
+    """Menjalankan tahapan terdaftar dengan cache di `cache_dir`"""
+
+    def __init__(self, data_dir, out_dir, cache_dir):
+        self.data_dir = Path(data_dir)
+        self.out_dir = Path(out_dir)
+        self.cache_dir = Path(cache_dir)
+        self.manifest_path = self.cache_dir / 'manifest.json'
+        self.manifest = self._read_manifest()
+        self._values = {}
+
+    def _read_manifest(self):
+        if self.manifest_path.exists():
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        return {'files': {}, 'stages': {}}
+
+    def _write_manifest(self):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f, indent=1, sort_keys=True)
+        tmp_path.replace(self.manifest_path)
+
+    def file_fingerprint(self, path):
+        """Hash isi file; di-memo berdasarkan ukuran dan mtime agar tidak di-hash ulang"""
+        path = Path(path)
+        if not path.exists():
+            raise FileNotFoundError(f"File input tidak ditemukan: {path}")
+        st = path.stat()
+        key = str(path.resolve())
+        memo = self.manifest['files'].get(key)
+        if memo and memo[0] == st.st_size and memo[1] == st.st_mtime_ns:
+            return memo[2]
+        h = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                h.update(chunk)
+        digest = h.hexdigest()
+        self.manifest['files'][key] = [st.st_size, st.st_mtime_ns, digest]
+        return digest
+
+    def fingerprints(self, targets=None):
+        fps = {}
+        for name in execution_order(targets):
+            st = STAGES[name]
+            h = hashlib.sha1()
+            h.update(name.encode('utf-8'))
+            h.update(st.code_hash.encode('utf-8'))
+            for filename in st.files:
+                h.update(self.file_fingerprint(self.data_dir / filename).encode('utf-8'))
+            for dep in st.deps:
+                h.update(fps[dep].encode('utf-8'))
+            if st.sink:
+                h.update(str(self.out_dir.resolve()).encode('utf-8'))
+            fps[name] = h.hexdigest()
+        return fps
+
+    def _cache_path(self, name):
+        return self.cache_dir / f'{name}.pkl'
+
+    def is_fresh(self, name, fp):
+        record = self.manifest['stages'].get(name)
+        if not record or record['fingerprint'] != fp:
+            return False
+        if STAGES[name].sink:
+            return all(Path(p).exists() for p in record.get('outputs', []))
+        if not STAGES[name].cached:
+            return True
+        return self._cache_path(name).exists()
+
+    def status(self, targets=None):
+        """Daftar (tahapan, segar/basi) tanpa menjalankan apapun"""
+        fps = self.fingerprints(targets)
+        return [(name, self.is_fresh(name, fp)) for name, fp in fps.items()]
+
+    def value(self, name):
+        """Output sebuah tahapan, dimuat dari cache jika belum ada di memori"""
+        if name not in self._values:
+            st = STAGES[name]
+            if st.cached:
+                with instrument.span('cache_load', stage=name, category='pipeline'):
+                    with open(self._cache_path(name), 'rb') as f:
+                        self._values[name] = pickle.load(f)
+            else:
+                with instrument.span('stage', stage=name, category='pipeline'):
+                    self._values[name] = st.func(*[self.data_dir / filename for filename in st.files])
+        return self._values[name]
+
+    def run(self, targets=None, force=False, log=print):
+        """Bangun `targets` (default: semua tahapan), kembalikan daftar tahapan yang dihitung ulang"""
+        fps = self.fingerprints(targets)
+        rebuilt = []
+        try:
+            for name, fp in fps.items():
+                st = STAGES[name]
+                if not force and self.is_fresh(name, fp):
+                    log(f"[cached]  {name}")
+                    continue
+                if not st.cached:
+                    # Tidak di-pickle: nilainya dibaca ulang (murah) saat dibutuhkan tahapan hilir
+                    self._values.pop(name, None)
+                    self.manifest['stages'][name] = {'fingerprint': fp}
+                    continue
+                log(f"[build]   {name}")
+                args = [self.data_dir / filename for filename in st.files]
+                kwargs = {dep: self.value(dep) for dep in st.deps}
+                if st.sink:
+                    with instrument.span('stage', stage=name, category='pipeline'):
+                        outputs = st.func(self.out_dir, *args, **kwargs)
+                    record = {'fingerprint': fp, 'outputs': [str(p) for p in outputs]}
+                else:
+                    with instrument.span('stage', stage=name, category='pipeline'):
+                        result = st.func(*args, **kwargs)
+                    self._values[name] = result
+                    self.cache_dir.mkdir(parents=True, exist_ok=True)
+                    tmp_path = self._cache_path(name).with_suffix('.tmp')
+                    with open(tmp_path, 'wb') as f:
+                        pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+                    tmp_path.replace(self._cache_path(name))
+                    record = {'fingerprint': fp}
+                self.manifest['stages'][name] = record
+                rebuilt.append(name)
+        finally:
+            self._write_manifest()
+        return rebuilt
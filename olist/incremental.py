@@ -0,0 +1,264 @@
+"""Mode inkremental: proses batch harian order/review baru tanpa menghitung ulang seluruh histori.
+
+State yang disimpan di `state_dir`:
+
+- `orders.parquet` / `reviews.parquet`: order (plus customer_unique_id) dan
+  review-nya selama RETENTION_DAYS terakhir. Cukup untuk membangun ulang
+  jendela 6 bulan halaman Delivery & Rating (boxplot butuh nilai mentah) dan
+  untuk mencari pembelian ulang setelah review negatif baru.
+- `repurchase_counts.parquet` / `repurchase_days.parquet`: counter per skor
+  dan histogram hari pembelian ulang (lihat `export.repurchase_counters`).
+- `open_reviews.parquet`: review negatif yang belum punya order berikutnya;
+  ditutup saat order pertama pelanggan tersebut masuk.
+- `meta.json`: watermark (waktu order terbaru) dan fingerprint batch yang
+  sudah diproses.
+
+Batch bersifat append-only: baris order dianggap final saat masuk. Order dan
+review yang id-nya sudah ada di state dilewati, sehingga memutar ulang batch
+(utuh maupun tumpang tindih) tidak mengubah hasil. Order yang lebih tua dari
+watermark - RETENTION_DAYS tidak bisa dicek duplikasinya dan ditolak, begitu
+pula review yang order-nya tidak dikenal. Biaya satu batch sebanding dengan
+isi batch ditambah jendela retensi, bukan seluruh histori.
+
+Hanya tabel Delivery & Rating dan Repurchase yang ditulis ulang; tabel
+kategori dan geografis tetap dari `python -m olist build` terakhir.
+
+Tabel Delivery & Rating (termasuk kuartil dan persentil sketch KLL) dihitung
+ulang dari baris retensi, bukan dengan menggabungkan sketch tersimpan: jendela
+180 hari bergeser bersama watermark, sedangkan sketch tidak bisa membuang nilai
+yang keluar dari jendela. Biayanya tetap sebanding jendela retensi, bukan
+seluruh histori.
+"""
+import hashlib
+import json
+from pathlib import Path
+
+import pandas as pd
+
+from . import export, store
+from .paths import BUILD_DIR, TABLES
+from .repurchase import next_purchase
+from .stages import USED_COLUMNS, delivery_review
+
+STATE_DIR = BUILD_DIR / 'incremental'
+STATE_VERSION = 1
+META_FILE = 'meta.json'
+# Jendela analisis delivery (180 hari) ditambah ruang untuk review yang datang terlambat
+RETENTION_DAYS = 365
+REPURCHASE_WINDOW = 30
+NEGATIVE_SCORES = (1, 2)
+BATCH_TABLES = ('orders', 'customers', 'order_reviews')
+
+OPEN_COLUMNS = ['customer_unique_id', 'order_id', 'review_creation_date', 'review_score']
+COUNT_COLUMNS = ['review_score', 'count', 'decided', 'repurchased']
+
+
+class IngestResult:
+    """Ringkasan satu batch: jumlah baris diterima dan dilewati"""
+
+    def __init__(self, skipped=False, **counts):
+        self.skipped = skipped
+        self.counts = counts
+
+    def __str__(self):
+        if self.skipped:
+            return "batch sudah pernah diproses, dilewati"
+        return ', '.join(f'{name}={value}' for name, value in self.counts.items())
+
+
+class IncrementalState:
+    """State agregat inkremental yang dibaca dari dan ditulis ke `state_dir`"""
+
+    def __init__(self, orders, reviews, counts, days, open_reviews, meta):
+        self.orders = orders
+        self.reviews = reviews
+        self.counts = counts
+        self.days = days
+        self.open_reviews = open_reviews
+        self.meta = meta
+
+    @classmethod
+    def empty(cls):
+        orders = store.apply_schema(pd.DataFrame(
+            {col: pd.Series(dtype='str') for col in USED_COLUMNS['orders'] + ['customer_unique_id']}), 'orders')
+        reviews = store.apply_schema(pd.DataFrame(
+            {col: pd.Series(dtype='str') for col in USED_COLUMNS['order_reviews']}), 'order_reviews')
+        counts = pd.DataFrame({col: pd.Series(dtype='int64') for col in COUNT_COLUMNS})
+        days = pd.Series(dtype='int64', name='count').rename_axis('days')
+        open_reviews = reviews.assign(customer_unique_id=pd.Series(dtype='str'))[OPEN_COLUMNS]
+        meta = {'version': STATE_VERSION, 'watermark': None, 'batches': []}
+        return cls(orders, reviews, counts, days, open_reviews, meta)
+
+    @classmethod
+    def load(cls, state_dir=STATE_DIR):
+        state_dir = Path(state_dir)
+        with open(state_dir / META_FILE) as f:
+            meta = json.load(f)
+        if meta.get('version') != STATE_VERSION:
+            raise ValueError(f"Versi state inkremental {meta.get('version')} tidak cocok dengan {STATE_VERSION}; "
+                             f"jalankan ulang `python -m olist ingest --init`")
+        days = pd.read_parquet(state_dir / 'repurchase_days.parquet')
+        return cls(
+            orders=pd.read_parquet(state_dir / 'orders.parquet'),
+            reviews=pd.read_parquet(state_dir / 'reviews.parquet'),
+            counts=pd.read_parquet(state_dir / 'repurchase_counts.parquet'),
+            days=days.set_index('days')['count'],
+            open_reviews=pd.read_parquet(state_dir / 'open_reviews.parquet'),
+            meta=meta,
+        )
+
+    def save(self, state_dir=STATE_DIR):
+        """Tulis semua file state; meta.json ditulis terakhir sebagai penanda state lengkap"""
+        state_dir = Path(state_dir)
+        state_dir.mkdir(parents=True, exist_ok=True)
+        frames = {
+            'orders.parquet': self.orders,
+            'reviews.parquet': self.reviews,
+            'repurchase_counts.parquet': self.counts,
+            'repurchase_days.parquet': self.days.reset_index(),
+            'open_reviews.parquet': self.open_reviews,
+        }
+        for filename, df in frames.items():
+            tmp_path = state_dir / f'{filename}.tmp'
+            df.to_parquet(tmp_path, index=False)
+            tmp_path.replace(state_dir / filename)
+        tmp_path = state_dir / f'{META_FILE}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.meta, f, indent=1)
+        tmp_path.replace(state_dir / META_FILE)
+
+    @property
+    def watermark(self):
+        value = self.meta.get('watermark')
+        return pd.Timestamp(value) if value else None
+
+    def _count(self, scores, column):
+        """Tambah counter `column` untuk setiap skor di `scores`"""
+        added = pd.Series(scores, dtype='int64').value_counts()
+        counts = self.counts.set_index('review_score')
+        counts = counts.reindex(counts.index.union(added.index), fill_value=0)
+        counts[column] += added.reindex(counts.index, fill_value=0)
+        self.counts = counts.rename_axis('review_score').reset_index()
+
+    def _decide(self, events, found):
+        """Catat review negatif yang sudah punya order berikutnya"""
+        decided = found['next_order_id'].notna()
+        self._count(events.loc[decided, 'review_score'].to_numpy(), 'decided')
+        repurchased = found[f'repurchased_{REPURCHASE_WINDOW}days'].fillna(False).astype(bool)
+        self._count(events.loc[repurchased, 'review_score'].to_numpy(), 'repurchased')
+        days = found.loc[repurchased, 'days_to_repurchase'].astype('int64').value_counts()
+        self.days = self.days.add(days, fill_value=0).astype('int64').sort_index().rename_axis('days')
+        return decided
+
+    def ingest(self, orders, customers, reviews):
+        """Gabungkan satu batch (DataFrame bertipe, boleh kosong) ke dalam state"""
+        customer_keys = customers[['customer_id', 'customer_unique_id']].drop_duplicates('customer_id')
+        orders = orders.merge(customer_keys, on='customer_id', how='left')
+        watermark = max([ts for ts in (self.watermark, orders['order_purchase_timestamp'].max()) if pd.notna(ts)],
+                        default=None)
+        horizon = watermark - pd.Timedelta(days=RETENTION_DAYS) if watermark is not None else None
+
+        duplicate = orders['order_id'].isin(set(self.orders['order_id'])) | orders['order_id'].duplicated()
+        too_old = pd.Series(False, index=orders.index)
+        if horizon is not None:
+            too_old = ~duplicate & (orders['order_purchase_timestamp'] < horizon)
+        new_orders = orders[~duplicate & ~too_old]
+        # Saat init (state kosong) order di luar retensi tidak disimpan, tapi tetap dipakai untuk
+        # menghubungkan review dan mencari pembelian ulang di histori penuh
+        batch_orders = orders[~duplicate] if self.watermark is None else new_orders
+
+        known_reviews = set(zip(self.reviews['review_id'], self.reviews['order_id']))
+        review_keys = pd.Series(list(zip(reviews['review_id'], reviews['order_id'])), index=reviews.index, dtype=object)
+        new_reviews = reviews[~review_keys.isin(known_reviews) & ~review_keys.duplicated()]
+        all_orders = pd.concat([self.orders, batch_orders], ignore_index=True)
+        matched = new_reviews['order_id'].isin(set(all_orders['order_id']))
+
+        # Review negatif yang masih terbuka ditutup oleh order baru pelanggan yang sama
+        customer_orders = batch_orders.dropna(subset=['customer_unique_id'])
+        if not self.open_reviews.empty and not customer_orders.empty:
+            found = next_purchase(customer_orders, self.open_reviews, windows=(REPURCHASE_WINDOW,))
+            decided = self._decide(self.open_reviews, found)
+            self.open_reviews = self.open_reviews[~decided].reset_index(drop=True)
+
+        # Review negatif baru: cari order berikutnya di state + batch
+        negative = new_reviews[matched & new_reviews['review_score'].isin(NEGATIVE_SCORES)].merge(
+            all_orders[['order_id', 'customer_unique_id']].dropna(subset=['customer_unique_id']),
+            on='order_id', how='inner'
+        )
+        self._count(negative['review_score'].to_numpy(), 'count')
+        if not negative.empty:
+            found = next_purchase(all_orders.dropna(subset=['customer_unique_id']), negative,
+                                  windows=(REPURCHASE_WINDOW,))
+            decided = self._decide(negative, found)
+            self.open_reviews = pd.concat([self.open_reviews, negative.loc[~decided, OPEN_COLUMNS]],
+                                          ignore_index=True)
+
+        self.orders = pd.concat([self.orders, new_orders], ignore_index=True)
+        self.reviews = pd.concat([self.reviews, new_reviews[matched]], ignore_index=True)
+        if horizon is not None:
+            self.orders = self.orders[self.orders['order_purchase_timestamp'] >= horizon].reset_index(drop=True)
+            self.reviews = self.reviews[self.reviews['order_id'].isin(set(self.orders['order_id']))]
+            self.reviews = self.reviews.reset_index(drop=True)
+        self.meta['watermark'] = watermark.isoformat() if watermark is not None else None
+
+        return IngestResult(
+            orders=len(new_orders), reviews=int(matched.sum()), negative_reviews=len(negative),
+            duplicate_orders=int(duplicate.sum()), late_orders=int(too_old.sum()),
+            duplicate_reviews=len(reviews) - len(new_reviews), unmatched_reviews=int((~matched).sum()),
+            open_reviews=len(self.open_reviews),
+        )
+
+    def chart_tables(self):
+        """Tabel Delivery & Rating dan Repurchase dari state, plus delivery_review_df"""
+        orders = store.apply_schema(self.orders.drop(columns='customer_unique_id'), 'orders')
+        reviews = store.apply_schema(self.reviews, 'order_reviews')
+        delivery_review_df = delivery_review({'orders': orders, 'reviews': reviews})
+        tables = export.delivery_tables(delivery_review_df)
+        tables.update(export.repurchase_tables_from_counters(self.counts, self.days))
+        return tables, delivery_review_df
+
+
+def batch_fingerprint(batch_dir):
+    """Hash isi file batch, untuk melewati batch yang sama persis tanpa membacanya"""
+    h = hashlib.sha1()
+    for name in BATCH_TABLES:
+        path = Path(batch_dir) / TABLES[name]
+        if path.exists():
+            h.update(name.encode())
+            h.update(hashlib.sha1(path.read_bytes()).digest())
+    return h.hexdigest()
+
+
+def read_batch(batch_dir, name):
+    """Tabel bertipe dari batch; tabel kosong jika file-nya tidak ada"""
+    columns = USED_COLUMNS[name] if name != 'customers' else ['customer_id', 'customer_unique_id']
+    if not (Path(batch_dir) / TABLES[name]).exists():
+        return store.apply_schema(pd.DataFrame({col: pd.Series(dtype='str') for col in columns}), name)
+    return store.read_csv(name, columns=columns, data_dir=batch_dir)
+
+
+def init_state(data_dir, state_dir=STATE_DIR):
+    """Bangun state dari seluruh data mentah (sekali, setelah `python -m olist build`)"""
+    state = IncrementalState.empty()
+    result = state.ingest(
+        store.load_table('orders', USED_COLUMNS['orders'], data_dir),
+        store.load_table('customers', ['customer_id', 'customer_unique_id'], data_dir),
+        store.load_table('order_reviews', USED_COLUMNS['order_reviews'], data_dir),
+    )
+    state.save(state_dir)
+    return result
+
+
+def ingest_batch(batch_dir, out_dir, state_dir=STATE_DIR):
+    """Proses satu direktori batch (orders/customers/order_reviews CSV) dan tulis ulang tabel yang terdampak"""
+    state = IncrementalState.load(state_dir)
+    fingerprint = batch_fingerprint(batch_dir)
+    if fingerprint in state.meta['batches']:
+        return IngestResult(skipped=True)
+
+    result = state.ingest(*(read_batch(batch_dir, name) for name in BATCH_TABLES))
+    tables, delivery_review_df = state.chart_tables()
+    export.update_outputs(out_dir, tables, delivery_review_df)
+    state.meta['batches'].append(fingerprint)
+    state.save(state_dir)
+    return result
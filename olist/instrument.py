@@ -0,0 +1,244 @@
+"""Instrumentasi ringan untuk pipeline dan dashboard: span bernama dengan wall
+time, CPU time (thread), dan puncak alokasi memori.
+
+Nonaktif secara default. Selama nonaktif, `span()` mengembalikan context
+manager kosong yang sama setiap kali dan `traced` langsung memanggil fungsinya,
+jadi span boleh dibiarkan di kode produksi. Aktifkan dengan environment
+variable `OLIST_INSTRUMENT=1` (atau `=time` tanpa pelacakan memori) sebelum
+proses dimulai, atau dengan `enable()`.
+
+Puncak alokasi diukur dengan tracemalloc, yang memperlambat alokasi Python;
+gunakan `OLIST_INSTRUMENT=time` jika hanya waktu yang dibutuhkan. Span boleh
+bersarang; puncak span induk mencakup puncak anaknya. tracemalloc bersifat
+global per proses, jadi dengan beberapa sesi Streamlit sekaligus puncak
+alokasi bisa ikut menghitung alokasi thread lain.
+
+Hasil bisa diekspor sebagai JSON Chrome trace (buka di chrome://tracing atau
+Perfetto) dan sebagai counter format teks Prometheus.
+"""
+import contextlib
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+ENV_VAR = 'OLIST_INSTRUMENT'
+DEFAULT_MAX_SPANS = 10_000
+METRIC_PREFIX = 'olist_span'
+
+_NULL_SPAN = contextlib.nullcontext()
+_recorder = None
+
+
+class Span:
+    """Satu span yang sudah selesai"""
+    __slots__ = ('seq', 'name', 'labels', 'thread', 'depth', 'start', 'wall', 'cpu', 'peak_bytes')
+
+    def __init__(self, seq, name, labels, thread, depth, start):
+        self.seq = seq
+        self.name = name
+        self.labels = labels
+        self.thread = thread
+        self.depth = depth
+        self.start = start
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.peak_bytes = None
+
+    @property
+    def label(self):
+        """Nama untuk ditampilkan, mis. `get_chart_data(delivery_summary)`"""
+        if not self.labels:
+            return self.name
+        return f"{self.name}({', '.join(str(v) for k, v in self.labels.items() if k != 'category')})"
+
+    def to_dict(self):
+        return {'name': self.name, 'labels': dict(self.labels), 'depth': self.depth,
+                'wall': self.wall, 'cpu': self.cpu, 'peak_bytes': self.peak_bytes}
+
+
+class _ActiveSpan:
+    __slots__ = ('recorder', 'span', 'cpu_start', 'mem_start', 'mem_peak')
+
+    def __init__(self, recorder, span):
+        self.recorder = recorder
+        self.span = span
+
+    def __enter__(self):
+        stack = self.recorder._stack()
+        if self.recorder.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            # Puncak sejauh ini milik span induk; penghitung direset untuk span ini
+            if stack:
+                stack[-1].mem_peak = max(stack[-1].mem_peak, peak)
+            tracemalloc.reset_peak()
+            self.mem_start = self.mem_peak = current
+        stack.append(self)
+        self.cpu_start = time.thread_time()
+        self.span.start = time.perf_counter()
+        return self.span
+
+    def __exit__(self, *exc):
+        span = self.span
+        span.wall = time.perf_counter() - span.start
+        span.cpu = time.thread_time() - self.cpu_start
+        stack = self.recorder._stack()
+        stack.pop()
+        if self.recorder.memory:
+            self.mem_peak = max(self.mem_peak, tracemalloc.get_traced_memory()[1])
+            span.peak_bytes = self.mem_peak - self.mem_start
+            if stack:
+                stack[-1].mem_peak = max(stack[-1].mem_peak, self.mem_peak)
+        self.recorder._finish(span)
+        return False
+
+
+class Recorder:
+    """Mengumpulkan span yang selesai (dibatasi `max_spans` terakhir) dan total
+    kumulatif per (nama, label) untuk counter Prometheus"""
+
+    def __init__(self, memory=True, max_spans=DEFAULT_MAX_SPANS):
+        self.memory = memory
+        self.spans = deque(maxlen=max_spans)
+        self.totals = {}
+        self.origin = time.perf_counter()
+        self._seq = itertools.count()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def span(self, name, **labels):
+        span = Span(next(self._seq), name, labels, threading.get_ident(), len(self._stack()), 0.0)
+        return _ActiveSpan(self, span)
+
+    def _finish(self, span):
+        key = (span.name, tuple(sorted(span.labels.items())))
+        with self._lock:
+            self.spans.append(span)
+            total = self.totals.setdefault(key, [0, 0.0, 0.0, 0])
+            total[0] += 1
+            total[1] += span.wall
+            total[2] += span.cpu
+            total[3] = max(total[3], span.peak_bytes or 0)
+
+    def mark(self):
+        """Penanda posisi; `since(mark)` mengembalikan span yang dimulai setelahnya"""
+        return next(self._seq)
+
+    def since(self, mark, thread=None):
+        """Span (urut waktu mulai) yang dimulai setelah `mark`, opsional hanya dari `thread`"""
+        with self._lock:
+            spans = [s for s in self.spans if s.seq > mark and (thread is None or s.thread == thread)]
+        return sorted(spans, key=lambda s: s.start)
+
+    def chrome_trace(self, spans=None):
+        """Dict format Chrome trace (event 'X' dengan timestamp mikrodetik)"""
+        spans = list(self.spans) if spans is None else spans
+        pid = os.getpid()
+        events = []
+        for s in sorted(spans, key=lambda s: s.start):
+            args = {'cpu_ms': s.cpu * 1000, **{k: str(v) for k, v in s.labels.items()}}
+            if s.peak_bytes is not None:
+                args['peak_bytes'] = s.peak_bytes
+            events.append({'name': s.label, 'cat': str(s.labels.get('category', '')), 'ph': 'X',
+                           'ts': (s.start - self.origin) * 1e6, 'dur': s.wall * 1e6,
+                           'pid': pid, 'tid': s.thread, 'args': args})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def prometheus(self):
+        """Counter kumulatif per span dalam format teks Prometheus"""
+        with self._lock:
+            totals = sorted(self.totals.items())
+        metrics = [
+            ('count_total', 'counter', 'Jumlah span yang selesai', 0),
+            ('wall_seconds_total', 'counter', 'Total wall time span (detik)', 1),
+            ('cpu_seconds_total', 'counter', 'Total CPU time thread span (detik)', 2),
+        ]
+        if self.memory:
+            metrics.append(('peak_bytes', 'gauge', 'Puncak alokasi terbesar satu span (byte)', 3))
+        lines = []
+        for suffix, kind, help_text, index in metrics:
+            metric = f'{METRIC_PREFIX}_{suffix}'
+            lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} {kind}']
+            for (name, labels), total in totals:
+                label_text = ','.join(f'{k}="{_escape(v)}"' for k, v in (('span', name),) + labels)
+                lines.append(f'{metric}{{{label_text}}} {total[index]}')
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def enable(memory=True, max_spans=DEFAULT_MAX_SPANS):
+    """Aktifkan instrumentasi (sekali per proses); kembalikan recorder-nya"""
+    global _recorder
+    if _recorder is None:
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _recorder = Recorder(memory, max_spans)
+    return _recorder
+
+
+def disable():
+    global _recorder
+    if _recorder is not None and _recorder.memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _recorder = None
+
+
+def enabled():
+    return _recorder is not None
+
+
+def recorder():
+    """Recorder aktif, atau None jika instrumentasi nonaktif"""
+    return _recorder
+
+
+def span(name, **labels):
+    """Context manager span bernama; label (mis. `key=`, `category=`) ikut ke trace dan
+    menjadi label Prometheus. Tanpa biaya berarti saat instrumentasi nonaktif."""
+    if _recorder is None:
+        return _NULL_SPAN
+    return _recorder.span(name, **labels)
+
+
+def traced(name=None, **labels):
+    """Decorator: setiap pemanggilan fungsi menjadi satu span"""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _recorder is None:
+                return func(*args, **kwargs)
+            with _recorder.span(span_name, **labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def write_chrome_trace(path, spans=None):
+    with open(path, 'w') as f:
+        json.dump(_recorder.chrome_trace(spans), f)
+    return path
+
+
+def write_prometheus(path):
+    with open(path, 'w') as f:
+        f.write(_recorder.prometheus())
+    return path
+
+
+if os.environ.get(ENV_VAR, '') not in ('', '0'):
+    enable(memory=os.environ[ENV_VAR] != 'time')
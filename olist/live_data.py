@@ -0,0 +1,197 @@
+"""Data chart dashboard yang dimuat ulang di latar belakang saat pipeline menulis versi baru.
+
+`LiveData` menyimpan versi data aktif (`DataVersion`). Thread watcher memeriksa
+mtime/ukuran file sumber (`charts/` atau main_data.csv lama) setiap
+`OLIST_RELOAD_INTERVAL` detik (default 5, `0` = tanpa watcher). Jika berubah,
+isinya di-hash; versi baru dimuat dan divalidasi seluruhnya di thread watcher,
+lalu menggantikan versi aktif dengan satu assignment referensi. Versi
+sebelumnya tetap disimpan, dan setiap rerun memegang versi yang diambilnya di
+awal, jadi satu halaman selalu digambar dari satu versi yang sama.
+
+Versi pertama dimuat lazy per tabel (cold start tetap hanya membaca tabel
+halaman yang dibuka), sisanya dilengkapi watcher. Jika file tabel versi itu
+sudah diganti sebelum sempat dibaca, `DataVersion.table` melempar
+`StaleVersion` alih-alih mencampur dua versi.
+"""
+import hashlib
+import os
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+from . import chart_store, export, instrument
+
+ENV_INTERVAL = 'OLIST_RELOAD_INTERVAL'
+DEFAULT_INTERVAL = 5.0
+CHART_DIR_NAME = 'charts'
+MAIN_DATA_FILE = 'main_data.csv'
+
+
+class StaleVersion(Exception):
+    """File tabel sudah milik versi lain sebelum dibaca oleh versi ini"""
+
+
+def default_interval():
+    """Interval polling watcher (detik) dari OLIST_RELOAD_INTERVAL; 0 = watcher nonaktif"""
+    return float(os.environ.get(ENV_INTERVAL) or DEFAULT_INTERVAL)
+
+
+def _source_files(out_dir):
+    """File sumber data chart: index.json beserta tabelnya, atau main_data.csv lama"""
+    chart_dir = Path(out_dir) / CHART_DIR_NAME
+    if chart_store.has_charts(chart_dir):
+        files = [chart_dir / chart_store.INDEX_FILE]
+        files += sorted(chart_dir.glob('*.parquet'))
+        return files
+    return [Path(out_dir) / MAIN_DATA_FILE]
+
+
+def signature(out_dir):
+    """{nama file: (mtime_ns, ukuran)} file sumber; murah (hanya stat)"""
+    sig = {}
+    for path in _source_files(out_dir):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        sig[path.name] = (stat.st_mtime_ns, stat.st_size)
+    return sig
+
+
+def content_hash(out_dir, sig):
+    """Hash isi file di `sig` (12 karakter heksadesimal) sebagai id versi"""
+    h = hashlib.sha256()
+    for path in _source_files(out_dir):
+        if path.name in sig:
+            h.update(path.name.encode('utf-8'))
+            h.update(path.read_bytes())
+    return h.hexdigest()[:12]
+
+
+class DataVersion:
+    """Satu versi data chart yang tidak berubah setelah dimuat; tabel dibaca sekali lalu dipakai bersama"""
+
+    def __init__(self, out_dir, sig, version):
+        self.out_dir = Path(out_dir)
+        self.signature = sig
+        self.version = version
+        self.loaded_at = pd.Timestamp.now()
+        self.chart_dir = self.out_dir / CHART_DIR_NAME
+        self.legacy = chart_store.INDEX_FILE not in sig
+        self._index = None
+        self._tables = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_disk(cls, out_dir):
+        sig = signature(out_dir)
+        return cls(out_dir, sig, content_hash(out_dir, sig))
+
+    @property
+    def complete(self):
+        return len(self._tables) == len(chart_store.CHART_SCHEMAS)
+
+    def _check(self, names):
+        current = signature(self.out_dir)
+        changed = [name for name in names if current.get(name) != self.signature.get(name)]
+        if changed:
+            raise StaleVersion(f"Versi data {self.version} sudah diganti ({', '.join(changed)})")
+
+    def _load_index(self):
+        if self._index is None:
+            index = chart_store.load_index(self.chart_dir)
+            self._check([chart_store.INDEX_FILE])
+            self._index = index
+        return self._index
+
+    def _load(self, key):
+        if self.legacy:
+            # main_data.csv lama berisi semua chart dalam satu file: diparse sekali untuk semua kunci
+            with instrument.span('load_main_data', category='data'):
+                tables = export.from_main_data(pd.read_csv(self.out_dir / MAIN_DATA_FILE))
+            self._check([MAIN_DATA_FILE])
+            self._tables.update(tables)
+            return tables[key]
+        index = self._load_index()
+        with instrument.span('load_chart', key=key, category='data'):
+            df = chart_store.load_chart(self.chart_dir, key, index)
+        entry = index['charts'].get(key)
+        if entry is not None:
+            self._check([entry['file']])
+        self._tables[key] = df
+        return df
+
+    def table(self, key):
+        """Tabel chart `key` versi ini (dibaca saat pertama dibutuhkan)"""
+        df = self._tables.get(key)
+        if df is None:
+            with self._lock:
+                df = self._tables.get(key)
+                if df is None:
+                    df = self._load(key)
+        return df
+
+    def load_all(self):
+        """Baca dan validasi semua tabel yang belum dimuat; kembalikan versi ini"""
+        for key in chart_store.CHART_SCHEMAS:
+            self.table(key)
+        return self
+
+
+class LiveData:
+    """Versi data aktif beserta versi sebelumnya, diganti oleh thread watcher"""
+
+    def __init__(self, out_dir='.', interval=None):
+        self.out_dir = Path(out_dir)
+        self.interval = default_interval() if interval is None else interval
+        self.current = DataVersion.from_disk(self.out_dir)
+        self.previous = None
+        self.swaps = 0
+        self.last_error = None
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Mulai thread watcher (daemon); tanpa efek jika interval 0 atau sudah berjalan"""
+        if self.interval > 0 and self._thread is None:
+            self._thread = threading.Thread(target=self._watch, name='olist-live-data', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.refresh()
+            except (OSError, ValueError, KeyError, StaleVersion) as exc:
+                # Versi baru gagal dimuat/divalidasi: versi aktif tetap dipakai
+                self.last_error = f"{type(exc).__name__}: {exc}"
+
+    def refresh(self):
+        """Periksa file sumber sekali; muat dan aktifkan versi baru jika isinya berubah.
+        Kembalikan True jika versi aktif diganti."""
+        with self._refresh_lock:
+            current = self.current
+            sig = signature(self.out_dir)
+            if sig == current.signature:
+                if not current.complete:
+                    current.load_all()
+                return False
+            version = content_hash(self.out_dir, sig)
+            if version == current.version:
+                # Hanya mtime yang berubah (file ditulis ulang dengan isi sama)
+                current.signature = sig
+                return False
+            with instrument.span('reload_data', version=version, category='data'):
+                candidate = DataVersion(self.out_dir, sig, version).load_all()
+            # Hanya diaktifkan jika tidak ada file yang berubah selama dimuat (pipeline belum selesai menulis)
+            if signature(self.out_dir) != sig:
+                return False
+            self.previous, self.current = current, candidate
+            self.swaps += 1
+            self.last_error = None
+            return True
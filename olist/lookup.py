@@ -0,0 +1,132 @@
+"""Lookup kategori produk dengan kode integer, pengganti merge berantai
+order_items -> products -> category_translation (cell 127, 159, 172, 277).
+
+`CategoryLookup` memetakan product_id -> kode kategori (posisi di kategori
+Portugis) -> nama Inggris dengan array padat. `OrderItems` menyimpan item
+setiap order sebagai potongan array yang dikelompokkan per order, sehingga
+fan-out order -> item cukup `np.repeat` dan kategori item diambil dengan
+`take`, tanpa membentuk frame lebar berisi semua kolom produk.
+
+Urutan hasil fan-out sama dengan merge pandas: baris kiri sesuai urutannya,
+item setiap order sesuai urutan kemunculannya di order_items.
+"""
+import numpy as np
+import pandas as pd
+
+# Kode untuk item tanpa kategori (atau order tanpa item)
+MISSING = -1
+
+
+def positions_in(values, index):
+    """Posisi setiap nilai `values` di `index` (nilai unik), -1 jika tidak ada.
+
+    Hash id string dibangun pyarrow di luar heap Python; `pd.Index.get_indexer`
+    akan membuat engine berisi objek str Python untuk setiap id (~10 MB per 100 ribu order).
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    value_set = pa.array(pd.Series(index).array)
+    values = pa.array(pd.Series(values).array)
+    if values.type != value_set.type:
+        values = values.cast(value_set.type)
+    found = pc.index_in(values, value_set=value_set).fill_null(-1)
+    return found.to_numpy(zero_copy_only=False).astype('int64')
+
+
+class CategoryLookup:
+    """product_id -> kode kategori -> nama kategori Portugis/Inggris"""
+
+    def __init__(self, product_ids, product_codes, dtype, english):
+        self.product_ids = pd.Index(product_ids)
+        self.product_codes = np.asarray(product_codes, dtype='int32')
+        # CategoricalDtype nama Portugis (sama dengan kolom products di store)
+        self.dtype = dtype
+        # Nama Inggris per kode; NA jika kategori tidak punya terjemahan
+        self.english = english
+
+    def __len__(self):
+        return len(self.dtype.categories)
+
+    @classmethod
+    def from_tables(cls, products, category_translation):
+        products = products.drop_duplicates('product_id')
+        names = products['product_category_name']
+        if not isinstance(names.dtype, pd.CategoricalDtype):
+            names = names.astype('category')
+        english = (category_translation
+                   .drop_duplicates('product_category_name')
+                   .set_index('product_category_name')['product_category_name_english']
+                   .reindex(names.cat.categories))
+        return cls(products['product_id'], names.cat.codes.to_numpy(), names.dtype, english.array)
+
+    def positions(self, product_ids):
+        """Posisi produk di lookup, -1 jika product_id tidak ada di tabel products"""
+        return positions_in(product_ids, self.product_ids)
+
+    def codes(self, positions):
+        """Kode kategori untuk posisi produk; MISSING untuk posisi -1 atau produk tanpa kategori"""
+        positions = np.asarray(positions)
+        return np.where(positions >= 0, self.product_codes.take(np.maximum(positions, 0)), MISSING).astype('int32')
+
+    def category(self, codes):
+        """Categorical nama Portugis dengan dtype yang sama seperti tabel products"""
+        return pd.Categorical.from_codes(codes, dtype=self.dtype)
+
+    def english_names(self, codes):
+        """Array nama Inggris untuk setiap kode (NA untuk MISSING atau tanpa terjemahan)"""
+        return pd.api.extensions.take(self.english, np.asarray(codes, dtype='int64'), allow_fill=True)
+
+    def translation(self):
+        """Series nama Portugis -> nama Inggris, misalnya untuk `Cube.relabel`"""
+        return pd.Series(self.english, index=self.dtype.categories)
+
+
+class OrderItems:
+    """Item order dikelompokkan per order: item order ke-i ada di `offsets[i]:offsets[i + 1]`"""
+
+    def __init__(self, order_ids, offsets, positions, categories):
+        self.order_ids = pd.Index(order_ids)
+        self.offsets = np.asarray(offsets, dtype='int64')
+        # Posisi produk setiap item di `categories` (-1 jika tidak ada di tabel products)
+        self.positions = np.asarray(positions, dtype='int64')
+        self.codes = categories.codes(self.positions)
+        self.categories = categories
+
+    def __len__(self):
+        return len(self.positions)
+
+    @classmethod
+    def from_tables(cls, order_items, products, category_translation):
+        categories = CategoryLookup.from_tables(products, category_translation)
+        order_codes, order_ids = pd.factorize(order_items['order_id'])
+        # Sort stabil: item satu order tetap sesuai urutan kemunculannya
+        order = np.argsort(order_codes, kind='stable')
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(order_codes, minlength=len(order_ids)))])
+        positions = categories.positions(order_items['product_id']).take(order)
+        return cls(order_ids, offsets, positions, categories)
+
+    def fan_out(self, order_ids, keep_unmatched=False):
+        """Fan-out baris (satu per order_id di `order_ids`) ke item-itemnya.
+
+        Mengembalikan (rows, codes): posisi baris asal untuk setiap baris hasil
+        dan kode kategori item-nya. Default seperti inner merge ke order_items
+        dan products (item dengan produk tak dikenal dibuang); dengan
+        `keep_unmatched` seperti left merge, baris tanpa item tetap ada
+        sekali dengan kode MISSING.
+        """
+        found = positions_in(order_ids, self.order_ids)
+        # Posisi -1 (order tanpa item) mengambil elemen penjaga di akhir: 0 item, kode MISSING
+        starts = np.append(self.offsets[:-1], 0).take(found)
+        counts = np.append(np.diff(self.offsets), 0).take(found)
+        repeats = np.maximum(counts, 1) if keep_unmatched else counts
+        rows = np.repeat(np.arange(len(found)), repeats)
+        # Posisi item: awal potongan order ditambah urutan di dalam potongan
+        within = np.arange(len(rows)) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+        items = np.where(np.repeat(counts > 0, repeats), np.repeat(starts, repeats) + within, -1)
+        codes = np.append(self.codes, MISSING).take(items)
+        if keep_unmatched:
+            return rows, codes
+        # Item dengan product_id yang tidak ada di tabel products dibuang (inner merge)
+        known = np.append(self.positions, -1).take(items) >= 0
+        return rows[known], codes[known]
@@ -0,0 +1,27 @@
+"""Lokasi default data mentah, output dashboard, dan cache build."""
+import os
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+# Bisa diarahkan ke data lain (mis. data sintetis benchmark) lewat OLIST_DATA_DIR
+DATA_DIR = Path(os.environ.get('OLIST_DATA_DIR', ROOT_DIR / 'data'))
+DASHBOARD_DIR = ROOT_DIR / 'dashboard'
+BUILD_DIR = ROOT_DIR / 'build'
+
+# Shapefile wilayah Brazil (level region intermediate, kolom NM_UF = nama state)
+SHAPEFILE = DASHBOARD_DIR / 'brazil_states_shapefile' / 'brazil_states_shapefile.shp'
+# Geometri state hasil penyederhanaan untuk peta dashboard
+STATE_GEOJSON = DASHBOARD_DIR / 'brazil_states.geojson'
+
+# Nama tabel -> nama file CSV mentah (sama dengan yang dibaca notebook)
+TABLES = {
+    'customers': 'customers_dataset.csv',
+    'geolocation': 'geolocation_dataset.csv',
+    'order_items': 'order_items_dataset.csv',
+    'order_payments': 'order_payments_dataset.csv',
+    'order_reviews': 'order_reviews_dataset.csv',
+    'orders': 'orders_dataset.csv',
+    'category_translation': 'product_category_name_translation.csv',
+    'products': 'products_dataset.csv',
+    'sellers': 'sellers_dataset.csv',
+}
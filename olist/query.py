@@ -0,0 +1,418 @@
+"""Tabel chart dengan filter, dihitung DuckDB langsung di atas store Parquet bertipe.
+
+Dashboard memakai tabel chart hasil `build` selama tidak ada filter. Begitu
+rentang tanggal, state, kategori, atau metode pembayaran dipilih, setiap tabel
+dihitung ulang oleh DuckDB in-process: filter menjadi klausa WHERE / semi-join
+atas tabel order, sehingga hanya baris yang lolos yang dibaca dari Parquet dan
+agregasinya (termasuk kuartil eksak) terjadi di engine, bukan di pandas.
+Hasilnya tabel dengan skema chart_store yang sama, jadi fungsi `draw_*`
+tidak berubah.
+
+Definisi mengikuti tahapan pipeline (stages.py): baris delivery adalah order
+dengan waktu pengiriman valid yang punya review, dan pembelian ulang adalah
+order pertama pelanggan yang sama setelah review negatif dibuat.
+"""
+import functools
+
+import numpy as np
+import pandas as pd
+
+from . import chart_store, export, store
+from .features import DELIVERY_STATUS_DTYPE, DELIVERY_STATUS_EDGES
+from .paths import DATA_DIR
+
+QUERY_TABLES = ('orders', 'order_reviews', 'customers', 'order_items', 'products', 'category_translation')
+# Tanpa tabel ini filter metode pembayaran tidak tersedia, filter lain tetap jalan
+OPTIONAL_QUERY_TABLES = ('order_payments',)
+# Jendela default halaman Delivery & Rating, sama dengan `six_months_ago` di notebook
+DELIVERY_WINDOW_DAYS = 180
+NEGATIVE_SCORES = (1, 2)
+REPURCHASE_WINDOW = 30
+NS_PER_DAY = 86_400 * 10**9
+# Ambang jumlah baris per kategori, sama dengan tahapan `category`
+MIN_CATEGORY_REVIEWS = 30
+MIN_CATEGORY_NEGATIVE_BASE = 20
+MIN_CATEGORY_REPURCHASE = 10
+TOP_CATEGORIES = 10
+# Jumlah kombinasi filter yang hasil event repurchase-nya disimpan di QueryEngine
+EVENT_CACHE_SIZE = 32
+# Tabel halaman Repurchase yang harus sama persis dengan tabel build selama filter tidak mengubah data
+BUILD_CHECK_KEYS = ('top_repurchase_categories', 'category_comparison')
+# Kunci chart_store yang dihasilkan setiap method `<grup>_tables`
+TABLE_GROUPS = {
+    'delivery': ('delivery_summary', 'delivery_rating_bins', 'delivery_regression', 'delivery_per_rating',
+                 'delivery_status', 'monthly_ratings'),
+    'repurchase': ('repurchase_summary', 'repurchase_by_rating', 'repurchase_time_distribution'),
+    'category': ('worst_categories', 'top_repurchase_categories', 'category_comparison'),
+}
+
+
+class Filters:
+    """Filter sidebar; nilai kosong berarti tanpa filter.
+
+    `start`/`end` adalah tanggal (inklusif) atas order_purchase_timestamp,
+    `categories` memakai nama kategori berbahasa Inggris.
+    """
+
+    def __init__(self, start=None, end=None, states=(), categories=(), payment_types=()):
+        self.start = pd.Timestamp(start) if start is not None else None
+        self.end = pd.Timestamp(end) if end is not None else None
+        self.states = tuple(sorted(states))
+        self.categories = tuple(sorted(categories))
+        self.payment_types = tuple(sorted(payment_types))
+
+    def key(self):
+        """Tuple hashable untuk kunci cache hasil query"""
+        return (self.start, self.end, self.states, self.categories, self.payment_types)
+
+    def __eq__(self, other):
+        return isinstance(other, Filters) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def order_clause(self, alias='o'):
+        """(SQL, parameter) predikat atas tabel orders `alias`"""
+        clauses, params = [], []
+        if self.start is not None:
+            clauses.append(f"{alias}.order_purchase_timestamp >= ?")
+            params.append(self.start.to_pydatetime())
+        if self.end is not None:
+            clauses.append(f"{alias}.order_purchase_timestamp < ?")
+            params.append((self.end.normalize() + pd.Timedelta(days=1)).to_pydatetime())
+        if self.states:
+            clauses.append(f"{alias}.customer_id IN (SELECT customer_id FROM customers "
+                           f"WHERE customer_state IN ({_placeholders(self.states)}))")
+            params.extend(self.states)
+        if self.categories:
+            clauses.append(f"{alias}.order_id IN (SELECT i.order_id FROM order_items i "
+                           f"JOIN products p USING (product_id) "
+                           f"JOIN category_translation t USING (product_category_name) "
+                           f"WHERE t.product_category_name_english IN ({_placeholders(self.categories)}))")
+            params.extend(self.categories)
+        if self.payment_types:
+            clauses.append(f"{alias}.order_id IN (SELECT order_id FROM order_payments "
+                           f"WHERE payment_type IN ({_placeholders(self.payment_types)}))")
+            params.extend(self.payment_types)
+        return ' AND '.join(clauses) or 'TRUE', params
+
+
+def table_group(chart_key):
+    """Nama grup `TABLE_GROUPS` untuk kunci chart, None jika tidak bisa difilter"""
+    return next((group for group, keys in TABLE_GROUPS.items() if chart_key in keys), None)
+
+
+def _placeholders(values):
+    return ', '.join('?' * len(values))
+
+
+def _delivery_status_sql(column):
+    """CASE yang sama dengan features.delivery_status (bin kanan-tertutup), hasilnya kode 0-4"""
+    edges = DELIVERY_STATUS_EDGES
+    whens = ' '.join(f"WHEN {column} <= {float(edge)!r} THEN {code}" for code, edge in enumerate(edges))
+    return f"CASE WHEN {column} IS NULL THEN NULL {whens} ELSE {len(edges)} END"
+
+
+def _days_sql(end, start):
+    return f"(epoch_ns({end}) - epoch_ns({start})) / {float(NS_PER_DAY)!r}"
+
+
+class QueryEngine:
+    """Koneksi DuckDB in-memory dengan satu view per tabel Parquet store.
+
+    Satu instance bisa dipakai bersama banyak thread: setiap query memakai
+    cursor sendiri.
+    """
+
+    def __init__(self, data_dir=DATA_DIR):
+        import duckdb
+
+        missing = [name for name in QUERY_TABLES if not store.parquet_path(name, data_dir).exists()]
+        if missing:
+            raise FileNotFoundError(f"Tabel Parquet belum ada: {', '.join(missing)}; "
+                                    f"jalankan `python -m olist build`")
+        self.con = duckdb.connect()
+        self.optional = tuple(name for name in OPTIONAL_QUERY_TABLES if store.parquet_path(name, data_dir).exists())
+        for name in QUERY_TABLES + self.optional:
+            path = str(store.parquet_path(name, data_dir)).replace("'", "''")
+            self.con.execute(f"CREATE VIEW {name} AS SELECT * FROM read_parquet('{path}')")
+        self._events = functools.lru_cache(maxsize=EVENT_CACHE_SIZE)(self._compute_events)
+
+    def query(self, sql, params=(), frames=None):
+        """Hasil `sql` sebagai DataFrame; `frames` ({nama: DataFrame}) bisa dibaca sebagai tabel"""
+        cursor = self.con.cursor()
+        try:
+            for name, frame in (frames or {}).items():
+                cursor.register(name, frame)
+            return cursor.execute(sql, list(params)).df()
+        finally:
+            cursor.close()
+
+    def options(self):
+        """Nilai yang bisa dipilih di filter beserta rentang tanggal order"""
+        dates = self.query("SELECT min(order_purchase_timestamp) AS first, "
+                           "max(order_purchase_timestamp) AS last FROM orders").iloc[0]
+        payment_types = []
+        if 'order_payments' in self.optional:
+            payment_types = self.query("SELECT DISTINCT payment_type AS v FROM order_payments "
+                                       "WHERE payment_type IS NOT NULL ORDER BY 1")['v'].tolist()
+        return {
+            'first_date': dates['first'],
+            'last_date': dates['last'],
+            'states': self.query("SELECT DISTINCT customer_state AS v FROM customers "
+                                 "WHERE customer_state IS NOT NULL ORDER BY 1")['v'].tolist(),
+            'categories': self.query("SELECT DISTINCT product_category_name_english AS v FROM category_translation "
+                                     "WHERE product_category_name_english IS NOT NULL ORDER BY 1")['v'].tolist(),
+            'payment_types': payment_types,
+        }
+
+    def default_filters(self):
+        """Filter yang sama dengan jendela 6 bulan terakhir di notebook"""
+        last = self.options()['last_date']
+        return Filters(start=last - pd.Timedelta(days=DELIVERY_WINDOW_DAYS), end=last)
+
+    def tables(self, group, filters):
+        """Semua tabel satu grup `TABLE_GROUPS` untuk `filters`"""
+        return getattr(self, f'{group}_tables')(filters)
+
+    def _delivery_cte(self, filters):
+        where, params = filters.order_clause('o')
+        sql = f"""
+        delivery AS (
+            SELECT o.order_id, o.customer_id, o.order_purchase_timestamp AS purchased, r.review_score,
+                   {_days_sql('o.order_delivered_customer_date', 'o.order_purchase_timestamp')} AS delivery_time_days,
+                   {_days_sql('o.order_delivered_customer_date', 'o.order_estimated_delivery_date')} AS accuracy_days
+            FROM orders o JOIN order_reviews r USING (order_id)
+            WHERE o.order_delivered_customer_date IS NOT NULL
+              AND o.order_purchase_timestamp IS NOT NULL
+              AND o.order_delivered_customer_date >= o.order_purchase_timestamp
+              AND {where}
+        )"""
+        return sql, params
+
+    def _reviews_cte(self, filters):
+        """Semua review order yang lolos filter beserta pelanggan uniknya"""
+        where, params = filters.order_clause('o')
+        sql = f"""
+        reviews AS (
+            SELECT o.order_id, c.customer_unique_id, r.review_score, r.review_creation_date AS reviewed
+            FROM orders o JOIN customers c USING (customer_id) JOIN order_reviews r USING (order_id)
+            WHERE {where}
+        )"""
+        return sql, params
+
+    def repurchase_events(self, filters):
+        """Review negatif yang lolos filter dan hari hingga order berikutnya pelanggan yang sama
+        (DataFrame); dihitung sekali per kombinasi filter lalu dipakai semua tabel Repurchase/kategori"""
+        return self._events(filters)
+
+    def _compute_events(self, filters):
+        # Seperti olist/repurchase.py: order pertama setelah review lewat ASOF JOIN atas order
+        # pelanggan yang terurut waktu, tanpa pasangan order x review per pelanggan. Jika order
+        # terdekat adalah order yang di-review itu sendiri, dipakai order sesudahnya (LEAD).
+        cte, params = self._reviews_cte(filters)
+        return self.query(f"""
+        WITH {cte},
+        events AS (
+            SELECT row_number() OVER () AS event_id, *
+            FROM reviews WHERE review_score IN ({_placeholders(NEGATIVE_SCORES)})
+        ),
+        customer_orders AS (
+            SELECT c.customer_unique_id, o.order_id, o.order_purchase_timestamp AS purchased,
+                   lead(o.order_purchase_timestamp) OVER w AS following
+            FROM orders o JOIN customers c USING (customer_id)
+            WHERE o.order_purchase_timestamp IS NOT NULL
+            WINDOW w AS (PARTITION BY c.customer_unique_id ORDER BY o.order_purchase_timestamp, o.order_id)
+        )
+        SELECT e.*,
+               (epoch_ns(CASE WHEN n.order_id = e.order_id THEN n.following ELSE n.purchased END)
+                - epoch_ns(e.reviewed)) // {NS_PER_DAY} AS days_to_repurchase
+        FROM events e ASOF LEFT JOIN customer_orders n
+          ON e.customer_unique_id = n.customer_unique_id AND e.reviewed < n.purchased""",
+                          params + list(NEGATIVE_SCORES))
+
+    def delivery_tables(self, filters):
+        """Tabel halaman Delivery & Rating (kecuali kategori) untuk baris yang lolos filter"""
+        cte, params = self._delivery_cte(filters)
+        per_rating = self.query(f"""
+        WITH {cte},
+        stats AS (
+            SELECT review_score, count(*) AS count, avg(delivery_time_days) AS mean,
+                   stddev_samp(delivery_time_days) AS std, min(delivery_time_days) AS min,
+                   quantile_cont(delivery_time_days, 0.25) AS q25, quantile_cont(delivery_time_days, 0.5) AS q50,
+                   quantile_cont(delivery_time_days, 0.75) AS q75, max(delivery_time_days) AS max
+            FROM delivery WHERE review_score IS NOT NULL GROUP BY review_score
+        ),
+        whiskers AS (
+            SELECT review_score,
+                   min(d.delivery_time_days) FILTER (WHERE d.delivery_time_days >= s.q25 - 1.5 * (s.q75 - s.q25)) AS low,
+                   max(d.delivery_time_days) FILTER (WHERE d.delivery_time_days <= s.q75 + 1.5 * (s.q75 - s.q25)) AS high
+            FROM stats s JOIN delivery d USING (review_score) GROUP BY review_score
+        )
+        SELECT s.*, least(w.low, s.q25) AS whislo, greatest(w.high, s.q75) AS whishi
+        FROM stats s JOIN whiskers w USING (review_score) ORDER BY s.review_score""", params)
+
+        overall = self.query(f"""
+        WITH {cte}
+        SELECT corr(delivery_time_days, review_score) AS correlation,
+               avg(delivery_time_days) AS delivery_time_mean, avg(review_score) AS review_score_mean,
+               quantile_cont(delivery_time_days, 0.95) AS delivery_time_p95,
+               regr_count(review_score, delivery_time_days) AS n,
+               regr_avgx(review_score, delivery_time_days) AS x_mean,
+               regr_sxx(review_score, delivery_time_days) AS sxx,
+               regr_syy(review_score, delivery_time_days) AS syy,
+               regr_sxy(review_score, delivery_time_days) AS sxy,
+               regr_slope(review_score, delivery_time_days) AS slope,
+               regr_intercept(review_score, delivery_time_days) AS intercept
+        FROM delivery""", params).iloc[0]
+
+        monthly = self.query(f"""
+        WITH {cte}
+        SELECT date_trunc('month', purchased) AS month, avg(review_score) AS review_score_mean,
+               count(review_score) AS count,
+               {', '.join(f'count(*) FILTER (WHERE review_score = {score}) AS {col}'
+                          for score, col in zip(chart_store.REVIEW_SCORES, chart_store.SCORE_COUNT_COLUMNS))}
+        FROM delivery GROUP BY 1 ORDER BY 1""", params)
+
+        status = self.query(f"""
+        WITH {cte}
+        SELECT {_delivery_status_sql('accuracy_days')} AS code, avg(review_score) AS review_score_mean,
+               count(review_score) AS count
+        FROM delivery GROUP BY 1 HAVING code IS NOT NULL""", params)
+        status = status.set_index('code').reindex(range(len(DELIVERY_STATUS_DTYPE.categories)))
+        status['count'] = status['count'].fillna(0)
+        status = pd.DataFrame({
+            'delivery_status': pd.Categorical.from_codes(status.index, dtype=DELIVERY_STATUS_DTYPE),
+            'review_score_mean': status['review_score_mean'].to_numpy(),
+            'count': status['count'].to_numpy(),
+            'pct': status['count'].to_numpy() / max(status['count'].sum(), 1) * 100,
+        })
+
+        bins = self.query(f"""
+        WITH {cte}
+        SELECT floor(delivery_time_days / {export.DELIVERY_BIN_DAYS!r}) * {export.DELIVERY_BIN_DAYS!r} AS delivery_day,
+               review_score, count(*) AS count
+        FROM delivery WHERE review_score IS NOT NULL GROUP BY ALL ORDER BY 1, 2""", params)
+
+        n = overall['n']
+        residual_var = (overall['syy'] - overall['slope'] * overall['sxy']) / (n - 2) if n > 2 else np.nan
+        regression = pd.DataFrame([{
+            'n': n, 'x_mean': overall['x_mean'], 'sxx': overall['sxx'], 'slope': overall['slope'],
+            'intercept': overall['intercept'], 'residual_std': np.sqrt(max(residual_var, 0.0)),
+        }]) if n else pd.DataFrame(columns=list(chart_store.CHART_SCHEMAS['delivery_regression']))
+
+        last_rating = monthly['review_score_mean'].iloc[-1] if not monthly.empty else np.nan
+        summary = pd.DataFrame([{
+            'correlation': overall['correlation'],
+            'delivery_time_mean': overall['delivery_time_mean'],
+            'review_score_mean': overall['review_score_mean'],
+            'delivery_time_p95': overall['delivery_time_p95'],
+            'last_month': monthly['month'].iloc[-1] if not monthly.empty else pd.NaT,
+            'last_rating': last_rating,
+            'target_rating': last_rating + export.RATING_TARGET_DELTA,
+        }])
+        tables = {
+            'delivery_summary': summary,
+            'delivery_rating_bins': bins,
+            'delivery_regression': regression,
+            'delivery_per_rating': per_rating,
+            'delivery_status': status,
+            'monthly_ratings': monthly,
+        }
+        return {key: chart_store.conform(key, df) for key, df in export.with_intervals(tables).items()}
+
+    def repurchase_tables(self, filters):
+        """Tabel halaman Repurchase untuk review negatif yang order-nya lolos filter"""
+        frames = {'repurchase': self.repurchase_events(filters)}
+        by_score = self.query(f"""
+        SELECT review_score, count(*) AS count, count(days_to_repurchase) AS decided,
+               count(*) FILTER (WHERE days_to_repurchase <= {REPURCHASE_WINDOW}) AS repurchased
+        FROM repurchase GROUP BY 1 ORDER BY 1""", frames=frames).astype('int64')
+        histogram = self.query(f"""
+        SELECT days_to_repurchase AS days, count(*) AS count
+        FROM repurchase WHERE days_to_repurchase <= {REPURCHASE_WINDOW} GROUP BY 1 ORDER BY 1""", frames=frames)
+        histogram = histogram.set_index('days')['count'].astype('int64')
+        tables = export.repurchase_tables_from_counters(by_score, histogram)
+        return {key: chart_store.conform(key, df) for key, df in export.with_intervals(tables).items()}
+
+    def category_tables(self, filters):
+        """Tabel kategori (rating terendah, repurchase tertinggi, perbandingan) dengan filter"""
+        delivery_cte, delivery_params = self._delivery_cte(filters)
+        reviews_cte, reviews_params = self._reviews_cte(filters)
+        category_join = ("JOIN order_items i USING (order_id) JOIN products p USING (product_id) "
+                         "JOIN category_translation t USING (product_category_name)")
+        worst = self.query(f"""
+        WITH {delivery_cte}
+        SELECT t.product_category_name_english AS category, avg(review_score) AS review_score_mean,
+               avg(delivery_time_days) AS delivery_time_mean
+        FROM delivery {category_join}
+        GROUP BY 1 HAVING count(review_score) >= {MIN_CATEGORY_REVIEWS}
+        ORDER BY review_score_mean, category LIMIT {TOP_CATEGORIES}""", delivery_params)
+
+        # Penyebut persentase review negatif: semua review order yang lolos filter, seperti tahapan `category`
+        categories = self.query(f"""
+        WITH {reviews_cte},
+        totals AS (
+            SELECT t.product_category_name_english AS category, count(*) AS total
+            FROM reviews {category_join} GROUP BY 1
+        ),
+        negatives AS (
+            SELECT t.product_category_name_english AS category, count(*) AS negative
+            FROM repurchase {category_join} GROUP BY 1
+        ),
+        order_flags AS (
+            SELECT DISTINCT ON (order_id, category) order_id, t.product_category_name_english AS category,
+                   days_to_repurchase
+            FROM repurchase {category_join}
+            ORDER BY order_id, category, event_id
+        ),
+        repurchased AS (
+            SELECT category, count(days_to_repurchase) AS count,
+                   count(*) FILTER (WHERE days_to_repurchase <= {REPURCHASE_WINDOW}) AS repurchase_count
+            FROM order_flags GROUP BY 1
+        )
+        SELECT r.category, r.count, r.repurchase_count, n.negative, tt.total
+        FROM repurchased r
+        LEFT JOIN negatives n USING (category) LEFT JOIN totals tt USING (category)""",
+                                reviews_params, frames={'repurchase': self.repurchase_events(filters)})
+
+        categories = categories[categories['count'] >= MIN_CATEGORY_REPURCHASE].copy()
+        categories['repurchase_pct'] = categories['repurchase_count'] / categories['count'] * 100
+        categories = categories.sort_values(['repurchase_pct', 'category'], ascending=[False, True])
+        negative = categories[categories['total'] >= MIN_CATEGORY_NEGATIVE_BASE]
+        comparison = negative.assign(negative_review_pct=negative['negative'] / negative['total'] * 100,
+                                     negative_review_count=negative['negative'],
+                                     total_review_count=negative['total'])
+        tables = {
+            'worst_categories': worst,
+            'top_repurchase_categories': categories.head(TOP_CATEGORIES),
+            'category_comparison': comparison.head(TOP_CATEGORIES),
+        }
+        return {key: chart_store.conform(key, df) for key, df in export.with_intervals(tables).items()}
+
+
+def noop_filters(options):
+    """Filter halaman Repurchase yang tidak mengubah datanya: [(nama, Filters)]"""
+    first, last = options['first_date'], options['last_date']
+    return [
+        ('seluruh histori', Filters(first, last)),
+        ('semua state', Filters(first, last, options['states'])),
+    ]
+
+
+def check_build(engine, chart_dir, keys=BUILD_CHECK_KEYS):
+    """Bandingkan hasil query dengan filter tanpa efek (`noop_filters`) terhadap tabel build
+    di `chart_dir`: list dict (filters, key, ok, detail)"""
+    report = []
+    for name, filters in noop_filters(engine.options()):
+        tables = engine.tables('category', filters)
+        for key in keys:
+            detail = ''
+            try:
+                pd.testing.assert_frame_equal(tables[key].reset_index(drop=True),
+                                              chart_store.load_chart(chart_dir, key).reset_index(drop=True),
+                                              check_exact=False, rtol=1e-9)
+            except AssertionError as error:
+                detail = ' '.join(str(error).split())
+            report.append({'filters': name, 'key': key, 'ok': not detail, 'detail': detail})
+    return report
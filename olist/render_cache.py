@@ -0,0 +1,125 @@
+"""Cache hasil render chart (bytes PNG/SVG) agar rerun Streamlit tidak menggambar ulang.
+
+Kunci cache adalah id chart ditambah fingerprint data inputnya, jadi chart
+hanya dirender ulang ketika datanya berubah. Entri dibatasi total ukurannya
+dan dibuang dengan urutan LRU. Satu instance dipakai bersama oleh semua sesi
+(lihat `st.cache_resource` di dashboard), sehingga render dijaga lock karena
+state pyplot bersifat global.
+"""
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from . import instrument
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# Sama dengan default st.pyplot
+SAVEFIG_KWARGS = {'dpi': 200, 'bbox_inches': 'tight'}
+
+
+def fingerprint(*values):
+    """Hash isi data input chart (DataFrame, Series, atau nilai skalar)"""
+    h = hashlib.sha1()
+    for value in values:
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            if isinstance(value, pd.DataFrame):
+                meta = (list(value.columns), [str(dtype) for dtype in value.dtypes])
+            else:
+                meta = (value.name, str(value.dtype))
+            h.update(repr(meta).encode('utf-8'))
+            h.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+        else:
+            h.update(repr(value).encode('utf-8'))
+        h.update(b'\0')
+    return h.hexdigest()
+
+
+def encode_figure(fig, fmt='png'):
+    """Encode figure ke bytes lalu tutup figure-nya agar memori tidak menumpuk"""
+    import matplotlib.pyplot as plt
+
+    buffer = io.BytesIO()
+    try:
+        with instrument.span('savefig', format=fmt, category='chart'):
+            fig.savefig(buffer, format=fmt, **SAVEFIG_KWARGS)
+    finally:
+        plt.close(fig)
+    return buffer.getvalue()
+
+
+class RenderCache:
+    """Cache LRU {(chart_id, fingerprint, format): bytes} dengan batas total byte"""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, fmt='png'):
+        self.max_bytes = max_bytes
+        self.fmt = fmt
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._render_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+            return data
+
+    def put(self, key, data):
+        with self._lock:
+            if key in self._entries:
+                self.nbytes -= len(self._entries.pop(key))
+            self._entries[key] = data
+            self.nbytes += len(data)
+            while self.nbytes > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self.nbytes -= len(evicted)
+
+    def record(self, hit):
+        """Catat satu hit atau miss; dipanggil dari beberapa thread sesi dan callback pool"""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def key(self, chart_id, *args, data_fingerprint=None):
+        """Kunci cache untuk chart `chart_id` dengan data `args`"""
+        if data_fingerprint is None:
+            data_fingerprint = fingerprint(*args)
+        return (chart_id, data_fingerprint, self.fmt)
+
+    def render(self, chart_id, draw, *args, data_fingerprint=None):
+        """Bytes gambar `draw(*args)`; hanya digambar jika (chart_id, data) belum ada di cache.
+
+        `data_fingerprint` bisa diberikan jika pemanggil sudah punya hash datanya
+        (mis. untuk DataFrame besar), selain itu dihitung dari `args`.
+        """
+        key = self.key(chart_id, *args, data_fingerprint=data_fingerprint)
+        data = self.get(key)
+        if data is not None:
+            self.record(hit=True)
+            return data
+        with self._render_lock:
+            # Sesi lain mungkin sudah merender chart yang sama selama menunggu lock
+            data = self.get(key)
+            if data is None:
+                self.record(hit=False)
+                data = encode_figure(draw(*args), self.fmt)
+                self.put(key, data)
+            else:
+                self.record(hit=True)
+        return data
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
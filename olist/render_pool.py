@@ -0,0 +1,200 @@
+"""Render chart dashboard secara paralel di pool proses yang sudah hangat.
+
+matplotlib tidak thread-safe, jadi paralelisme harus lewat proses. Setiap
+chart adalah fungsi murni `olist.charts.<nama>(*data)`, sehingga cukup nama
+fungsi dan data chart (di-pickle) yang dikirim ke worker; worker mengembalikan
+bytes gambar yang sudah di-encode. Worker meng-import matplotlib/seaborn sekali
+saat dimulai, dan pool dipakai bersama semua sesi.
+
+Worker dibuat lewat forkserver, bukan fork: saat pool dibuat, thread server
+Streamlit dan watcher LiveData sudah berjalan, dan proses hasil fork bisa
+mewarisi lock yang sedang dipegang thread lain lalu macet. Server fork dimulai
+sebagai proses Python baru yang hanya meng-import `olist.charts` dan
+`olist.render_cache`, lalu setiap worker di-fork dari sana. Semua worker dibuat
+sekaligus saat pool dibuat, jadi submit dari thread sesi tidak pernah
+meluncurkan proses.
+
+Hasil disimpan ke `RenderCache` yang sama, dan chart yang sedang dirender
+untuk sesi lain tidak dikirim dua kali. Dengan `OLIST_RENDER_WORKERS=0`, mesin
+satu core, atau platform tanpa forkserver (Windows), chart dirender berurutan
+di proses dashboard seperti semula.
+"""
+import contextlib
+import functools
+import multiprocessing
+import os
+import sys
+import threading
+import types
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from . import instrument
+from .render_cache import encode_figure
+
+ENV_WORKERS = 'OLIST_RENDER_WORKERS'
+MAX_WORKERS = 4
+# Modul yang di-import server fork sekali; worker mewarisinya tanpa meng-import dashboard
+WORKER_MODULES = ['olist.charts', 'olist.render_cache']
+# Batas waktu (detik) menunggu semua worker hidup saat pool dibuat
+START_TIMEOUT = 60
+
+
+def default_workers():
+    """Jumlah worker dari OLIST_RENDER_WORKERS, atau core yang tersedia (maks. 4); 0 = tanpa pool"""
+    if os.environ.get(ENV_WORKERS):
+        return int(os.environ[ENV_WORKERS])
+    cores = os.cpu_count() or 1
+    return min(cores, MAX_WORKERS) if cores > 1 else 0
+
+
+_started = None
+
+
+def _init_worker(started):
+    global _started
+    _started = started
+    import matplotlib
+    matplotlib.use('Agg')
+    from . import charts  # noqa: F401  (import pyplot/seaborn sekali per worker)
+
+
+def _draw(draw_name, *args):
+    with instrument.span('figure', chart=draw_name, category='chart'):
+        from . import charts
+        return getattr(charts, draw_name)(*args)
+
+
+def _render(draw_name, args, fmt):
+    """Dijalankan di worker: gambar chart lalu kembalikan bytes-nya"""
+    return encode_figure(_draw(draw_name, *args), fmt)
+
+
+def _ping():
+    # Tahan ping sampai semua worker hidup: selama belum ada worker yang menganggur, setiap
+    # submit membuat worker baru, jadi semua worker pasti dibuat di dalam `_start_workers`
+    try:
+        _started.wait(timeout=START_TIMEOUT)
+    except threading.BrokenBarrierError:
+        pass
+    return os.getpid()
+
+
+@contextlib.contextmanager
+def _without_script_main():
+    """Sembunyikan script Streamlit dari multiprocessing selama worker dibuat.
+
+    Streamlit memasang dashboard.py sebagai modul `__main__`, dan proses forkserver/spawn
+    meng-import ulang `__main__` dari path-nya sehingga worker akan menjalankan seluruh
+    script dashboard. Modul kosong membuat worker hanya memuat modul yang dibutuhkan.
+    """
+    main = sys.modules.get('__main__')
+    sys.modules['__main__'] = types.ModuleType('__main__')
+    try:
+        yield
+    finally:
+        sys.modules['__main__'] = main
+
+
+class RenderPool:
+    """Mengirim render chart ke pool proses dan menyimpan hasilnya di `cache` (RenderCache)"""
+
+    def __init__(self, cache, workers=None):
+        self.cache = cache
+        self.workers = default_workers() if workers is None else workers
+        self._executor = None
+        self._inflight = {}
+        self._lock = threading.Lock()
+        if self.workers > 0 and 'forkserver' in multiprocessing.get_all_start_methods():
+            self._start_workers()
+
+    def _start_workers(self):
+        """Buat pool dan semua worker-nya sekarang, satu kali dengan `__main__` disembunyikan;
+        setelah itu submit tidak pernah membuat proses baru"""
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload(WORKER_MODULES)
+        with self._lock, _without_script_main():
+            self._executor = ProcessPoolExecutor(self.workers, mp_context=context, initializer=_init_worker,
+                                                 initargs=(context.Barrier(self.workers),))
+            for _ in range(self.workers):
+                self._executor.submit(_ping)
+
+    @property
+    def parallel(self):
+        """True jika render dikirim ke worker, False jika berurutan di proses ini"""
+        return self._executor is not None
+
+    def render_local(self, chart_id, draw_name, args, data_fingerprint=None):
+        """Render di proses ini lewat cache (tanpa pool); Future yang sudah selesai"""
+        future = Future()
+        future.set_result(self.cache.render(chart_id, functools.partial(_draw, draw_name), *args,
+                                            data_fingerprint=data_fingerprint))
+        return future
+
+    def submit(self, chart_id, draw_name, *args, data_fingerprint=None):
+        """Future berisi bytes gambar `olist.charts.<draw_name>(*args)`; langsung selesai jika
+        sudah ada di cache, dan dipakai bersama jika chart yang sama sedang dirender"""
+        key = self.cache.key(chart_id, *args, data_fingerprint=data_fingerprint)
+        data = self.cache.get(key)
+        if data is not None:
+            self.cache.record(hit=True)
+            future = Future()
+            future.set_result(data)
+            return future
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None and self._executor is not None:
+                try:
+                    future = self._executor.submit(_render, draw_name, args, self.cache.fmt)
+                except (BrokenProcessPool, RuntimeError):
+                    # Pool rusak atau sudah ditutup: sisa render dijalankan di proses ini
+                    self._executor = None
+                else:
+                    self._inflight[key] = future
+                    future.add_done_callback(functools.partial(self._finished, key))
+        if future is None:
+            return self.render_local(chart_id, draw_name, args, data_fingerprint)
+        return future
+
+    def _finished(self, key, future):
+        with self._lock:
+            self._inflight.pop(key, None)
+        if not future.cancelled() and future.exception() is None:
+            self.cache.record(hit=False)
+            self.cache.put(key, future.result())
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+class RenderBatch:
+    """Chart satu rerun halaman: dikirim saat `add` dipanggil (urutan halaman), lalu
+    `wait` memanggil `show(target, bytes)` untuk setiap chart sesuai urutan selesainya"""
+
+    def __init__(self, pool, show):
+        self.pool = pool
+        self.show = show
+        self._pending = {}
+
+    def add(self, target, chart_id, draw_name, *args, data_fingerprint=None):
+        """`target` adalah tempat chart ditampilkan (mis. placeholder `st.empty()`)"""
+        future = self.pool.submit(chart_id, draw_name, *args, data_fingerprint=data_fingerprint)
+        self._pending.setdefault(future, []).append((target, chart_id, draw_name, args, data_fingerprint))
+        # Chart yang sudah ada di cache langsung ditampilkan
+        if future.done():
+            self._show(future)
+
+    def _show(self, future):
+        for target, chart_id, draw_name, args, data_fingerprint in self._pending.pop(future):
+            try:
+                data = future.result()
+            except BrokenProcessPool:
+                data = self.pool.render_local(chart_id, draw_name, args, data_fingerprint).result()
+            self.show(target, data)
+
+    def wait(self):
+        """Tampilkan semua chart yang belum selesai, yang paling cepat selesai lebih dulu"""
+        for future in as_completed(list(self._pending)):
+            self._show(future)
@@ -0,0 +1,69 @@
+"""Mesin pencarian pembelian ulang berikutnya setelah sebuah event (review negatif).
+
+Menggantikan self-join pelanggan di notebook (cell 144-148) yang membentuk
+semua pasangan order x review per pelanggan. Di sini order setiap pelanggan
+diurutkan sekali berdasarkan waktu, lalu setiap event dicari posisinya dengan
+`np.searchsorted`, sehingga waktu dan memori mendekati linear.
+"""
+import numpy as np
+import pandas as pd
+
+NS_PER_DAY = 86_400 * 10**9
+DEFAULT_WINDOWS = (30,)
+
+
+def window_column(window):
+    return f'repurchased_{window}days'
+
+
+def next_purchase(orders, events, key='customer_unique_id', order_time='order_purchase_timestamp',
+                  event_time='review_creation_date', windows=DEFAULT_WINDOWS):
+    """Cari order pertama milik pelanggan yang sama setelah waktu event.
+
+    `orders` butuh kolom `key`, order_id, dan `order_time`; `events` butuh `key`,
+    order_id (order yang di-review, tidak dihitung sebagai pembelian ulang), dan
+    `event_time`. Hasilnya sejajar dengan index `events`: next_order_id,
+    days_to_repurchase (hari penuh, Int64), dan satu kolom boolean per window.
+    Event tanpa pembelian berikutnya bernilai <NA>, sama seperti hasil left merge
+    di notebook.
+    """
+    orders = orders[[key, 'order_id', order_time]].dropna(subset=[order_time])
+    n_orders = len(orders)
+
+    codes, _ = pd.factorize(pd.concat([orders[key], events[key]], ignore_index=True))
+    order_cust, event_cust = codes[:n_orders], codes[n_orders:]
+    order_ts = orders[order_time].to_numpy(dtype='datetime64[ns]').view('int64')
+    event_ts = events[event_time].to_numpy(dtype='datetime64[ns]').view('int64')
+
+    # Ranking timestamp agar (pelanggan, waktu) muat dalam satu kunci int64 yang bisa diurutkan
+    _, ranks = np.unique(np.concatenate([order_ts, event_ts]), return_inverse=True)
+    n_ranks = np.int64(len(ranks) + 1)
+    order_key = order_cust.astype('int64') * n_ranks + ranks[:n_orders]
+    event_key = event_cust.astype('int64') * n_ranks + ranks[n_orders:]
+
+    order_sort = np.argsort(order_key, kind='stable')
+    sorted_key = order_key[order_sort]
+    # Sentinel di akhir agar posisi == n_orders tetap bisa diindeks
+    sorted_cust = np.append(order_cust[order_sort], -1)
+    sorted_ts = np.append(order_ts[order_sort], 0)
+    sorted_ids = np.append(orders['order_id'].to_numpy(dtype=object)[order_sort], None)
+
+    # Order pertama dengan waktu > waktu event; lewati order yang di-review itu sendiri
+    pos = np.searchsorted(sorted_key, event_key, side='right')
+    pos += sorted_ids[pos] == events['order_id'].to_numpy(dtype=object)
+    pos = np.minimum(pos, n_orders)
+    found = (sorted_cust[pos] == event_cust) & events[event_time].notna().to_numpy()
+    days = (sorted_ts[pos] - event_ts) // NS_PER_DAY
+
+    result = pd.DataFrame(index=events.index)
+    result['next_order_id'] = np.where(found, sorted_ids[pos], None)
+    result['days_to_repurchase'] = pd.arrays.IntegerArray(np.where(found, days, 0), ~found)
+    for window in windows:
+        result[window_column(window)] = pd.arrays.BooleanArray(days <= window, ~found)
+    return result
+
+
+def attach_repurchase(negative_reviews, customer_orders, windows=DEFAULT_WINDOWS):
+    """Tambahkan kolom hasil `next_purchase` ke setiap review negatif"""
+    found = next_purchase(customer_orders, negative_reviews, windows=windows)
+    return pd.concat([negative_reviews, found], axis=1)
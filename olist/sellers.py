@@ -0,0 +1,175 @@
+"""Performa seller: jarak seller -> pelanggan, ketepatan waktu, dan rating.
+
+Semua langkah bekerja atas array: join id lewat `lookup.positions_in`,
+koordinat dari centroid zip code prefix (`geo.GeoIndex`), jarak haversine
+dalam satu lintasan NumPy, dan agregasi per seller dengan `np.bincount` atas
+kode integer seller. Leaderboard memilih k seller teratas/terbawah dengan
+`np.partition` lalu hanya mengurutkan kandidatnya, bukan seluruh seller.
+"""
+import numpy as np
+import pandas as pd
+
+from . import features
+from .lookup import positions_in
+
+EARTH_RADIUS_KM = 6371.0088
+# Tepat waktu: diterima paling lambat 1 hari setelah estimasi (status On Time atau lebih cepat)
+ON_TIME_MAX_DAYS = features.DELIVERY_STATUS_EDGES[2]
+LEADERBOARD_SIZE = 10
+MIN_SELLER_ITEMS = 30
+DISTANCE_EDGES_KM = [100, 500, 1000, 2000]
+DISTANCE_LABELS = ['<100 km', '100-500 km', '500-1000 km', '1000-2000 km', '>2000 km']
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Jarak lingkaran besar (km) antar titik dalam derajat; NaN jika salah satu titik kosong"""
+    lat1, lng1, lat2, lng2 = (np.radians(np.asarray(v, dtype='float64')) for v in (lat1, lng1, lat2, lng2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def _take(values, positions):
+    """`values[positions]` sebagai float64 dengan NaN untuk posisi -1"""
+    values = np.append(np.asarray(values, dtype='float64'), np.nan)
+    return values.take(positions)
+
+
+def _take_labels(values, positions):
+    """`values[positions]` sebagai array objek dengan NA untuk posisi -1"""
+    return pd.api.extensions.take(np.asarray(values, dtype=object), positions, allow_fill=True)
+
+
+def _coordinates(geo_index, prefixes):
+    """(lat, lng) centroid zip code prefix, memakai prefix terdekat jika tidak ada; NaN jika kosong"""
+    positions, _ = geo_index.lookup(prefixes)
+    return _take(geo_index.lat, positions), _take(geo_index.lng, positions)
+
+
+def item_frame(order_items, orders, customers, sellers, reviews, geo_index):
+    """Satu baris per item dari order yang sudah diterima pelanggan: kode seller
+    (categorical seller_id), jarak seller -> pelanggan, waktu pengiriman,
+    selisih terhadap estimasi, dan rata-rata rating order-nya"""
+    delivered = orders.dropna(subset=['order_delivered_customer_date', 'order_estimated_delivery_date'])
+    delivered = delivered.reset_index(drop=True)
+    order_pos = positions_in(order_items['order_id'], delivered['order_id'])
+    keep = (order_pos >= 0) & order_items['seller_id'].notna().to_numpy()
+    items = order_items[keep]
+    order_pos = order_pos[keep]
+
+    # Fitur per order dihitung sekali lalu diambil per item dengan indeks integer
+    rating = reviews.groupby('order_id', sort=False)['review_score'].mean()
+    order_rating = _take(rating.to_numpy(), positions_in(delivered['order_id'], rating.index))
+    customer_pos = positions_in(delivered['customer_id'], customers['customer_id'])
+    customer_lat, customer_lng = _coordinates(
+        geo_index, _take(customers['customer_zip_code_prefix'].to_numpy(dtype='float64', na_value=np.nan),
+                         customer_pos))
+
+    seller_codes, seller_ids = pd.factorize(items['seller_id'])
+    seller_pos = positions_in(seller_ids, sellers['seller_id'])
+    seller_lat, seller_lng = _coordinates(
+        geo_index, _take(sellers['seller_zip_code_prefix'].to_numpy(dtype='float64', na_value=np.nan), seller_pos))
+
+    distance = haversine_km(seller_lat.take(seller_codes), seller_lng.take(seller_codes),
+                            customer_lat.take(order_pos), customer_lng.take(order_pos))
+    return pd.DataFrame({
+        'seller_id': pd.Categorical.from_codes(seller_codes, categories=pd.Index(seller_ids)),
+        'distance_km': distance.astype('float32'),
+        'delivery_time_days': features.delivery_time_days(delivered).to_numpy('float32').take(order_pos),
+        'delivery_accuracy_days': features.delivery_accuracy_days(delivered).to_numpy('float32').take(order_pos),
+        'review_score': order_rating.astype('float32').take(order_pos),
+    })
+
+
+def _sums(codes, size, values):
+    """(jumlah, banyak nilai non-NaN) `values` per kode"""
+    known = ~np.isnan(values)
+    return (np.bincount(codes[known], weights=values[known], minlength=size),
+            np.bincount(codes[known], minlength=size))
+
+
+def seller_performance(items, sellers):
+    """Agregat per seller: jumlah item, tingkat tepat waktu (%), rata-rata keterlambatan
+    (hari, 0 untuk item tepat waktu/lebih cepat), rating, dan jarak rata-rata"""
+    codes = items['seller_id'].cat.codes.to_numpy()
+    seller_ids = items['seller_id'].cat.categories
+    size = len(seller_ids)
+    accuracy = items['delivery_accuracy_days'].to_numpy('float64')
+    rating_sum, rating_n = _sums(codes, size, items['review_score'].to_numpy('float64'))
+    distance_sum, distance_n = _sums(codes, size, items['distance_km'].to_numpy('float64'))
+    count = np.bincount(codes, minlength=size)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        performance = pd.DataFrame({
+            'seller_id': seller_ids,
+            'items': count,
+            'on_time_rate': np.bincount(codes, weights=accuracy <= ON_TIME_MAX_DAYS, minlength=size) / count * 100,
+            'mean_delay_days': np.bincount(codes, weights=np.clip(accuracy, 0, None), minlength=size) / count,
+            'rating_mean': np.where(rating_n > 0, rating_sum / rating_n, np.nan),
+            'distance_km_mean': np.where(distance_n > 0, distance_sum / distance_n, np.nan),
+        })
+    states = sellers.drop_duplicates('seller_id')
+    seller_state = _take_labels(states['seller_state'], positions_in(seller_ids, states['seller_id']))
+    return performance.assign(seller_state=seller_state)
+
+
+def top_k(frame, k, by, ascending=False):
+    """k baris teratas `frame` menurut kolom `by` (kolom pertama sebagai kunci utama).
+
+    `np.partition` mencari ambang kunci utama dalam O(n); hanya baris di dalam
+    ambang (k baris ditambah yang seri di ambang) yang diurutkan penuh. Kunci
+    NaN diperlakukan sebagai yang terakhir seperti `sort_values`, jadi ikut
+    terpilih jika kunci yang terisi kurang dari k.
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    keys = frame[by[0]].to_numpy(dtype='float64')
+    keys = np.where(np.isnan(keys), np.inf, keys if ascending else -keys)
+    if len(frame) > k > 0:
+        threshold = np.partition(keys, k - 1)[k - 1]
+        frame = frame[keys <= threshold]
+    return frame.sort_values(by, ascending=ascending, kind='stable').head(k)
+
+
+def leaderboard(performance, k=LEADERBOARD_SIZE, min_items=MIN_SELLER_ITEMS):
+    """k seller terbaik dan terburuk (minimal `min_items` item) menurut tingkat tepat waktu,
+    lalu rating dan keterlambatan sebagai penentu seri. Jika seller yang memenuhi syarat
+    kurang dari 2k, grup terburuk hanya berisi seller yang tidak ada di grup terbaik."""
+    eligible = performance[performance['items'] >= min_items]
+    eligible = eligible.assign(punctuality=-eligible['mean_delay_days'])
+    groups = []
+    for group, ascending in (('top', False), ('bottom', True)):
+        if groups:
+            eligible = eligible[~eligible['seller_id'].isin(groups[0]['seller_id'])]
+        ranked = top_k(eligible, k, ['on_time_rate', 'rating_mean', 'punctuality', 'seller_id'], ascending=ascending)
+        groups.append(ranked.assign(rank_group=group, rank=np.arange(1, len(ranked) + 1)))
+    return pd.concat(groups, ignore_index=True)
+
+
+def distance_table(items):
+    """Waktu pengiriman, tingkat tepat waktu, dan rating per rentang jarak seller -> pelanggan"""
+    distance = items['distance_km'].to_numpy('float64')
+    known = ~np.isnan(distance)
+    codes = np.searchsorted(DISTANCE_EDGES_KM, distance[known], side='right')
+    size = len(DISTANCE_LABELS)
+    count = np.bincount(codes, minlength=size)
+    delivery_sum, delivery_n = _sums(codes, size, items['delivery_time_days'].to_numpy('float64')[known])
+    rating_sum, rating_n = _sums(codes, size, items['review_score'].to_numpy('float64')[known])
+    on_time = items['delivery_accuracy_days'].to_numpy('float64')[known] <= ON_TIME_MAX_DAYS
+    with np.errstate(invalid='ignore', divide='ignore'):
+        table = pd.DataFrame({
+            'distance_bin': DISTANCE_LABELS,
+            'items': count,
+            'delivery_time_mean': delivery_sum / delivery_n,
+            'on_time_rate': np.bincount(codes, weights=on_time, minlength=size) / count * 100,
+            'rating_mean': rating_sum / rating_n,
+        })
+    return table[table['items'] > 0].reset_index(drop=True)
+
+
+def seller_tables(order_items, orders, customers, sellers, reviews, geo_index, k=LEADERBOARD_SIZE):
+    """Performa per seller, leaderboard top/bottom-k, dan ringkasan per rentang jarak"""
+    items = item_frame(order_items, orders, customers, sellers, reviews, geo_index)
+    performance = seller_performance(items, sellers)
+    return {
+        'performance': performance,
+        'leaderboard': leaderboard(performance, k),
+        'distance': distance_table(items),
+    }
@@ -0,0 +1,159 @@
+"""Sketch kuantil KLL yang ringkas dan bisa digabung antar grup.
+
+Menggantikan `describe()`/`np.percentile` atas seluruh kolom untuk statistik
+boxplot dan persentil. Sketch menyimpan item di beberapa level; item di level
+h mewakili 2**h nilai asli. Jika sebuah level melebihi kapasitasnya, item
+diurutkan lalu separuhnya (selang-seling) dinaikkan ke level berikutnya.
+Dengan k item di level teratas, galat rank kuantil sekitar 1.7/k, dan ukuran
+sketch tetap O(k) berapapun jumlah datanya. Sketch per grup digabung
+(`merge`) untuk kuantil seluruh data tanpa membaca ulang baris.
+
+Selama belum pernah dipadatkan (n <= k), sketch menyimpan semua nilai dan
+kuantilnya sama persis dengan `np.percentile` (interpolasi linear). Offset
+pemadatan bergantian secara deterministik, sehingga hasil `update` sekali
+jalan hanya bergantung pada isi data, bukan urutan barisnya.
+"""
+import numpy as np
+import pandas as pd
+
+DEFAULT_K = 200
+CAPACITY_DECAY = 2 / 3
+MIN_CAPACITY = 2
+# Sama dengan default matplotlib/seaborn: whisker sampai 1.5 x IQR dari kotak
+WHISKER_IQR = 1.5
+
+
+class KLLSketch:
+    """Sketch kuantil KLL untuk satu kolom numerik"""
+
+    def __init__(self, k=DEFAULT_K):
+        self.k = k
+        self.n = 0
+        self.min = np.nan
+        self.max = np.nan
+        self.levels = [np.empty(0)]
+        self._offsets = [0]
+
+    def __len__(self):
+        return self.n
+
+    @property
+    def exact(self):
+        """True jika belum ada pemadatan (semua nilai masih tersimpan)"""
+        return len(self.levels) == 1
+
+    def _capacity(self, level):
+        depth = len(self.levels) - 1 - level
+        return max(int(np.ceil(self.k * CAPACITY_DECAY ** depth)), MIN_CAPACITY)
+
+    def _compact(self, level):
+        items = np.sort(self.levels[level])
+        keep = items[len(items) - len(items) % 2:]
+        items = items[:len(items) - len(keep)]
+        promoted = items[self._offsets[level]::2]
+        self._offsets[level] ^= 1
+        if level + 1 == len(self.levels):
+            self.levels.append(np.empty(0))
+            self._offsets.append(0)
+        self.levels[level] = keep
+        self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+
+    def _compress(self):
+        # Seperti KLL asli: padatkan hanya jika total item melebihi total kapasitas,
+        # mulai dari level terendah yang penuh
+        while sum(map(len, self.levels)) > sum(self._capacity(h) for h in range(len(self.levels))):
+            level = next(h for h in range(len(self.levels)) if len(self.levels[h]) >= self._capacity(h))
+            self._compact(level)
+
+    def update(self, values):
+        """Tambahkan nilai (array/Series); NaN diabaikan"""
+        values = np.asarray(values, dtype='float64')
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return self
+        self.n += len(values)
+        self.min = np.fmin(self.min, values.min())
+        self.max = np.fmax(self.max, values.max())
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        """Sketch baru berisi gabungan data kedua sketch"""
+        if other.k != self.k:
+            raise ValueError(f"Sketch dengan k berbeda tidak bisa digabung ({self.k} vs {other.k})")
+        merged = KLLSketch(self.k)
+        merged.n = self.n + other.n
+        merged.min = np.fmin(self.min, other.min)
+        merged.max = np.fmax(self.max, other.max)
+        depth = max(len(self.levels), len(other.levels))
+        merged.levels = [np.concatenate([sk.levels[h] for sk in (self, other) if h < len(sk.levels)])
+                         for h in range(depth)]
+        merged._offsets = [(self._offsets + [0] * depth)[h] for h in range(depth)]
+        merged._compress()
+        return merged
+
+    def _weighted(self):
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2 ** h, dtype='int64') for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        return items[order], np.cumsum(weights[order])
+
+    def quantile(self, q):
+        """Kuantil (skalar atau array q di [0, 1]); NaN jika sketch kosong"""
+        q = np.asarray(q, dtype='float64')
+        if not self.n:
+            return np.full(q.shape, np.nan) if q.ndim else np.nan
+        if self.exact:
+            return np.quantile(self.levels[0], q)
+        items, cumulative = self._weighted()
+        pos = np.searchsorted(cumulative, q * cumulative[-1], side='left')
+        result = items[np.minimum(pos, len(items) - 1)]
+        result = np.where(q <= 0, self.min, np.where(q >= 1, self.max, result))
+        return result if q.ndim else float(result)
+
+    def whiskers(self, q1, q3, whis=WHISKER_IQR):
+        """Nilai terkecil >= q1 - whis*IQR dan terbesar <= q3 + whis*IQR (seperti matplotlib)"""
+        iqr = q3 - q1
+        items = np.concatenate(self.levels + [np.array([self.min, self.max])])
+        low = items[items >= q1 - whis * iqr]
+        high = items[items <= q3 + whis * iqr]
+        whislo = low.min() if len(low) else q1
+        whishi = high.max() if len(high) else q3
+        return min(whislo, q1), max(whishi, q3)
+
+
+def box_stats(sketch, whis=WHISKER_IQR):
+    """Statistik boxplot (min, kuartil, max, whisker) dari satu sketch"""
+    q25, q50, q75 = sketch.quantile([0.25, 0.5, 0.75])
+    whislo, whishi = sketch.whiskers(q25, q75, whis) if sketch.n else (np.nan, np.nan)
+    return {'min': sketch.min, 'q25': q25, 'q50': q50, 'q75': q75, 'max': sketch.max,
+            'whislo': whislo, 'whishi': whishi}
+
+
+class GroupSketches:
+    """Satu KLLSketch per grup untuk satu kolom"""
+
+    def __init__(self, sketches, k=DEFAULT_K):
+        self.sketches = sketches
+        self.k = k
+
+    @classmethod
+    def from_frame(cls, frame, by, column, k=DEFAULT_K):
+        """Satu sketch per grup `by`; setiap grup dimasukkan sekali jalan"""
+        sketches = {}
+        for key, values in frame.groupby(by, observed=True, sort=True)[column]:
+            sketches[key] = KLLSketch(k).update(values.to_numpy(dtype='float64', na_value=np.nan))
+        return cls(sketches, k)
+
+    def total(self):
+        """Satu sketch untuk seluruh grup"""
+        total = KLLSketch(self.k)
+        for sketch in self.sketches.values():
+            total = total.merge(sketch)
+        return total
+
+    def box_stats(self, whis=WHISKER_IQR):
+        """DataFrame statistik boxplot per grup (index = kunci grup)"""
+        return pd.DataFrame.from_dict({key: box_stats(sketch, whis) for key, sketch in self.sketches.items()},
+                                      orient='index')
@@ -0,0 +1,229 @@
+"""Tahapan pipeline yang mereplikasi alur notebook.ipynb tanpa kernel Jupyter.
+
+Urutan: load -> lookup / clean -> delivery_review / repurchase -> cube -> category / geo / seller_performance
+-> export
+"""
+import functools
+
+import pandas as pd
+
+from . import features, store
+from .cube import MIN_COUNT_CATEGORY, MIN_COUNT_NEGATIVE, MIN_COUNT_STATE_CATEGORY, build_cubes, rating_delivery_corr
+from .export import write_outputs
+from .geo import GeoIndex
+from .graph import Stage, register, stage
+from .lookup import OrderItems
+from .paths import TABLES
+from .repurchase import attach_repurchase
+from .sellers import seller_tables
+
+# Kolom yang benar-benar dipakai pipeline per tabel (None = semua kolom)
+USED_COLUMNS = {
+    'customers': ['customer_id', 'customer_unique_id', 'customer_zip_code_prefix', 'customer_state'],
+    'geolocation': ['geolocation_zip_code_prefix', 'geolocation_lat', 'geolocation_lng'],
+    'order_items': ['order_id', 'product_id', 'seller_id', 'price'],
+    'order_payments': ['order_id', 'payment_type', 'payment_value'],
+    'order_reviews': ['review_id', 'order_id', 'review_score', 'review_creation_date', 'review_answer_timestamp'],
+    'orders': ['order_id', 'customer_id', 'order_status', 'order_purchase_timestamp',
+               'order_delivered_customer_date', 'order_estimated_delivery_date'],
+    'category_translation': None,
+    'products': ['product_id', 'product_category_name'],
+    'sellers': ['seller_id', 'seller_zip_code_prefix', 'seller_state'],
+}
+
+
+def read_table(path, name, columns):
+    """Load: baca satu tabel bertipe dari store Parquet dengan proyeksi kolom,
+    mengonversi CSV-nya lebih dulu jika Parquet belum ada atau basi"""
+    if not store.is_converted(name, path.parent):
+        store.convert_table(name, path.parent)
+    return store.load_table(name, columns=columns, data_dir=path.parent)
+
+
+# Satu tahapan load per tabel, sehingga perubahan satu file hanya membatalkan tabel itu.
+# Tidak di-pickle ulang karena store Parquet sudah menjadi cache-nya.
+for _table, _filename in TABLES.items():
+    register(Stage(_table, functools.partial(read_table, name=_table, columns=USED_COLUMNS[_table]),
+                   files=(_filename,), cached=False))
+
+
+@stage('clean', deps=('orders', 'order_reviews'))
+def clean(orders, order_reviews):
+    """Pastikan kolom tanggal bertipe datetime (cell 87-89); no-op jika dibaca dari store"""
+    return {'orders': store.apply_schema(orders, 'orders'), 'reviews': store.apply_schema(order_reviews, 'order_reviews')}
+
+
+@stage('delivery_review', deps=('clean',))
+def delivery_review(clean):
+    """Pesanan 6 bulan terakhir dengan waktu pengiriman valid dan review (cell 101-120, 187)"""
+    orders_clean = clean['orders']
+    max_date = orders_clean['order_purchase_timestamp'].max()
+    six_months_ago = max_date - pd.Timedelta(days=180)
+    recent_orders = orders_clean[orders_clean['order_purchase_timestamp'] >= six_months_ago].copy()
+
+    recent_orders['delivery_time_days'] = features.delivery_time_days(recent_orders)
+    delivery_time_df = recent_orders.dropna(subset=['delivery_time_days'])
+    delivery_time_df = delivery_time_df[delivery_time_df['delivery_time_days'] >= 0]
+
+    delivery_review_df = pd.merge(delivery_time_df, clean['reviews'], on='order_id', how='inner')
+    return features.add_delivery_features(delivery_review_df)
+
+
+@stage('repurchase', deps=('clean', 'customers'))
+def repurchase(clean, customers):
+    """Pembelian ulang terdekat setelah review negatif (cell 138-148)"""
+    customer_orders_df = pd.merge(clean['orders'], customers, on='customer_id', how='inner')
+    customer_orders_reviews_df = pd.merge(customer_orders_df, clean['reviews'], on='order_id', how='inner')
+    negative_reviews_df = customer_orders_reviews_df[customer_orders_reviews_df['review_score'].isin([1, 2])].copy()
+
+    repurchase_df = attach_repurchase(negative_reviews_df, customer_orders_df)
+    return {
+        'negative_reviews': negative_reviews_df,
+        'repurchase': repurchase_df,
+        # Order setiap review (seluruh histori), penyebut persentase review negatif per kategori
+        'review_orders': customer_orders_reviews_df['order_id'],
+    }
+
+
+@stage('lookup', deps=('order_items', 'products', 'category_translation'))
+def lookup(order_items, products, category_translation):
+    """Item per order dan kode kategori produknya, dibangun sekali (lihat olist/lookup.py)"""
+    return OrderItems.from_tables(order_items, products, category_translation)
+
+
+@stage('cube', deps=('delivery_review', 'repurchase', 'customers', 'lookup'))
+def cube(delivery_review, repurchase, customers, lookup):
+    """Cube measure aditif grain order dan item (lihat olist/cube.py)"""
+    return build_cubes(delivery_review, repurchase['repurchase'], customers, lookup)
+
+
+@stage('category', deps=('cube', 'repurchase', 'lookup'))
+def category(cube, repurchase, lookup):
+    """Analisis kategori produk: rating, review negatif, dan repurchase (cell 127-176, 255)"""
+    categories = lookup.categories
+    category_analysis = (
+        cube['item']
+        .relabel('product_category_name', categories.translation(), 'product_category_name_english')
+        .rollup('product_category_name_english')
+        .rename(columns={'rating_mean': 'review_score_mean', 'n': 'review_score_count',
+                         'delivery_mean': 'delivery_time_days_mean'})
+        [['product_category_name_english', 'review_score_mean', 'review_score_count', 'delivery_time_days_mean']]
+    )
+    worst = (category_analysis[category_analysis['review_score_count'] >= MIN_COUNT_CATEGORY]
+             .sort_values('review_score_mean')
+             .reset_index(drop=True))
+
+    # Satu baris per (review negatif, item) seperti inner merge ke order_items dan products,
+    # hanya dengan kolom yang dipakai
+    negative_orders = repurchase['negative_reviews']['order_id']
+    rows, codes = lookup.fan_out(negative_orders)
+    negative_product_df = pd.DataFrame({
+        'order_id': negative_orders.array.take(rows),
+        'product_category_name_english': categories.english_names(codes),
+    })
+    negative_counts = (negative_product_df['product_category_name_english']
+                       .value_counts()
+                       .rename('negative_review_count'))
+    # Penyebutnya semua review dengan jendela yang sama seperti pembilangnya (seluruh histori),
+    # bukan jumlah review 6 bulan di category_analysis; sama dengan QueryEngine.category_tables
+    _, review_codes = lookup.fan_out(repurchase['review_orders'])
+    total_counts = (pd.Series(categories.english_names(review_codes))
+                    .value_counts()
+                    .rename('total_review_count'))
+    negative = pd.concat([negative_counts, total_counts.reindex(negative_counts.index)], axis=1)
+    negative['negative_review_pct'] = negative['negative_review_count'] / negative['total_review_count'] * 100
+    negative = negative[negative['total_review_count'] >= MIN_COUNT_NEGATIVE].sort_values('negative_review_pct', ascending=False)
+    negative = negative.rename_axis('product_category_name_english').reset_index()
+
+    repurchase_product_df = (
+        repurchase['repurchase']
+        .merge(negative_product_df[['order_id', 'product_category_name_english']], on='order_id', how='inner')
+        .drop_duplicates(subset=['order_id', 'product_category_name_english'])
+    )
+    repurchase_by_category = (
+        repurchase_product_df
+        .groupby('product_category_name_english')['repurchased_30days']
+        .agg(['mean', 'count'])
+        .reset_index()
+    )
+    repurchase_by_category['repurchase_pct'] = repurchase_by_category['mean'].astype(float) * 100
+    # Seri diurutkan menurut nama kategori, sama dengan QueryEngine.category_tables
+    repurchase_by_category = (repurchase_by_category[repurchase_by_category['count'] >= 10]
+                              .sort_values(['repurchase_pct', 'product_category_name_english'],
+                                           ascending=[False, True]))
+
+    comparison = pd.merge(
+        repurchase_by_category,
+        negative[['product_category_name_english', 'negative_review_pct', 'negative_review_count',
+                  'total_review_count']],
+        on='product_category_name_english',
+        how='inner'
+    ).sort_values(['repurchase_pct', 'product_category_name_english'], ascending=[False, True]).head(10)
+
+    return {
+        'worst': worst,
+        'negative': negative,
+        'repurchase_by_category': repurchase_by_category,
+        'comparison': comparison,
+    }
+
+
+@stage('geo_index', files=(TABLES['geolocation'],))
+def geo_index(path):
+    """Centroid per zip code prefix dari tabel geolokasi, dibaca per potongan dengan kolom terpangkas (cell 267/269)"""
+    return GeoIndex.from_file(path.parent)
+
+
+@stage('geo', deps=('delivery_review', 'repurchase', 'customers', 'cube'))
+def geo(delivery_review, repurchase, customers, cube):
+    """Agregat per state untuk analisis geospasial (cell 271-277)"""
+    customer_state = customers[['customer_id', 'customer_state']]
+
+    # Korelasi dan rata-rata waktu pengiriman per state di-roll-up dari cube grain order
+    state_corr = rating_delivery_corr(cube['order'], 'customer_state').reset_index(name='corr_delivery_rating')
+    state_delivery = (cube['order'].rollup('customer_state')
+                      .rename(columns={'delivery_mean': 'delivery_time_days'})
+                      [['customer_state', 'delivery_time_days']])
+
+    repurchase_df = repurchase['repurchase']
+    neg_repurchase = delivery_review[delivery_review['review_score'].isin([1, 2])].merge(
+        customer_state, on='customer_id', how='left'
+    ).merge(
+        repurchase_df[['customer_id', 'days_to_repurchase']], on='customer_id', how='left'
+    )
+    neg_repurchase['repurchase_30d_flag'] = (neg_repurchase['days_to_repurchase'] <= 30).fillna(False).astype(int)
+    repurchase_state = neg_repurchase.groupby('customer_state', observed=True).agg(
+        total_neg=('customer_id', 'count'),
+        repurchase_30d=('repurchase_30d_flag', 'sum')
+    ).reset_index()
+    repurchase_state['repurchase_rate'] = repurchase_state['repurchase_30d'] / repurchase_state['total_neg'] * 100
+
+    category_state_stats = (
+        cube['item']
+        .rollup(['customer_state', 'product_category_name'], min_count=MIN_COUNT_STATE_CATEGORY)
+        .rename(columns={'rating_mean': 'avg_rating', 'n': 'count'})
+        [['customer_state', 'product_category_name', 'avg_rating', 'repurchase_rate', 'count']]
+    )
+    problematic = category_state_stats[
+        (category_state_stats['avg_rating'] < 3.5) &
+        (category_state_stats['repurchase_rate'] < 0.10)
+    ].reset_index(drop=True)
+
+    return {
+        'state_corr': state_corr,
+        'state_delivery': state_delivery,
+        'repurchase_state': repurchase_state,
+        'problematic': problematic,
+    }
+
+
+@stage('seller_performance', deps=('clean', 'order_items', 'customers', 'sellers', 'geo_index'))
+def seller_performance(clean, order_items, customers, sellers, geo_index):
+    """Jarak seller -> pelanggan, performa per seller, dan leaderboard (lihat olist/sellers.py)"""
+    return seller_tables(order_items, clean['orders'], customers, sellers, clean['reviews'], geo_index)
+
+
+@stage('export', deps=('delivery_review', 'repurchase', 'category', 'geo', 'cube', 'seller_performance'), sink=True)
+def export(out_dir, delivery_review, repurchase, category, geo, cube, seller_performance):
+    """Tulis chart store, cube, main_data.csv, dan delivery_review_df.parquet untuk dashboard"""
+    return write_outputs(out_dir, delivery_review, repurchase, category, geo, cube, seller_performance)
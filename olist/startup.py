@@ -0,0 +1,81 @@
+"""Ukur waktu cold start dashboard per halaman dan bandingkan dengan budget.
+
+Setiap pengukuran menjalankan satu halaman di proses Python baru (seperti pod
+yang baru di-scale-out) lewat `streamlit.testing.v1.AppTest` dengan `?page=`,
+sehingga import, pembacaan data, dan render chart pertama ikut terukur. Selain
+waktu, dicatat juga RSS puncak proses dan modul berat mana yang ter-import oleh
+halaman tersebut.
+"""
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+from .paths import DASHBOARD_DIR
+
+DASHBOARD_SCRIPT = DASHBOARD_DIR / 'dashboard.py'
+# Budget cold start (detik) per halaman, termasuk import streamlit/pandas
+PAGE_BUDGETS = {
+    'Delivery & Rating Analysis': 12.0,
+    'Repurchase Analysis': 10.0,
+    'Geographic Analysis': 4.0,
+}
+HEAVY_MODULES = ('matplotlib.pyplot', 'seaborn', 'pydeck', 'geopandas')
+DEFAULT_TIMEOUT = 300
+
+# Dijalankan di proses baru: argv = (script, halaman, timeout, HEAVY_MODULES sebagai JSON)
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+script, page, timeout = sys.argv[1], sys.argv[2], float(sys.argv[3])
+app = AppTest.from_file(script, default_timeout=timeout)
+app.query_params['page'] = page
+app.run()
+try:
+    import resource
+    max_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+except ImportError:
+    max_rss_kb = None
+print(json.dumps({
+    'seconds': time.perf_counter() - start,
+    'max_rss_kb': max_rss_kb,
+    'errors': [str(e.value) for e in app.exception],
+    'modules': [m for m in json.loads(sys.argv[4]) if m in sys.modules],
+}))
+"""
+
+
+def measure_page(page, out_dir=DASHBOARD_DIR, timeout=DEFAULT_TIMEOUT, env=None):
+    """Waktu cold start satu halaman (detik), RSS puncak, dan modul berat yang ter-import"""
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, '-c', _PROBE, str(DASHBOARD_SCRIPT), page, str(timeout), json.dumps(HEAVY_MODULES)],
+        cwd=out_dir, env=env, capture_output=True, text=True, timeout=timeout
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Pengukuran halaman '{page}' gagal:\n{proc.stderr.strip()}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    if result['errors']:
+        raise RuntimeError(f"Halaman '{page}' error: {result['errors'][0]}")
+    # Waktu total proses termasuk start interpreter, bukan hanya run script
+    result['seconds'] = time.perf_counter() - started
+    return result
+
+
+def measure_startup(pages=None, out_dir=DASHBOARD_DIR, runs=3, timeout=DEFAULT_TIMEOUT):
+    """Median waktu cold start per halaman: list dict (page, seconds, budget, ok, modules)"""
+    report = []
+    for page in pages or PAGE_BUDGETS:
+        results = [measure_page(page, out_dir, timeout) for _ in range(runs)]
+        seconds = statistics.median(r['seconds'] for r in results)
+        budget = PAGE_BUDGETS.get(page)
+        report.append({
+            'page': page,
+            'seconds': seconds,
+            'budget': budget,
+            'ok': budget is None or seconds <= budget,
+            'modules': results[-1]['modules'],
+        })
+    return report
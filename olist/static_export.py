@@ -0,0 +1,283 @@
+"""Ekspor statis dashboard: setiap halaman dirender sekali menjadi HTML + gambar.
+
+Halaman dijalankan tanpa server lewat `streamlit.testing.v1.AppTest` (sama
+seperti `olist.startup`), jadi kode halaman dan chart yang dipakai persis sama
+dengan dashboard live, dengan filter di nilai default. Elemen hasil run
+(judul, header, teks insight, info, tabel, gambar chart) diterjemahkan ke
+HTML. Widget dilewati, dan peta pydeck diganti catatan karena butuh dashboard
+live.
+
+Gambar dan stylesheet ditulis dengan nama berisi hash isinya
+(`assets/<hash>.png`), sehingga bisa di-cache selamanya oleh CDN. Halaman HTML
+memakai nama tetap. `manifest.json` menyimpan fingerprint input (tabel chart,
+data pendukung, store Parquet yang dibaca QueryEngine, serta dashboard.py dan
+seluruh modul `olist`); selama fingerprint sama, ekspor dilewati.
+"""
+import contextlib
+import hashlib
+import html
+import json
+import os
+import re
+import textwrap
+from pathlib import Path
+
+from .paths import BUILD_DIR, DASHBOARD_DIR, DATA_DIR
+
+DASHBOARD_SCRIPT = DASHBOARD_DIR / 'dashboard.py'
+SITE_DIR = BUILD_DIR / 'site'
+ASSET_DIR_NAME = 'assets'
+MANIFEST_FILE = 'manifest.json'
+# Halaman -> file HTML (halaman pertama menjadi index.html)
+PAGE_FILES = {
+    'Delivery & Rating Analysis': 'index.html',
+    'Repurchase Analysis': 'repurchase-analysis.html',
+    'Geographic Analysis': 'geographic-analysis.html',
+}
+# Input dashboard (relatif terhadap direktori output) yang memengaruhi isi halaman
+DATA_INPUTS = ('charts', 'main_data.csv', 'delivery_review_df.parquet', 'brazil_states.geojson')
+# Dashboard meng-import banyak modul olist (chart, query, geo, ...), jadi seluruh paket ikut di-hash
+CODE_INPUTS = (DASHBOARD_SCRIPT, *sorted(Path(__file__).parent.glob('*.py')))
+DEFAULT_TIMEOUT = 300
+SKIPPED_ELEMENTS = {'selectbox', 'multiselect', 'radio', 'date_input', 'download_button', 'toggle', 'empty'}
+LIST_ITEM = re.compile(r'^(-|\d+\.)\s+')
+MAP_NOTE = "Peta interaktif hanya tersedia di dashboard live."
+
+STYLE = """
+body { font-family: "Source Sans Pro", sans-serif; margin: 0; color: #31333f; }
+nav { background: #f0f2f6; padding: 1rem 2rem; }
+nav a { margin-right: 1.5rem; color: #31333f; text-decoration: none; }
+nav a.active { font-weight: bold; border-bottom: 2px solid #ff4b4b; }
+main { max-width: 1100px; margin: 0 auto; padding: 1rem 2rem 3rem; }
+img { max-width: 100%; }
+.alert { padding: 0.75rem 1rem; border-radius: 0.5rem; margin: 1rem 0; }
+.info { background: #e8f0fe; } .warning { background: #fffae6; }
+.success { background: #e6f4ea; } .error { background: #fdecea; }
+table { border-collapse: collapse; font-size: 0.9rem; margin: 1rem 0; }
+th, td { border: 1px solid #e6e9ef; padding: 0.25rem 0.5rem; text-align: right; }
+details { margin: 1rem 0; }
+.caption { color: #6b6f7b; font-size: 0.9rem; }
+"""
+
+
+def _hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def store_inputs(data_dir=DATA_DIR):
+    """File Parquet di store `data_dir` yang dibaca QueryEngine dashboard"""
+    from . import query, store
+
+    return [store.parquet_path(name, data_dir) for name in query.QUERY_TABLES + query.OPTIONAL_QUERY_TABLES]
+
+
+def input_fingerprint(app_dir, data_dir=DATA_DIR):
+    """Hash isi semua input halaman: data di `app_dir`, store Parquet di `data_dir`, dan kode dashboard/olist"""
+    h = hashlib.sha256()
+    files = []
+    for name in DATA_INPUTS:
+        path = Path(app_dir) / name
+        files += sorted(p for p in path.rglob('*') if p.is_file()) if path.is_dir() else [path]
+    for path in files + store_inputs(data_dir) + [Path(p) for p in CODE_INPUTS]:
+        if path.is_file():
+            h.update(str(path.name).encode('utf-8'))
+            h.update(path.read_bytes())
+    return h.hexdigest()
+
+
+@contextlib.contextmanager
+def _working_dir(path):
+    # Dashboard membaca data relatif terhadap direktori kerja (seperti `streamlit run` dari dashboard/)
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+@contextlib.contextmanager
+def _capture_media():
+    """Rekam bytes setiap file media (st.image) yang disimpan AppTest: {url: (bytes, mimetype)}"""
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+
+    media = {}
+    original = MemoryMediaFileStorage.load_and_get_id
+
+    def load_and_get_id(self, *args, **kwargs):
+        file_id = original(self, *args, **kwargs)
+        url = self.get_url(file_id)
+        stored = self.get_file(url.rsplit('/', 1)[1])
+        media[url] = (stored.content, stored.mimetype)
+        return file_id
+
+    MemoryMediaFileStorage.load_and_get_id = load_and_get_id
+    try:
+        yield media
+    finally:
+        MemoryMediaFileStorage.load_and_get_id = original
+
+
+def run_page(page, script=DASHBOARD_SCRIPT, timeout=DEFAULT_TIMEOUT):
+    """Jalankan satu halaman tanpa server; kembalikan (elemen utama, media)"""
+    from streamlit.testing.v1 import AppTest
+
+    with _capture_media() as media:
+        app = AppTest.from_file(str(script), default_timeout=timeout)
+        app.query_params['page'] = page
+        app.run()
+        # Bagian yang disembunyikan di balik toggle (mis. chart seller) ikut diekspor
+        if app.toggle and not app.exception:
+            for toggle in app.toggle:
+                toggle.set_value(True)
+            app.run()
+    if app.exception:
+        raise RuntimeError(f"Halaman '{page}' error: {app.exception[0].value}")
+    return app.main, media
+
+
+def _inline(text):
+    text = html.escape(text, quote=False)
+    text = re.sub(r'`([^`]+)`', r'<code>\1</code>', text)
+    text = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', text)
+    return re.sub(r'(?<![\w*])[_*](?![\s_*])(.+?)(?<![\s_*])[_*](?![\w*])', r'<em>\1</em>', text)
+
+
+def markdown_html(text):
+    """Subset Markdown yang dipakai dashboard: paragraf, daftar (- / 1.), garis, tebal, miring, kode"""
+    blocks = []
+    for block in re.split(r'\n\s*\n', textwrap.dedent(text).strip()):
+        lines = [line.strip() for line in block.splitlines() if line.strip()]
+        if not lines:
+            continue
+        if lines == ['---']:
+            blocks.append('<hr>')
+        elif all(LIST_ITEM.match(line) for line in lines):
+            tag = 'ul' if lines[0].startswith('-') else 'ol'
+            items = ''.join(f"<li>{_inline(LIST_ITEM.sub('', line))}</li>" for line in lines)
+            blocks.append(f'<{tag}>{items}</{tag}>')
+        else:
+            # Baris daftar setelah baris judul ("**Insight:**" lalu "- ...") tetap jadi daftar
+            head = [line for line in lines if not LIST_ITEM.match(line)]
+            if len(head) < len(lines) and lines[:len(head)] == head:
+                blocks.append(f"<p>{'<br>'.join(_inline(line) for line in head)}</p>")
+                blocks.append(markdown_html('\n'.join(lines[len(head):])))
+            else:
+                blocks.append(f"<p>{'<br>'.join(_inline(line) for line in lines)}</p>")
+    return '\n'.join(blocks)
+
+
+class _AssetWriter:
+    """Tulis bytes ke `assets/<hash><ext>` sekali; kembalikan path relatifnya"""
+
+    EXTENSIONS = {'image/png': '.png', 'image/svg+xml': '.svg', 'image/jpeg': '.jpg', 'text/css': '.css'}
+
+    def __init__(self, site_dir):
+        self.asset_dir = Path(site_dir) / ASSET_DIR_NAME
+        self.asset_dir.mkdir(parents=True, exist_ok=True)
+        self.written = set()
+
+    def write(self, data, mimetype):
+        name = _hash_bytes(data) + self.EXTENSIONS.get(mimetype, '')
+        path = self.asset_dir / name
+        if not path.exists():
+            path.write_bytes(data)
+        self.written.add(name)
+        return f'{ASSET_DIR_NAME}/{name}'
+
+
+def element_html(node, media, assets):
+    """HTML untuk satu elemen atau blok dari pohon elemen AppTest"""
+    kind = node.type
+    if hasattr(node, 'children') and kind != 'image':
+        inner = '\n'.join(element_html(child, media, assets) for child in node.children.values())
+        if kind == 'expander':
+            return f'<details><summary>{html.escape(node.label)}</summary>\n{inner}\n</details>'
+        return inner
+    if kind in SKIPPED_ELEMENTS:
+        return ''
+    if kind == 'title':
+        return f'<h1>{html.escape(node.value)}</h1>'
+    if kind == 'header':
+        return f'<h2>{html.escape(node.value)}</h2>'
+    if kind == 'subheader':
+        return f'<h3>{html.escape(node.value)}</h3>'
+    if kind == 'markdown':
+        return markdown_html(node.value)
+    if kind == 'caption':
+        return f'<p class="caption">{_inline(node.value)}</p>'
+    if kind == 'divider':
+        return '<hr>'
+    if kind in ('info', 'warning', 'success', 'error'):
+        return f'<div class="alert {kind}">{markdown_html(node.value)}</div>'
+    if kind == 'dataframe':
+        return node.value.to_html(index=False, na_rep='', float_format=lambda v: f'{v:,.2f}', border=0)
+    if kind == 'image':
+        images = []
+        for url, caption in zip(node.value, node.captions):
+            data, mimetype = media[url]
+            images.append(f'<figure><img src="{assets.write(data, mimetype)}" alt="{html.escape(caption)}" '
+                          f'loading="lazy">{f"<figcaption>{html.escape(caption)}</figcaption>" if caption else ""}'
+                          f'</figure>')
+        return '\n'.join(images)
+    if kind == 'deck_gl_json_chart':
+        return f'<div class="alert info">{html.escape(MAP_NOTE)}</div>'
+    return ''
+
+
+def page_html(page, body, stylesheet):
+    links = ''.join(f'<a href="{filename}"{" class=active" if name == page else ""}>{html.escape(name)}</a>'
+                    for name, filename in PAGE_FILES.items())
+    return (f'<!DOCTYPE html>\n<html lang="id">\n<head>\n<meta charset="utf-8">\n'
+            f'<meta name="viewport" content="width=device-width, initial-scale=1">\n'
+            f'<title>{html.escape(page)} | E-Commerce Analytics Dashboard</title>\n'
+            f'<link rel="stylesheet" href="{stylesheet}">\n</head>\n<body>\n<nav>{links}</nav>\n'
+            f'<main>\n{body}\n</main>\n</body>\n</html>\n')
+
+
+def read_manifest(site_dir):
+    path = Path(site_dir) / MANIFEST_FILE
+    if not path.exists():
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def export_site(app_dir=DASHBOARD_DIR, site_dir=SITE_DIR, pages=None, force=False, timeout=DEFAULT_TIMEOUT,
+                log=print):
+    """Render halaman dashboard ke `site_dir`; dilewati jika input tidak berubah sejak ekspor terakhir.
+    Kembalikan manifest (dict)."""
+    app_dir, site_dir = Path(app_dir).resolve(), Path(site_dir).resolve()
+    pages = list(pages or PAGE_FILES)
+    fingerprint = input_fingerprint(app_dir)
+    manifest = read_manifest(site_dir)
+    if (not force and manifest and manifest['fingerprint'] == fingerprint and manifest['pages'].keys() == set(pages)
+            and all((site_dir / name).exists() for name in manifest['files'])):
+        log(f"[fresh]   ekspor statis {site_dir}")
+        return manifest
+
+    site_dir.mkdir(parents=True, exist_ok=True)
+    assets = _AssetWriter(site_dir)
+    stylesheet = assets.write(STYLE.encode('utf-8'), 'text/css')
+    written = {}
+    with _working_dir(app_dir):
+        for page in pages:
+            log(f"[export]  {page}")
+            main, media = run_page(page, timeout=timeout)
+            body = '\n'.join(filter(None, (element_html(child, media, assets) for child in main.children.values())))
+            path = site_dir / PAGE_FILES[page]
+            path.write_text(page_html(page, body, stylesheet), encoding='utf-8')
+            written[page] = PAGE_FILES[page]
+
+    # Aset dari ekspor sebelumnya yang tidak dipakai lagi dihapus
+    for path in assets.asset_dir.iterdir():
+        if path.name not in assets.written:
+            path.unlink()
+    manifest = {
+        'fingerprint': fingerprint,
+        'pages': written,
+        'files': sorted(written.values()) + sorted(f'{ASSET_DIR_NAME}/{name}' for name in assets.written),
+    }
+    with open(site_dir / MANIFEST_FILE, 'w') as f:
+        json.dump(manifest, f, indent=1)
+    return manifest
@@ -0,0 +1,171 @@
+"""Statistik grup dari sufficient statistics.
+
+Menggantikan `groupby(...).apply(lambda df: df[x].corr(df[y]))` dan groupby
+mean/std/count terpisah. Per grup hanya disimpan jumlah baris, rata-rata,
+jumlah kuadrat deviasi (m2), dan cross-product deviasi (c) untuk pasangan
+kolom, semuanya dihitung dalam satu groupby vektor. Mean, variansi, kovariansi,
+dan korelasi Pearson diturunkan dari situ, sehingga notebook, pipeline, dan
+dashboard mendapat angka yang sama.
+
+Statistik seluruh data diturunkan dari statistik per grup dengan rumus paralel
+Chan dkk. (deviasi terpusat, bukan jumlah kuadrat mentah, agar tetap presisi),
+tanpa membaca ulang baris (`total`).
+"""
+import numpy as np
+import pandas as pd
+
+TOTAL_KEY = 'total'
+
+
+def _key_list(by):
+    if by is None:
+        return []
+    return [by] if isinstance(by, str) else list(by)
+
+
+def _group_keys(data, by):
+    """Kunci groupby; tanpa `by` semua baris masuk satu grup TOTAL_KEY"""
+    if not by:
+        return [np.full(len(data), TOTAL_KEY, dtype=object)]
+    return [data[col] for col in by]
+
+
+def _block(frame, by, variables):
+    """Momen per grup untuk baris yang semua `variables`-nya tidak kosong"""
+    variables = list(variables)
+    data = frame.loc[frame[variables].notna().all(axis=1), list(dict.fromkeys(by + variables))]
+    # Salinan kunci: pandas mengecualikan kolom yang juga menjadi kunci groupby dari agregasi
+    keys = [key.copy() for key in _group_keys(data, by)]
+    grouped = data[variables].groupby(keys, observed=True, sort=True)
+    dev = data[variables].astype('float64') - grouped.transform('mean')
+
+    products = {}
+    for var in variables:
+        products[f'm2:{var}'] = dev[var] * dev[var]
+    if len(variables) == 2:
+        products['c'] = dev[variables[0]] * dev[variables[1]]
+    sums = pd.DataFrame(products, index=data.index).groupby(keys, observed=True, sort=True).sum()
+
+    block = pd.DataFrame({'n': grouped.size()})
+    means = grouped.mean()
+    for var in variables:
+        block[f'mean:{var}'] = means[var].astype('float64')
+        block[f'm2:{var}'] = sums[f'm2:{var}']
+    if len(variables) == 2:
+        block['c'] = sums['c']
+    return block
+
+
+def _reduce(block, variables):
+    """Gabungkan semua grup dalam satu blok menjadi satu baris TOTAL_KEY"""
+    n = block['n']
+    total_n = n.sum()
+    row = {'n': total_n}
+    centered = []
+    for var in variables:
+        mean = block[f'mean:{var}']
+        total_mean = (n * mean).sum() / total_n if total_n else 0.0
+        centered.append(mean - total_mean)
+        row[f'mean:{var}'] = total_mean
+        row[f'm2:{var}'] = block[f'm2:{var}'].sum() + (n * centered[-1] ** 2).sum()
+    if len(variables) == 2:
+        row['c'] = block['c'].sum() + (n * centered[0] * centered[1]).sum()
+    return pd.DataFrame([row], index=pd.Index([TOTAL_KEY]))
+
+
+class GroupStats:
+    """Sufficient statistics per grup untuk sejumlah kolom dan pasangan kolom.
+
+    `size` adalah jumlah baris per grup (termasuk nilai kosong); setiap blok
+    momen hanya memakai baris yang nilainya lengkap, sama seperti pandas
+    `mean`/`corr` yang mengabaikan NaN secara berpasangan.
+    """
+
+    def __init__(self, by, size, blocks):
+        self.by = by
+        self.size = size
+        self.blocks = blocks
+
+    @classmethod
+    def from_frame(cls, frame, by=None, columns=(), pairs=()):
+        """Hitung statistik `columns` dan korelasi `pairs` per grup `by` dalam satu lintasan"""
+        by = _key_list(by)
+        size = frame.groupby(_group_keys(frame, by), observed=True, sort=True).size()
+        blocks = {(col,): _block(frame, by, (col,)) for col in columns}
+        for x, y in pairs:
+            blocks[(x, y)] = _block(frame, by, (x, y))
+        return cls(by, size, blocks)
+
+    def total(self):
+        """Statistik seluruh data (satu grup TOTAL_KEY) tanpa membaca ulang baris"""
+        size = pd.Series([self.size.sum()], index=pd.Index([TOTAL_KEY]))
+        blocks = {key: _reduce(block, key) for key, block in self.blocks.items()}
+        return GroupStats([], size, blocks)
+
+    def _get(self, variables, stat):
+        block = self.blocks.get(tuple(variables))
+        if block is None and len(variables) == 2:
+            block = self.blocks.get(tuple(reversed(variables)))
+        if block is None:
+            raise KeyError(f"Statistik untuk {', '.join(variables)} tidak dihitung")
+        return block[stat].reindex(self.size.index).rename(None)
+
+    def count(self, col):
+        return self._get((col,), 'n').fillna(0).astype('int64').rename(col)
+
+    def mean(self, col):
+        return self._get((col,), f'mean:{col}').where(self.count(col) > 0).rename(col)
+
+    def var(self, col, ddof=1):
+        n = self.count(col)
+        return (self._get((col,), f'm2:{col}') / (n - ddof)).where(n > ddof).rename(col)
+
+    def std(self, col, ddof=1):
+        return np.sqrt(self.var(col, ddof))
+
+    def cov(self, x, y, ddof=1):
+        n = self._get((x, y), 'n').fillna(0)
+        return (self._get((x, y), 'c') / (n - ddof)).where(n > ddof)
+
+    def corr(self, x, y):
+        """Korelasi Pearson per grup; NaN jika salah satu kolom konstan atau n < 2"""
+        c = self._get((x, y), 'c')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            result = c / np.sqrt(self._get((x, y), f'm2:{x}') * self._get((x, y), f'm2:{y}'))
+        return result.replace([np.inf, -np.inf], np.nan)
+
+    def regression(self, x, y):
+        """Regresi linear OLS `y ~ x` per grup dalam bentuk tertutup.
+
+        Mengembalikan DataFrame (n, x_mean, sxx, slope, intercept, residual_std),
+        cukup untuk menggambar garis dan pita kepercayaannya (`confidence_band`)
+        tanpa bootstrap.
+        """
+        n = self._get((x, y), 'n').fillna(0).astype('int64')
+        sxx = self._get((x, y), f'm2:{x}')
+        syy = self._get((x, y), f'm2:{y}')
+        c = self._get((x, y), 'c')
+        x_mean = self._get((x, y), f'mean:{x}')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slope = (c / sxx).where(sxx > 0)
+            residual_var = ((syy - slope * c) / (n - 2)).where(n > 2).clip(lower=0)
+        return pd.DataFrame({
+            'n': n,
+            'x_mean': x_mean,
+            'sxx': sxx,
+            'slope': slope,
+            'intercept': self._get((x, y), f'mean:{y}') - slope * x_mean,
+            'residual_std': np.sqrt(residual_var),
+        })
+
+
+def confidence_band(fit, x, z=1.96):
+    """(prediksi, batas bawah, batas atas) garis regresi `fit` di titik `x`.
+
+    `fit` adalah satu baris hasil `GroupStats.regression`. Pita adalah interval
+    kepercayaan rata-rata prediksi; dengan n besar distribusi t didekati normal.
+    """
+    x = np.asarray(x, dtype='float64')
+    predicted = fit['intercept'] + fit['slope'] * x
+    se = fit['residual_std'] * np.sqrt(1 / fit['n'] + (x - fit['x_mean']) ** 2 / fit['sxx'])
+    return predicted, predicted - z * se, predicted + z * se
@@ -0,0 +1,185 @@
+"""Penyimpanan kolumnar (Parquet) bertipe eksplisit untuk tabel mentah Olist.
+
+CSV dikonversi sekali ke `<data_dir>/parquet/<tabel>.parquet` dengan skema
+tetap: kolom tanggal sebagai datetime64, `review_score` int8, dan kolom
+berkardinalitas rendah sebagai categorical. Pembaca cukup meminta kolom yang
+dibutuhkan (`columns=`) sehingga kolom lain tidak pernah dibaca dari disk.
+"""
+from pathlib import Path
+
+import pandas as pd
+
+from .paths import DATA_DIR, TABLES
+
+SCHEMA_VERSION = '1'
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+SCHEMAS = {
+    'customers': {
+        'customer_id': 'str',
+        'customer_unique_id': 'str',
+        'customer_zip_code_prefix': 'int32',
+        'customer_city': 'category',
+        'customer_state': 'category',
+    },
+    'geolocation': {
+        'geolocation_zip_code_prefix': 'int32',
+        'geolocation_lat': 'float64',
+        'geolocation_lng': 'float64',
+        'geolocation_city': 'category',
+        'geolocation_state': 'category',
+    },
+    'order_items': {
+        'order_id': 'str',
+        'order_item_id': 'int8',
+        'product_id': 'str',
+        'seller_id': 'str',
+        'shipping_limit_date': 'datetime64[ns]',
+        'price': 'float64',
+        'freight_value': 'float64',
+    },
+    'order_payments': {
+        'order_id': 'str',
+        'payment_sequential': 'int8',
+        'payment_type': 'category',
+        'payment_installments': 'int8',
+        'payment_value': 'float64',
+    },
+    'order_reviews': {
+        'review_id': 'str',
+        'order_id': 'str',
+        'review_score': 'int8',
+        'review_comment_title': 'str',
+        'review_comment_message': 'str',
+        'review_creation_date': 'datetime64[ns]',
+        'review_answer_timestamp': 'datetime64[ns]',
+    },
+    'orders': {
+        'order_id': 'str',
+        'customer_id': 'str',
+        'order_status': 'category',
+        'order_purchase_timestamp': 'datetime64[ns]',
+        'order_approved_at': 'datetime64[ns]',
+        'order_delivered_carrier_date': 'datetime64[ns]',
+        'order_delivered_customer_date': 'datetime64[ns]',
+        'order_estimated_delivery_date': 'datetime64[ns]',
+    },
+    'category_translation': {
+        'product_category_name': 'str',
+        'product_category_name_english': 'str',
+    },
+    'products': {
+        'product_id': 'str',
+        'product_category_name': 'category',
+        'product_name_lenght': 'float32',
+        'product_description_lenght': 'float32',
+        'product_photos_qty': 'float32',
+        'product_weight_g': 'float32',
+        'product_length_cm': 'float32',
+        'product_height_cm': 'float32',
+        'product_width_cm': 'float32',
+    },
+    'sellers': {
+        'seller_id': 'str',
+        'seller_zip_code_prefix': 'int32',
+        'seller_city': 'category',
+        'seller_state': 'category',
+    },
+}
+
+
+def datetime_columns(name):
+    return [col for col, dtype in SCHEMAS[name].items() if dtype.startswith('datetime64')]
+
+
+def apply_schema(df, name):
+    """Ubah tipe kolom `df` sesuai skema tabel `name` (kolom yang tidak ada dilewati)"""
+    schema = SCHEMAS[name]
+    converted = {}
+    for col in df.columns:
+        dtype = schema.get(col)
+        if dtype is None:
+            continue
+        if dtype.startswith('datetime64'):
+            values = df[col]
+            if not pd.api.types.is_datetime64_any_dtype(values):
+                values = pd.to_datetime(values, format=DATETIME_FORMAT, errors='coerce')
+            converted[col] = values.astype(dtype)
+        elif dtype != 'str':
+            converted[col] = df[col].astype(dtype)
+    return df.assign(**converted) if converted else df
+
+
+def read_csv(name, columns=None, data_dir=DATA_DIR):
+    """Baca CSV mentah langsung dengan skema eksplisit (tanpa inferensi tipe)"""
+    schema = SCHEMAS[name]
+    usecols = list(columns) if columns is not None else None
+    dtypes = {col: ('str' if dtype.startswith('datetime64') else dtype) for col, dtype in schema.items()}
+    df = pd.read_csv(Path(data_dir) / TABLES[name], usecols=usecols, dtype=dtypes, encoding='utf-8-sig')
+    return apply_schema(df, name)
+
+
+def parquet_path(name, data_dir=DATA_DIR):
+    return Path(data_dir) / 'parquet' / f'{name}.parquet'
+
+
+def is_converted(name, data_dir=DATA_DIR):
+    """True jika file Parquet ada, skemanya versi terkini, dan tidak lebih tua dari CSV-nya"""
+    import pyarrow.parquet as pq
+
+    path = parquet_path(name, data_dir)
+    if not path.exists():
+        return False
+    csv_path = Path(data_dir) / TABLES[name]
+    if csv_path.exists() and csv_path.stat().st_mtime_ns > path.stat().st_mtime_ns:
+        return False
+    metadata = pq.read_schema(path).metadata or {}
+    return metadata.get(b'olist_schema_version') == SCHEMA_VERSION.encode()
+
+
+def convert_table(name, data_dir=DATA_DIR):
+    """Konversi satu CSV ke Parquet bertipe, kembalikan path Parquet"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    df = read_csv(name, data_dir=data_dir)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[b'olist_schema_version'] = SCHEMA_VERSION.encode()
+    table = table.replace_schema_metadata(metadata)
+
+    path = parquet_path(name, data_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix('.tmp')
+    pq.write_table(table, tmp_path, compression='zstd')
+    tmp_path.replace(path)
+    return path
+
+
+def convert_all(data_dir=DATA_DIR, force=False, log=print, names=None):
+    """Konversi semua tabel (atau hanya `names`) yang CSV-nya tersedia dan belum/basi dikonversi"""
+    converted = []
+    for name, filename in TABLES.items():
+        if names is not None and name not in names:
+            continue
+        if not (Path(data_dir) / filename).exists():
+            log(f"[skip]    {name} ({filename} tidak ada)")
+            continue
+        if not force and is_converted(name, data_dir):
+            log(f"[fresh]   {name}")
+            continue
+        log(f"[convert] {name}")
+        converted.append(convert_table(name, data_dir))
+    return converted
+
+
+def load_table(name, columns=None, data_dir=DATA_DIR):
+    """Baca tabel bertipe; hanya kolom `columns` yang dibaca dari disk.
+
+    Memakai Parquet jika sudah dikonversi dan masih segar, selain itu membaca
+    CSV dengan skema yang sama.
+    """
+    if is_converted(name, data_dir):
+        df = pd.read_parquet(parquet_path(name, data_dir), columns=list(columns) if columns is not None else None)
+        return apply_schema(df, name)
+    return read_csv(name, columns=columns, data_dir=data_dir)
@@ -0,0 +1,382 @@
+"""Generator data Olist sintetis yang konsisten secara referensial.
+
+Menulis kesembilan CSV yang dibaca notebook dan pipeline dengan kolom dan
+format yang sama dengan dataset asli. Skala 1x kira-kira seukuran dataset
+asli (99.441 order); tabel order, pelanggan, item, pembayaran, review, produk,
+dan penjual membesar linear terhadap skala, sedangkan geolokasi tetap karena
+jumlah zip code prefix tidak bertambah.
+
+Kemiripan dengan data asli yang dijaga:
+- sekitar 3% pelanggan (`customer_unique_id`) membeli lebih dari sekali
+- distribusi state pelanggan dan penjual, zip prefix sesuai rentang CEP state
+- lama pengiriman bergantung jarak state dari SP, sekitar 8% order terlambat
+- campuran review_score berbeda untuk order tepat waktu, terlambat, dan yang
+  tidak terkirim; sebagian kecil order tanpa review atau dengan dua review
+- popularitas produk dan penjual yang miring (Zipf), jumlah item per order
+
+Semua nilai ditentukan oleh `seed`, dan order dibangkitkan per potongan
+sehingga skala 100x tidak perlu muat di memori sekaligus.
+"""
+import json
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from . import store
+from .paths import DATA_DIR, TABLES
+
+SYNTH_VERSION = '1'
+MANIFEST_NAME = 'synth.json'
+BASE_ORDERS = 99_441
+BASE_PRODUCTS = 32_951
+BASE_SELLERS = 3_095
+CHUNK_ORDERS = 200_000
+START = pd.Timestamp('2016-09-04')
+END = pd.Timestamp('2018-10-17')
+
+# state: (% pelanggan, % penjual, lat, lng, rentang zip prefix)
+STATES = {
+    'SP': (41.9, 59.7, -22.2, -48.8, [(1000, 19999)]),
+    'RJ': (12.9, 5.5, -22.3, -42.7, [(20000, 28999)]),
+    'MG': (11.7, 7.9, -18.5, -44.6, [(30000, 39999)]),
+    'RS': (5.5, 4.0, -29.7, -53.2, [(90000, 99999)]),
+    'PR': (5.1, 11.3, -24.6, -51.6, [(80000, 87999)]),
+    'SC': (3.7, 6.1, -27.3, -50.5, [(88000, 89999)]),
+    'BA': (3.4, 0.6, -12.6, -41.7, [(40000, 48999)]),
+    'DF': (2.2, 0.9, -15.8, -47.9, [(70000, 72799), (73000, 73699)]),
+    'GO': (2.0, 1.3, -16.0, -49.6, [(72800, 72999), (73700, 76799)]),
+    'ES': (2.0, 0.8, -19.6, -40.7, [(29000, 29999)]),
+    'PE': (1.7, 0.3, -8.4, -37.9, [(50000, 56999)]),
+    'CE': (1.3, 0.4, -5.1, -39.5, [(60000, 63999)]),
+    'PA': (1.0, 0.03, -3.8, -52.5, [(66000, 68899)]),
+    'MT': (0.9, 0.1, -12.9, -55.9, [(78000, 78899)]),
+    'MA': (0.8, 0.03, -5.1, -45.3, [(65000, 65999)]),
+    'MS': (0.7, 0.16, -20.5, -54.8, [(79000, 79999)]),
+    'PB': (0.5, 0.2, -7.1, -36.8, [(58000, 58999)]),
+    'RN': (0.5, 0.16, -5.8, -36.6, [(59000, 59999)]),
+    'PI': (0.5, 0.03, -7.7, -42.9, [(64000, 64999)]),
+    'AL': (0.4, 0.01, -9.6, -36.6, [(57000, 57999)]),
+    'SE': (0.35, 0.06, -10.6, -37.4, [(49000, 49999)]),
+    'TO': (0.28, 0.01, -10.2, -48.3, [(77000, 77999)]),
+    'RO': (0.25, 0.06, -10.9, -62.8, [(76800, 76999)]),
+    'AM': (0.15, 0.03, -3.4, -64.7, [(69000, 69299), (69400, 69899)]),
+    'AC': (0.08, 0.03, -9.0, -70.5, [(69900, 69999)]),
+    'AP': (0.07, 0.01, 1.4, -51.8, [(68900, 68999)]),
+    'RR': (0.05, 0.03, 2.1, -61.4, [(69300, 69399)]),
+}
+ZIP_POOL = 19_000
+GEO_ROWS_PER_ZIP = 52
+MISSING_GEO_FRACTION = 0.003
+# Rata-rata order per customer_unique_id (dataset asli: 99.441 / 96.096)
+ORDERS_PER_CUSTOMER = 1.035
+ORDER_STATUS = {'delivered': 0.970, 'shipped': 0.011, 'canceled': 0.006, 'unavailable': 0.006,
+                'invoiced': 0.003, 'processing': 0.003, 'approved': 0.001}
+# Lama pengiriman rata-rata = BASE + PER_DEGREE x jarak (derajat) dari SP
+DELIVERY_BASE_DAYS = 7.0
+DELIVERY_PER_DEGREE = 0.7
+DELIVERY_SHAPE = 2.2
+ESTIMATE_MARGIN_DAYS = 12.0
+ESTIMATE_NOISE_DAYS = 5.0
+# Peluang review_score 1..5
+SCORE_P = {
+    'on_time': [0.06, 0.025, 0.08, 0.205, 0.63],
+    'late': [0.46, 0.09, 0.12, 0.13, 0.20],
+    'undelivered': [0.75, 0.07, 0.07, 0.04, 0.07],
+}
+MISSING_REVIEW_FRACTION = 0.008
+DOUBLE_REVIEW_FRACTION = 0.005
+ITEMS_GEOMETRIC_P = 0.88
+MAX_ITEMS = 21
+MISSING_CATEGORY_FRACTION = 0.0185
+PAYMENT_TYPES = {'credit_card': 0.74, 'boleto': 0.19, 'voucher': 0.055, 'debit_card': 0.015}
+SPLIT_PAYMENT_FRACTION = 0.03
+ZIPF_EXPONENT = 1.05
+
+_MASK64 = np.uint64(0xFFFFFFFFFFFFFFFF)
+# Salt per jenis id agar order, pelanggan, produk, dst. tidak berbagi id
+_ID_SALT = {'order': 1, 'customer': 2, 'unique': 3, 'product': 4, 'seller': 5, 'review': 6}
+
+
+def _splitmix64(x):
+    x = (x + np.uint64(0x9E3779B97F4A7C15)) & _MASK64
+    x = ((x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)) & _MASK64
+    x = ((x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)) & _MASK64
+    return x ^ (x >> np.uint64(31))
+
+
+def hex_ids(keys, kind, seed=0):
+    """Id heksadesimal 32 karakter (seperti dataset asli) yang unik per kunci integer.
+    Deterministik, jadi id sebuah order bisa dihitung ulang tanpa menyimpannya"""
+    keys = np.asarray(keys, dtype='uint64')
+    salt = np.uint64(seed * 16 + _ID_SALT[kind])
+    high = _splitmix64(keys ^ (salt << np.uint64(40)))
+    low = _splitmix64(high ^ salt)
+    raw = np.stack([high, low], axis=1).astype('>u8').tobytes().hex().encode('ascii')
+    return np.frombuffer(raw, dtype='S32').astype(str)
+
+
+def _zipf_p(n, rng):
+    """Bobot popularitas Zipf untuk n item dengan urutan peringkat acak"""
+    p = 1.0 / np.arange(1, n + 1) ** ZIPF_EXPONENT
+    return rng.permutation(p / p.sum())
+
+
+def _choice_from_p(rng, p_table, rows):
+    """Sampel indeks 0..k-1 per baris dengan peluang `p_table[rows[i]]` (vektor)"""
+    cumulative = np.cumsum(p_table, axis=1)
+    u = rng.random(len(rows))[:, None]
+    return np.minimum((u >= cumulative[rows]).sum(axis=1), p_table.shape[1] - 1)
+
+
+def _int(values):
+    """Bilangan bulat nullable agar CSV tidak berisi '12.0'"""
+    return pd.array(values, dtype='float64').astype('Int64')
+
+
+def _city(states, zips):
+    return np.char.add(np.char.add('cidade ', np.char.mod('%03d', zips // 100)),
+                       np.char.add(' ', np.char.lower(states.astype(str))))
+
+
+class _Universe:
+    """Bagian data yang dipakai semua potongan order: state, zip, produk, penjual"""
+
+    def __init__(self, scale, seed):
+        rng = np.random.default_rng([seed, 0])
+        self.states = np.array(list(STATES))
+        info = list(STATES.values())
+        customer_share = np.array([s[0] for s in info])
+        self.customer_p = customer_share / customer_share.sum()
+        seller_share = np.array([s[1] for s in info])
+        self.seller_p = seller_share / seller_share.sum()
+        self.lat = np.array([s[2] for s in info])
+        self.lng = np.array([s[3] for s in info])
+        distance = np.hypot(self.lat - STATES['SP'][2], self.lng - STATES['SP'][3])
+        self.delivery_days = DELIVERY_BASE_DAYS + DELIVERY_PER_DEGREE * distance
+
+        # Kumpulan zip prefix per state dari rentang CEP-nya
+        self.zip_pools = []
+        for share, (_, _, _, _, ranges) in zip(self.customer_p, info):
+            candidates = np.concatenate([np.arange(lo, hi + 1) for lo, hi in ranges])
+            size = min(len(candidates), max(10, int(round(ZIP_POOL * share))))
+            self.zip_pools.append(np.sort(rng.choice(candidates, size, replace=False)))
+
+        # Penjual dan produk (milik satu penjual, popularitas Zipf)
+        self.n_sellers = max(1, int(round(BASE_SELLERS * scale)))
+        self.seller_state = rng.choice(len(self.states), self.n_sellers, p=self.seller_p)
+        self.seller_zip = self.pick_zips(rng, self.seller_state)
+        self.n_products = max(1, int(round(BASE_PRODUCTS * scale)))
+        self.product_seller = rng.choice(self.n_sellers, self.n_products, p=_zipf_p(self.n_sellers, rng))
+        self.product_price = np.round(rng.lognormal(4.2, 0.95, self.n_products), 2)
+        self.product_p = _zipf_p(self.n_products, rng)
+
+    def pick_zips(self, rng, state_idx):
+        zips = np.empty(len(state_idx), dtype='int32')
+        for s, pool in enumerate(self.zip_pools):
+            rows = np.flatnonzero(state_idx == s)
+            zips[rows] = pool[rng.integers(0, len(pool), len(rows))]
+        return zips
+
+
+def _write(df, name, out_dir, append=False):
+    df[list(store.SCHEMAS[name])].to_csv(out_dir / TABLES[name], mode='a' if append else 'w', header=not append,
+                                         index=False, date_format=store.DATETIME_FORMAT)
+    return len(df)
+
+
+def _sellers(u, seed):
+    return pd.DataFrame({
+        'seller_id': hex_ids(np.arange(u.n_sellers), 'seller', seed),
+        'seller_zip_code_prefix': u.seller_zip,
+        'seller_city': _city(u.states[u.seller_state], u.seller_zip),
+        'seller_state': u.states[u.seller_state],
+    })
+
+
+def _products(u, seed, categories):
+    rng = np.random.default_rng([seed, 1])
+    n = u.n_products
+    category = np.asarray(categories, dtype=object)[rng.choice(len(categories), n, p=_zipf_p(len(categories), rng))]
+    missing = rng.random(n) < MISSING_CATEGORY_FRACTION
+    category[missing] = np.nan
+    described = np.where(missing, np.nan, 1.0)
+    return pd.DataFrame({
+        'product_id': hex_ids(np.arange(n), 'product', seed),
+        'product_category_name': category,
+        'product_name_lenght': _int(np.clip(np.round(rng.normal(48, 10, n)), 5, 76) * described),
+        'product_description_lenght': _int(np.clip(np.round(rng.lognormal(6.4, 0.7, n)), 4, 3992) * described),
+        'product_photos_qty': _int(np.minimum(rng.geometric(0.5, n), 20) * described),
+        'product_weight_g': _int(np.round(rng.lognormal(6.8, 1.2, n))),
+        'product_length_cm': _int(np.clip(np.round(rng.lognormal(3.3, 0.45, n)), 7, 105)),
+        'product_height_cm': _int(np.clip(np.round(rng.lognormal(2.6, 0.7, n)), 2, 105)),
+        'product_width_cm': _int(np.clip(np.round(rng.lognormal(3.0, 0.45, n)), 6, 118)),
+    })
+
+
+def _geolocation(u, seed):
+    rng = np.random.default_rng([seed, 2])
+    frames = []
+    for s, pool in enumerate(u.zip_pools):
+        zips = pool[rng.random(len(pool)) >= MISSING_GEO_FRACTION]
+        rows = 1 + rng.poisson(GEO_ROWS_PER_ZIP - 1, len(zips))
+        center_lat = u.lat[s] + rng.normal(0, 1.5, len(zips))
+        center_lng = u.lng[s] + rng.normal(0, 1.5, len(zips))
+        zip_rows = np.repeat(zips, rows)
+        states = np.full(len(zip_rows), u.states[s])
+        frames.append(pd.DataFrame({
+            'geolocation_zip_code_prefix': zip_rows,
+            'geolocation_lat': np.repeat(center_lat, rows) + rng.normal(0, 0.02, len(zip_rows)),
+            'geolocation_lng': np.repeat(center_lng, rows) + rng.normal(0, 0.02, len(zip_rows)),
+            'geolocation_city': _city(states, zip_rows),
+            'geolocation_state': states,
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def _customer_assignment(n_orders, seed, u):
+    """customer_unique_id per order (sebagian pelanggan membeli ulang) beserta state dan zip-nya"""
+    rng = np.random.default_rng([seed, 3])
+    counts = rng.geometric(1 / ORDERS_PER_CUSTOMER, int(n_orders / ORDERS_PER_CUSTOMER * 1.05) + 10)
+    cumulative = np.cumsum(counts)
+    last = int(np.searchsorted(cumulative, n_orders))
+    counts = counts[:last + 1]
+    counts[-1] -= cumulative[last] - n_orders
+    unique_of_order = rng.permutation(np.repeat(np.arange(len(counts)), counts))
+    unique_state = rng.choice(len(u.states), len(counts), p=u.customer_p).astype('int8')
+    return unique_of_order, unique_state, u.pick_zips(rng, unique_state)
+
+
+def _order_chunk(lo, hi, seed, u, customers):
+    """Tabel orders, customers, order_items, order_payments, dan order_reviews untuk order lo..hi-1"""
+    rng = np.random.default_rng([seed, 4, lo])
+    n = hi - lo
+    keys = np.arange(lo, hi)
+    unique_of_order, unique_state, unique_zip = customers
+    unique = unique_of_order[lo:hi]
+    state = unique_state[unique]
+    order_id = hex_ids(keys, 'order', seed)
+    customer_id = hex_ids(keys, 'customer', seed)
+
+    # Volume order tumbuh seiring waktu (kepadatan naik linear)
+    span = (END - START).total_seconds()
+    purchase = START + pd.to_timedelta(np.floor(span * np.sqrt(rng.random(n))), unit='s')
+    status = np.array(list(ORDER_STATUS))[rng.choice(len(ORDER_STATUS), n, p=list(ORDER_STATUS.values()))]
+    delivered = status == 'delivered'
+    approved = purchase + pd.to_timedelta(np.round(rng.exponential(10 * 3600, n)), unit='s')
+    carrier = approved + pd.to_timedelta(np.round(rng.exponential(2.5 * 86400, n)), unit='s')
+    mean_days = u.delivery_days[state]
+    delivery = purchase + pd.to_timedelta(np.round(rng.gamma(DELIVERY_SHAPE, mean_days / DELIVERY_SHAPE) * 86400), unit='s')
+    estimate_days = np.maximum(np.round(mean_days + ESTIMATE_MARGIN_DAYS + rng.normal(0, ESTIMATE_NOISE_DAYS, n)), 2)
+    estimated = (purchase + pd.to_timedelta(estimate_days, unit='D')).floor('D')
+    delivery = delivery.where(delivered)
+    carrier = carrier.where(delivered | (status == 'shipped'))
+    approved = approved.where(~np.isin(status, ['canceled', 'processing']) | (rng.random(n) < 0.5))
+    orders = pd.DataFrame({
+        'order_id': order_id, 'customer_id': customer_id, 'order_status': status,
+        'order_purchase_timestamp': purchase, 'order_approved_at': approved,
+        'order_delivered_carrier_date': carrier, 'order_delivered_customer_date': delivery,
+        'order_estimated_delivery_date': estimated,
+    })
+    customers_df = pd.DataFrame({
+        'customer_id': customer_id,
+        'customer_unique_id': hex_ids(unique, 'unique', seed),
+        'customer_zip_code_prefix': unique_zip[unique],
+        'customer_city': _city(u.states[state], unique_zip[unique]),
+        'customer_state': u.states[state],
+    })
+
+    # Review: skor bergantung ketepatan pengiriman; sebagian tanpa review, sebagian dua review
+    late = np.asarray(delivery > estimated)
+    kind = np.where(~delivered, 2, np.where(late, 1, 0))
+    p_table = np.array([SCORE_P['on_time'], SCORE_P['late'], SCORE_P['undelivered']])
+    reviewed = np.flatnonzero(rng.random(n) >= MISSING_REVIEW_FRACTION)
+    doubled = reviewed[rng.random(len(reviewed)) < DOUBLE_REVIEW_FRACTION]
+    review_rows = np.sort(np.concatenate([reviewed, doubled]))
+    sent = pd.Series(delivery).fillna(pd.Series(estimated)).to_numpy()[review_rows]
+    creation = (pd.DatetimeIndex(sent) + pd.Timedelta(days=1)).floor('D')
+    answer = creation + pd.to_timedelta(np.round(rng.exponential(2.5 * 86400, len(review_rows))), unit='s')
+    reviews = pd.DataFrame({
+        'review_id': hex_ids(np.arange(len(review_rows)) + 2 * lo, 'review', seed),
+        'order_id': order_id[review_rows],
+        'review_score': _choice_from_p(rng, p_table, kind[review_rows]) + 1,
+        'review_comment_title': np.nan,
+        'review_comment_message': np.nan,
+        'review_creation_date': creation,
+        'review_answer_timestamp': answer,
+    })
+
+    # Item: jumlah per order geometrik, produk dipilih menurut popularitas Zipf
+    counts = np.minimum(rng.geometric(ITEMS_GEOMETRIC_P, n), MAX_ITEMS)
+    item_order = np.repeat(np.arange(n), counts)
+    product = rng.choice(u.n_products, len(item_order), p=u.product_p)
+    distance_factor = (u.delivery_days[state] / DELIVERY_BASE_DAYS)[item_order]
+    items = pd.DataFrame({
+        'order_id': order_id[item_order],
+        'order_item_id': np.arange(len(item_order)) - np.repeat(np.cumsum(counts) - counts, counts) + 1,
+        'product_id': hex_ids(product, 'product', seed),
+        'seller_id': hex_ids(u.product_seller[product], 'seller', seed),
+        'shipping_limit_date': (purchase + pd.Timedelta(days=6))[item_order],
+        'price': u.product_price[product],
+        'freight_value': np.round(rng.lognormal(2.6, 0.5, len(item_order)) * distance_factor, 2),
+    })
+
+    # Pembayaran: total order, sebagian dibagi voucher + metode lain
+    total = np.bincount(item_order, weights=items['price'] + items['freight_value'], minlength=n)
+    pay_type = np.array(list(PAYMENT_TYPES))[rng.choice(len(PAYMENT_TYPES), n, p=list(PAYMENT_TYPES.values()))]
+    installments = np.where(pay_type == 'credit_card', np.minimum(rng.geometric(0.35, n), 10), 1)
+    split = np.flatnonzero((rng.random(n) < SPLIT_PAYMENT_FRACTION) & (pay_type != 'voucher'))
+    voucher_part = np.round(total[split] * rng.uniform(0.1, 0.9, len(split)), 2)
+    value = np.round(total, 2)
+    value[split] -= voucher_part
+    payments = pd.DataFrame({
+        'order_id': np.concatenate([order_id, order_id[split]]),
+        'payment_sequential': np.concatenate([np.ones(n, dtype=int), np.full(len(split), 2)]),
+        'payment_type': np.concatenate([pay_type, np.full(len(split), 'voucher')]),
+        'payment_installments': np.concatenate([installments, np.ones(len(split), dtype=int)]),
+        'payment_value': np.concatenate([value, voucher_part]),
+    })
+    return {'orders': orders, 'customers': customers_df, 'order_reviews': reviews,
+            'order_items': items, 'order_payments': payments}
+
+
+def read_manifest(out_dir):
+    path = Path(out_dir) / MANIFEST_NAME
+    if not path.exists():
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def generate(out_dir, scale=1.0, seed=0, translation=None, log=print):
+    """Tulis kesembilan CSV sintetis ke `out_dir`, kembalikan manifest (skala, seed, jumlah baris).
+
+    Tabel terjemahan kategori disalin dari `translation` (default:
+    data/product_category_name_translation.csv) dan menjadi daftar kategori produk.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    translation = Path(translation) if translation else DATA_DIR / TABLES['category_translation']
+    shutil.copy(translation, out_dir / TABLES['category_translation'])
+    categories = store.read_csv('category_translation', data_dir=out_dir)['product_category_name'].tolist()
+
+    u = _Universe(scale, seed)
+    n_orders = max(1, int(round(BASE_ORDERS * scale)))
+    rows = {'category_translation': len(categories)}
+    log(f"[synth]   sellers, products, geolocation")
+    rows['sellers'] = _write(_sellers(u, seed), 'sellers', out_dir)
+    rows['products'] = _write(_products(u, seed, categories), 'products', out_dir)
+    rows['geolocation'] = _write(_geolocation(u, seed), 'geolocation', out_dir)
+
+    customers = _customer_assignment(n_orders, seed, u)
+    for lo in range(0, n_orders, CHUNK_ORDERS):
+        hi = min(lo + CHUNK_ORDERS, n_orders)
+        log(f"[synth]   order {lo:,}-{hi:,} dari {n_orders:,}")
+        for name, df in _order_chunk(lo, hi, seed, u, customers).items():
+            rows[name] = rows.get(name, 0) + _write(df, name, out_dir, append=lo > 0)
+
+    manifest = {'version': SYNTH_VERSION, 'scale': scale, 'seed': seed, 'rows': rows}
+    with open(out_dir / MANIFEST_NAME, 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    return manifest
@@ -0,0 +1,133 @@
+"""Interval kepercayaan untuk rasio dan rata-rata rating di tabel chart.
+
+Bootstrap tidak pernah menyentuh baris mentah, cukup jumlah per grup:
+
+- rasio (repurchase, review negatif): resample bootstrap n nilai 0/1 dengan
+  proporsi p sama dengan tarikan Binomial(n, p), jadi semua resample satu
+  grup adalah satu `rng.binomial` berukuran (resample,);
+- rata-rata rating: resample bootstrap review satu grup sama dengan tarikan
+  Multinomial(n, jumlah per skor / n), jadi semua resample satu grup adalah
+  satu `rng.multinomial` berukuran (resample, skor) yang langsung direduksi
+  menjadi rata-rata.
+
+Generator setiap grup di-seed dari seed tetap dan jumlah grup itu sendiri
+(`SeedSequence`), sehingga interval sebuah grup tidak bergantung pada grup
+lain yang kebetulan dihitung bersamanya: tabel build, hasil filter dashboard,
+dan `ingest` memberi interval yang sama untuk jumlah yang sama. Grup dengan
+jumlah identik hanya di-resample sekali.
+
+Interval analitik pembandingnya: Wilson untuk rasio (tetap masuk akal untuk
+grup kecil dan p mendekati 0/1) dan normal untuk rata-rata.
+"""
+from statistics import NormalDist
+
+import numpy as np
+
+LEVEL = 0.95
+RESAMPLES = 2000
+SEED = 0
+
+
+def _z(level):
+    """Kuantil normal untuk interval dua sisi `level` (1.96 untuk 95%)"""
+    return NormalDist().inv_cdf((1 + level) / 2)
+
+
+def _as_float(values):
+    return np.asarray(values, dtype='float64')
+
+
+def _quantiles(stats, level):
+    """(bawah, atas) interval persentil per kolom `stats` (resample, grup)"""
+    low, high = np.quantile(stats, [(1 - level) / 2, (1 + level) / 2], axis=0)
+    return low, high
+
+
+def _group_rng(seed, counts):
+    """Generator yang hanya bergantung pada `seed` dan jumlah-jumlah (integer) satu grup"""
+    return np.random.default_rng(np.random.SeedSequence([seed, *(int(c) for c in counts)]))
+
+
+def _distinct_groups(counts):
+    """(baris unik, indeks baris unik untuk setiap grup) dari matriks jumlah (grup, kolom)"""
+    unique, inverse = np.unique(counts.astype('int64'), axis=0, return_inverse=True)
+    return unique, inverse.reshape(-1)
+
+
+def _fill(valid, values):
+    out = np.full(len(valid), np.nan)
+    out[valid] = values
+    return out
+
+
+def wilson_interval(successes, totals, level=LEVEL):
+    """Interval skor Wilson untuk proporsi `successes / totals` (NaN jika total 0)"""
+    successes, totals, z = _as_float(successes), _as_float(totals), _z(level)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p = successes / totals
+        denom = 1 + z ** 2 / totals
+        center = (p + z ** 2 / (2 * totals)) / denom
+        half = z * np.sqrt(p * (1 - p) / totals + z ** 2 / (4 * totals ** 2)) / denom
+    valid = totals > 0
+    return np.where(valid, center - half, np.nan), np.where(valid, center + half, np.nan)
+
+
+def normal_interval(means, stds, totals, level=LEVEL):
+    """Interval normal rata-rata: mean ± z * std / sqrt(n) (NaN jika n < 2)"""
+    means, stds, totals, z = _as_float(means), _as_float(stds), _as_float(totals), _z(level)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        half = z * stds / np.sqrt(totals)
+    valid = totals > 1
+    return np.where(valid, means - half, np.nan), np.where(valid, means + half, np.nan)
+
+
+def bootstrap_proportions(successes, totals, resamples=RESAMPLES, level=LEVEL, seed=SEED):
+    """Interval persentil bootstrap proporsi setiap grup dari tarikan binomial grup itu"""
+    successes, totals = _as_float(successes), _as_float(totals)
+    valid = (totals > 0) & np.isfinite(successes)
+    groups, inverse = _distinct_groups(np.column_stack([successes[valid], totals[valid]]))
+    rates = np.empty((resamples, len(groups)))
+    for i, (k, n) in enumerate(groups):
+        rates[:, i] = _group_rng(seed, (k, n)).binomial(n, k / n, size=resamples) / n
+    low, high = _quantiles(rates, level)
+    return _fill(valid, low[inverse]), _fill(valid, high[inverse])
+
+
+def bootstrap_means(counts, values, resamples=RESAMPLES, level=LEVEL, seed=SEED):
+    """Interval persentil bootstrap rata-rata setiap grup dari jumlah observasi per nilai.
+
+    `counts` berukuran (grup, nilai): jumlah observasi grup yang bernilai
+    `values[k]` (mis. jumlah review per skor 1-5).
+    """
+    counts, values = _as_float(counts), _as_float(values)
+    valid = counts.sum(axis=1) > 0
+    groups, inverse = _distinct_groups(counts[valid])
+    means = np.empty((resamples, len(groups)))
+    for i, row in enumerate(groups):
+        n = row.sum()
+        means[:, i] = _group_rng(seed, row).multinomial(n, row / n, size=resamples) @ values / n
+    low, high = _quantiles(means, level)
+    return _fill(valid, low[inverse]), _fill(valid, high[inverse])
+
+
+def proportion_intervals(successes, totals, resamples=RESAMPLES, level=LEVEL, seed=SEED):
+    """{'boot': (bawah, atas), 'wilson': (bawah, atas)} proporsi semua grup"""
+    return {
+        'boot': bootstrap_proportions(successes, totals, resamples, level, seed),
+        'wilson': wilson_interval(successes, totals, level),
+    }
+
+
+def mean_intervals(counts, values, resamples=RESAMPLES, level=LEVEL, seed=SEED):
+    """{'boot': (bawah, atas), 'normal': (bawah, atas)} rata-rata semua grup dari jumlah per nilai"""
+    counts, values = _as_float(counts), _as_float(values)
+    totals = counts.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        means = counts @ values / totals
+        variances = (counts @ values ** 2 - totals * means ** 2) / (totals - 1)
+    stds = np.sqrt(np.clip(variances, 0, None))
+    return {
+        'boot': bootstrap_means(counts, values, resamples, level, seed),
+        'normal': normal_interval(means, stds, totals, level),
+    }
+